@@ -0,0 +1,48 @@
+"""add upload sessions for resumable uploads
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """创建分片上传会话表"""
+    op.create_table(
+        'upload_sessions',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('customer_id', sa.String(36), sa.ForeignKey('customers.id'), nullable=False),
+        sa.Column('document_type_id', sa.String(36), sa.ForeignKey('document_types.id'), nullable=False),
+        sa.Column('file_name', sa.String(255), nullable=False),
+        sa.Column('file_type', sa.String(100)),
+        sa.Column('file_size', sa.BigInteger(), nullable=False),
+        sa.Column('received_size', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='uploading'),
+        sa.Column('upload_source', sa.String(20)),
+        sa.Column('note', sa.Text()),
+        sa.Column('created_by', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_upload_sessions_customer_id', 'upload_sessions', ['customer_id'], unique=False)
+    op.create_index('ix_upload_sessions_created_by', 'upload_sessions', ['created_by'], unique=False)
+    op.create_index('ix_upload_sessions_expires_at', 'upload_sessions', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """删除分片上传会话表"""
+    op.drop_index('ix_upload_sessions_expires_at', table_name='upload_sessions')
+    op.drop_index('ix_upload_sessions_created_by', table_name='upload_sessions')
+    op.drop_index('ix_upload_sessions_customer_id', table_name='upload_sessions')
+    op.drop_table('upload_sessions')
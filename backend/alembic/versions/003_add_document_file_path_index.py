@@ -0,0 +1,25 @@
+"""add customer_documents.file_path index for storage reconciliation
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """按文件路径查找文档记录（孤儿文件对账）"""
+    op.create_index('ix_customer_documents_file_path', 'customer_documents', ['file_path'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_customer_documents_file_path', table_name='customer_documents')
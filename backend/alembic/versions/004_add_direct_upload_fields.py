@@ -0,0 +1,31 @@
+"""add direct upload fields and document content hash
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """对象存储直传：上传会话记录目标路径与MD5，文档记录内容MD5"""
+    op.add_column('upload_sessions', sa.Column('mode', sa.String(20), nullable=False, server_default='chunked'))
+    op.add_column('upload_sessions', sa.Column('file_path', sa.String(500)))
+    op.add_column('upload_sessions', sa.Column('file_md5', sa.String(32)))
+    op.add_column('customer_documents', sa.Column('file_md5', sa.String(32)))
+
+
+def downgrade() -> None:
+    op.drop_column('customer_documents', 'file_md5')
+    op.drop_column('upload_sessions', 'file_md5')
+    op.drop_column('upload_sessions', 'file_path')
+    op.drop_column('upload_sessions', 'mode')
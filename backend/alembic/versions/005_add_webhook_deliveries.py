@@ -0,0 +1,51 @@
+"""add webhook delivery queue
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """创建 Webhook 投递队列表"""
+    op.create_table(
+        'webhook_deliveries',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('url', sa.String(500), nullable=False),
+        sa.Column('event', sa.String(50), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('claimed_by', sa.String(50)),
+        sa.Column('last_status_code', sa.Integer()),
+        sa.Column('last_error', sa.Text()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('delivered_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_webhook_deliveries_url', 'webhook_deliveries', ['url'], unique=False)
+    op.create_index('ix_webhook_deliveries_created_at', 'webhook_deliveries', ['created_at'], unique=False)
+    op.create_index(
+        'ix_webhook_deliveries_status_next_attempt',
+        'webhook_deliveries',
+        ['status', 'next_attempt_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """删除 Webhook 投递队列表"""
+    op.drop_index('ix_webhook_deliveries_status_next_attempt', table_name='webhook_deliveries')
+    op.drop_index('ix_webhook_deliveries_created_at', table_name='webhook_deliveries')
+    op.drop_index('ix_webhook_deliveries_url', table_name='webhook_deliveries')
+    op.drop_table('webhook_deliveries')
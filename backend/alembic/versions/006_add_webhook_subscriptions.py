@@ -0,0 +1,39 @@
+"""add webhook subscriptions
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """创建 Webhook 订阅表"""
+    op.create_table(
+        'webhook_subscriptions',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('url', sa.String(500), nullable=False, unique=True),
+        sa.Column('events', sa.JSON(), nullable=False),
+        sa.Column('secret', sa.String(255)),
+        sa.Column('headers', sa.JSON()),
+        sa.Column('enabled', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('batch', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('description', sa.String(200)),
+        sa.Column('created_by', sa.String(36), sa.ForeignKey('users.id')),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    """删除 Webhook 订阅表"""
+    op.drop_table('webhook_subscriptions')
@@ -0,0 +1,38 @@
+"""add transactional outbox
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """创建领域事件发件箱表"""
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), primary_key=True, autoincrement=True),
+        sa.Column('event', sa.String(50), nullable=False),
+        sa.Column('customer_id', sa.String(36)),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('processed_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('ix_outbox_events_customer_id', 'outbox_events', ['customer_id'], unique=False)
+    op.create_index('ix_outbox_events_processed_id', 'outbox_events', ['processed_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """删除领域事件发件箱表"""
+    op.drop_index('ix_outbox_events_processed_id', table_name='outbox_events')
+    op.drop_index('ix_outbox_events_customer_id', table_name='outbox_events')
+    op.drop_table('outbox_events')
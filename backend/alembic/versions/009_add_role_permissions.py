@@ -0,0 +1,36 @@
+"""add role permissions
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """创建角色权限表"""
+    op.create_table(
+        'role_permissions',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('role', sa.String(20), nullable=False),
+        sa.Column('permission', sa.String(100), nullable=False),
+        sa.Column('created_by', sa.String(36), sa.ForeignKey('users.id')),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('role', 'permission', name='uq_role_permissions_role_permission'),
+    )
+    op.create_index('ix_role_permissions_role', 'role_permissions', ['role'], unique=False)
+
+
+def downgrade() -> None:
+    """删除角色权限表"""
+    op.drop_index('ix_role_permissions_role', table_name='role_permissions')
+    op.drop_table('role_permissions')
@@ -0,0 +1,33 @@
+"""unique customer assignments
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """为客户分配表添加 (user_id, customer_id) 唯一约束"""
+    # 先清理重复分配，每对用户/客户只保留一条
+    op.execute(
+        "DELETE FROM customer_assignments WHERE id NOT IN ("
+        "SELECT MIN(id) FROM customer_assignments GROUP BY user_id, customer_id)"
+    )
+    with op.batch_alter_table('customer_assignments') as batch_op:
+        batch_op.create_unique_constraint('uq_customer_assignments_user_customer', ['user_id', 'customer_id'])
+
+
+def downgrade() -> None:
+    """删除客户分配唯一约束"""
+    with op.batch_alter_table('customer_assignments') as batch_op:
+        batch_op.drop_constraint('uq_customer_assignments_user_customer', type_='unique')
@@ -0,0 +1,35 @@
+"""audit log drop foreign keys
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """删除审计日志对客户、用户的外键，审计记录在客户删除后保留"""
+    # SQLite 默认不校验外键，只需处理 PostgreSQL
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("ALTER TABLE audit_logs DROP CONSTRAINT IF EXISTS audit_logs_customer_id_fkey")
+    op.execute("ALTER TABLE audit_logs DROP CONSTRAINT IF EXISTS audit_logs_user_id_fkey")
+
+
+def downgrade() -> None:
+    """恢复审计日志外键（已删除客户、用户的记录置空）"""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("UPDATE audit_logs SET customer_id = NULL WHERE customer_id NOT IN (SELECT id FROM customers)")
+    op.execute("UPDATE audit_logs SET user_id = NULL WHERE user_id NOT IN (SELECT id FROM users)")
+    op.create_foreign_key('audit_logs_customer_id_fkey', 'audit_logs', 'customers', ['customer_id'], ['id'])
+    op.create_foreign_key('audit_logs_user_id_fkey', 'audit_logs', 'users', ['user_id'], ['id'])
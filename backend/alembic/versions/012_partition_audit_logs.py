@@ -0,0 +1,110 @@
+"""partition audit logs by month
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+# 与 app.config.AUDIT_PARTITION_MONTHS_AHEAD 默认值一致，之后由后台维护任务补建
+MONTHS_AHEAD = 2
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def upgrade() -> None:
+    """PostgreSQL：将 audit_logs 改为按 created_at 月度范围分区，迁移已有数据"""
+    bind = op.get_bind()
+    # SQLite 无原生分区，由维护任务按月轮换表
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+    for index_name in ('idx_audit_user_id', 'idx_audit_action', 'idx_audit_created_at',
+                       'ix_audit_logs_customer_id', 'ix_audit_logs_user_id', 'ix_audit_logs_created_at'):
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    op.execute("ALTER TABLE audit_logs_legacy DROP CONSTRAINT IF EXISTS audit_logs_pkey")
+
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id VARCHAR(36) NOT NULL,
+            customer_id VARCHAR(36),
+            user_id VARCHAR(36),
+            action VARCHAR(50) NOT NULL,
+            details JSON,
+            ip_address VARCHAR(50),
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.create_index('ix_audit_logs_customer_id', 'audit_logs', ['customer_id'], unique=False)
+    op.create_index('ix_audit_logs_user_id', 'audit_logs', ['user_id'], unique=False)
+    op.create_index('idx_audit_action', 'audit_logs', ['action'], unique=False)
+    op.create_index('ix_audit_logs_created_at', 'audit_logs', ['created_at'], unique=False)
+
+    # 为已有数据所在月份及未来几个月建分区
+    now = datetime.now(timezone.utc)
+    current = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
+    oldest = bind.execute(sa.text("SELECT MIN(created_at) FROM audit_logs_legacy")).scalar()
+    month = current
+    if oldest is not None:
+        oldest = oldest.astimezone(timezone.utc) if oldest.tzinfo else oldest.replace(tzinfo=timezone.utc)
+        month = min(current, datetime(oldest.year, oldest.month, 1, tzinfo=timezone.utc))
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        next_month = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE audit_logs_{month.year:04d}{month.month:02d} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+
+    op.execute(
+        "INSERT INTO audit_logs (id, customer_id, user_id, action, details, ip_address, created_at) "
+        "SELECT id, customer_id, user_id, action, details, ip_address, COALESCE(created_at, now()) "
+        "FROM audit_logs_legacy"
+    )
+    op.execute("DROP TABLE audit_logs_legacy")
+
+
+def downgrade() -> None:
+    """恢复为普通表（保留所有分区中的数据）"""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        CREATE TABLE audit_logs_unpartitioned (
+            id VARCHAR(36) NOT NULL PRIMARY KEY,
+            customer_id VARCHAR(36),
+            user_id VARCHAR(36),
+            action VARCHAR(50) NOT NULL,
+            details JSON,
+            ip_address VARCHAR(50),
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+    """)
+    op.execute(
+        "INSERT INTO audit_logs_unpartitioned "
+        "SELECT id, customer_id, user_id, action, details, ip_address, created_at FROM audit_logs"
+    )
+    op.execute("DROP TABLE audit_logs CASCADE")
+    op.execute("ALTER TABLE audit_logs_unpartitioned RENAME TO audit_logs")
+    op.execute("ALTER INDEX audit_logs_unpartitioned_pkey RENAME TO audit_logs_pkey")
+    op.create_index('idx_audit_user_id', 'audit_logs', ['user_id'], unique=False)
+    op.create_index('idx_audit_action', 'audit_logs', ['action'], unique=False)
+    op.create_index('idx_audit_created_at', 'audit_logs', ['created_at'], unique=False)
+    op.create_index('ix_audit_logs_customer_id', 'audit_logs', ['customer_id'], unique=False)
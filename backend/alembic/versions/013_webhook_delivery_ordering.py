@@ -0,0 +1,36 @@
+"""webhook delivery ordering
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """为 Webhook 投递记录添加顺序键与序号，同一订阅同一顺序键的记录依次投递"""
+    op.add_column('webhook_deliveries', sa.Column('ordering_key', sa.String(100)))
+    op.add_column('webhook_deliveries', sa.Column('sequence', sa.BigInteger()))
+    op.create_index(
+        'ix_webhook_deliveries_ordering',
+        'webhook_deliveries',
+        ['url', 'ordering_key', 'sequence'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """删除 Webhook 投递顺序键与序号"""
+    op.drop_index('ix_webhook_deliveries_ordering', table_name='webhook_deliveries')
+    with op.batch_alter_table('webhook_deliveries') as batch_op:
+        batch_op.drop_column('sequence')
+        batch_op.drop_column('ordering_key')
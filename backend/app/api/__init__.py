@@ -1,7 +1,7 @@
 """
 API Routes Module
 """
-from . import auth, products, customers, documents, dashboard
+from . import auth, products, customers, documents, uploads, webhooks, permissions, dashboard, audit
 
-__all__ = ["auth", "products", "customers", "documents", "dashboard"]
+__all__ = ["auth", "products", "customers", "documents", "uploads", "webhooks", "permissions", "dashboard", "audit"]
 
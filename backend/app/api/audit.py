@@ -0,0 +1,80 @@
+"""
+Audit Log API Routes
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from ..database import get_db
+from ..schemas.common import AuditLogResponse, AuditMaintenanceReport, PaginatedResponse
+from ..core.dependencies import require_permission
+from ..core.principals import Principal
+from ..services.audit_partitions import AuditPartitionManager, as_utc, run_audit_maintenance
+from ..config import settings
+
+
+router = APIRouter(prefix="/audit-logs", tags=["Audit Logs"])
+
+
+@router.get("/", response_model=PaginatedResponse[AuditLogResponse])
+async def list_audit_logs(
+    start: datetime = Query(..., description="Inclusive lower bound on created_at"),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at (default: now)"),
+    customer_id: Optional[UUID] = None,
+    user_id: Optional[UUID] = None,
+    action: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("audit.view"))
+):
+    """
+    List audit logs by customer, user and action within a time range
+    The range is required and bounded so only the months involved are read.
+    Bounds without a UTC offset are treated as UTC.
+    """
+    start = as_utc(start)
+    end = as_utc(end) if end is not None else datetime.now(timezone.utc)
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must be after start"
+        )
+    if end - start > timedelta(days=settings.AUDIT_QUERY_MAX_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Time range cannot exceed {settings.AUDIT_QUERY_MAX_DAYS} days"
+        )
+
+    manager = AuditPartitionManager(db)
+    total, items = manager.query(
+        start,
+        end,
+        customer_id=customer_id,
+        user_id=user_id,
+        action=action,
+        offset=(page - 1) * page_size,
+        limit=page_size
+    )
+
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size
+    }
+
+
+@router.post("/maintenance", response_model=AuditMaintenanceReport)
+async def run_audit_log_maintenance(
+    current_user: Principal = Depends(require_permission("audit.manage"))
+):
+    """
+    Create upcoming partitions, rotate completed months and archive/drop
+    months past the retention period
+    """
+    return await asyncio.to_thread(run_audit_maintenance)
@@ -1,20 +1,68 @@
 """
 Authentication API Routes
 """
+import uuid
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
+from ..config import settings
 from ..database import get_db
 from ..models.user import User
-from ..schemas.user import UserLogin, Token, UserCreate, UserResponse, PasswordChange
-from ..core.security import verify_password, get_password_hash, create_access_token
-from ..core.dependencies import get_current_active_user
+from ..models.revoked_token import RevokedToken
+from ..schemas.user import UserLogin, Token, TokenRefresh, UserCreate, UserResponse, UserUpdate, PasswordChange
+from ..core.security import (
+    verify_password_async,
+    verify_and_update_password_async,
+    get_password_hash_async,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    decode_refresh_token,
+)
+from ..core.permissions import permission_registry, permission_version
+from ..core.revocation import (
+    ROTATED,
+    revoke_token,
+    publish_revocation,
+    revoke_user_tokens,
+    publish_user_revocation,
+)
+from ..core.dependencies import get_current_active_user, require_permission, security
+from ..core.principals import Principal, invalidate_principal
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def issue_tokens(user: User, session_id: Optional[str] = None) -> dict:
+    """
+    Issue an access token carrying the user's role claims and a refresh token
+    for the same login session
+    """
+    session_id = session_id or uuid.uuid4().hex
+    access_token = create_access_token(data={
+        "sub": str(user.id),
+        "username": user.username,
+        "role": user.role,
+        "pv": permission_version(user.role),
+        "sid": session_id,
+    })
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": create_refresh_token(str(user.id), session_id),
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def _session_expiry() -> datetime:
+    # A session lives as long as the newest refresh token it may have issued
+    return datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
@@ -32,7 +80,7 @@ async def register(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     now = datetime.utcnow()
     new_user = User(
         username=user_data.username,
@@ -63,7 +111,12 @@ async def login(
     # Find user by username
     user = db.query(User).filter(User.username == login_data.username).first()
     
-    if not user or not verify_password(login_data.password, user.password_hash):
+    valid, new_hash = False, None
+    if user:
+        # Hashing runs in a dedicated thread pool so the event loop keeps serving
+        valid, new_hash = await verify_and_update_password_async(login_data.password, user.password_hash)
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -76,10 +129,83 @@ async def login(
             detail="User account is inactive"
         )
     
-    # Create access token
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # Transparently upgrade legacy or outdated hashes while the plain password is at hand
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+    
+    return issue_tokens(user)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    token_data: TokenRefresh,
+    db: Session = Depends(get_db)
+):
+    """
+    Exchange a refresh token for a new token pair
+    Refresh tokens are single-use; presenting a rotated one again revokes the whole session.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    payload = decode_refresh_token(token_data.refresh_token)
+    if not payload or not payload.get("sub") or not payload.get("sid") or not payload.get("jti"):
+        raise credentials_exception
+    user_id, session_id, token_id = payload["sub"], payload["sid"], payload["jti"]
+    
+    revoked = {
+        row.id for row in db.query(RevokedToken.id).filter(RevokedToken.id.in_([token_id, session_id]))
+    }
+    if session_id in revoked:
+        raise credentials_exception
+    if token_id in revoked:
+        # A rotated token came back: assume it leaked and end the session everywhere
+        expires_at = _session_expiry()
+        revoke_token(db, session_id, user_id, expires_at, "reuse_detected")
+        db.commit()
+        await publish_revocation(session_id, expires_at)
+        raise credentials_exception
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or not user.is_active:
+        raise credentials_exception
+    
+    revoke_token(db, token_id, user_id, datetime.fromtimestamp(payload["exp"], timezone.utc), ROTATED)
+    db.commit()
+    
+    return issue_tokens(user, session_id)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """
+    Log out of the current session
+    Its access and refresh tokens stop working on every worker.
+    """
+    payload = decode_access_token(credentials.credentials)
+    if not payload or not payload.get("sub"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Tokens issued before sessions existed carry neither claim and simply expire
+    token_id = payload.get("sid") or payload.get("jti")
+    if token_id:
+        expires_at = _session_expiry()
+        revoke_token(db, token_id, payload["sub"], expires_at, "logout")
+        db.commit()
+        await publish_revocation(token_id, expires_at)
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return None
 
 
 @router.get("/me", response_model=UserResponse)
@@ -102,15 +228,64 @@ async def change_password(
     Change user password
     """
     # Verify old password
-    if not verify_password(password_data.old_password, current_user.password_hash):
+    if not await verify_password_async(password_data.old_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect old password"
         )
     
     # Update password
-    current_user.password_hash = get_password_hash(password_data.new_password)
+    current_user.password_hash = await get_password_hash_async(password_data.new_password)
     db.commit()
     
     return {"message": "Password changed successfully"}
 
+
+
+@router.patch("/users/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: str,
+    user_data: UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("user.manage"))
+):
+    """
+    Update a user's profile, role or active status
+    Access tokens carry the role and are trusted without a database lookup, so
+    a role or status change cuts off every access token issued to the user
+    before it. Active users get tokens with the new role on their next refresh.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    if user_data.role is not None and permission_registry.get(user_data.role) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown role: {user_data.role}"
+        )
+    
+    access_changed = (
+        (user_data.role is not None and user_data.role != user.role)
+        or (user_data.is_active is not None and user_data.is_active != user.is_active)
+    )
+    if user_data.full_name is not None:
+        user.real_name = user_data.full_name
+    if user_data.department is not None:
+        user.department = user_data.department
+    if user_data.role is not None:
+        user.role = user_data.role
+    if user_data.is_active is not None:
+        user.is_active = user_data.is_active
+    
+    revocation = revoke_user_tokens(db, user.id) if access_changed else None
+    db.commit()
+    db.refresh(user)
+    
+    if revocation is not None:
+        await publish_user_revocation(revocation)
+        await invalidate_principal(user.id)
+    
+    return user
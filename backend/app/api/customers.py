@@ -2,7 +2,7 @@
 Customer API Routes
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from uuid import UUID
@@ -17,9 +17,22 @@ from ..schemas.customer import (
     CustomerResponse,
     CustomerSimple,
     CustomerAssignmentCreate,
+    CustomerBulkAssignment,
+    CustomerBulkAssignmentResult,
 )
 from ..schemas.common import PaginatedResponse
 from ..core.dependencies import get_current_active_user, require_permission
+from ..core.principals import Principal
+from ..core.assignments import (
+    assigned_customers_subquery,
+    has_customer_access,
+    invalidate_assignments,
+)
+from ..core.audit import audit
+from ..core.outbox import add_outbox_event, wake_outbox_relay
+from ..core.webhooks import WebhookEvent
+from ..services.assignments import BulkAssignmentService
+from .websocket import notify_user
 
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
@@ -56,11 +69,10 @@ async def list_customers(
     if product_id:
         query = query.filter(Customer.product_id == product_id)
     
-    # For customer_service role, only show assigned customers
+    # For customer_service role, only show assigned customers; the semi-join is
+    # answered from the (user_id, customer_id) index and never duplicates rows
     if current_user.role == "customer_service":
-        query = query.join(CustomerAssignment).filter(
-            CustomerAssignment.user_id == current_user.id
-        )
+        query = query.filter(Customer.id.in_(assigned_customers_subquery(current_user.id)))
     
     # Get total count
     total = query.count()
@@ -97,16 +109,11 @@ async def get_customer(
         )
     
     # Check permission
-    if current_user.role == "customer_service":
-        assignment = db.query(CustomerAssignment).filter(
-            CustomerAssignment.customer_id == customer_id,
-            CustomerAssignment.user_id == current_user.id
-        ).first()
-        if not assignment:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have access to this customer"
-            )
+    if not has_customer_access(db, current_user.id, current_user.role, customer_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this customer"
+        )
     
     return customer
 
@@ -115,7 +122,7 @@ async def get_customer(
 async def create_customer(
     customer_data: CustomerCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("customer.create"))
+    current_user: Principal = Depends(require_permission("customer.create"))
 ):
     """
     Create a new customer
@@ -152,8 +159,20 @@ async def create_customer(
         )
         db.add(assignment)
     
+    add_outbox_event(db, WebhookEvent.CUSTOMER_CREATED, {
+        "id": customer.id,
+        "customer_no": customer.customer_no,
+        "name": customer.name,
+        "product_id": customer.product_id,
+        "status": customer.status,
+        "created_by": current_user.id,
+    }, customer_id=customer.id)
+    
     db.commit()
     db.refresh(customer)
+    wake_outbox_relay()
+    if current_user.role == "customer_service":
+        await invalidate_assignments(current_user.id)
     
     return customer
 
@@ -163,7 +182,7 @@ async def update_customer(
     customer_id: UUID,
     customer_data: CustomerUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("customer.update"))
+    current_user: Principal = Depends(require_permission("customer.update"))
 ):
     """
     Update customer information
@@ -176,24 +195,39 @@ async def update_customer(
         )
     
     # Check permission for customer_service
-    if current_user.role == "customer_service":
-        assignment = db.query(CustomerAssignment).filter(
-            CustomerAssignment.customer_id == customer_id,
-            CustomerAssignment.user_id == current_user.id
-        ).first()
-        if not assignment:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have access to this customer"
-            )
+    if not has_customer_access(db, current_user.id, current_user.role, customer_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this customer"
+        )
     
     # Update fields
     update_data = customer_data.model_dump(exclude_unset=True)
+    previous_status = customer.status
     for field, value in update_data.items():
         setattr(customer, field, value)
+    db.flush()
+    
+    # Only changed field names are pushed; clients refetch details they display
+    customer_event = {
+        "id": customer.id,
+        "changed_fields": list(update_data),
+        "name": customer.name,
+        "status": customer.status,
+        "updated_at": customer.updated_at,
+    }
+    add_outbox_event(db, WebhookEvent.CUSTOMER_UPDATED, customer_event, customer_id=customer.id)
+    if customer.status != previous_status:
+        add_outbox_event(
+            db,
+            WebhookEvent.CUSTOMER_STATUS_CHANGED,
+            dict(customer_event, previous_status=previous_status),
+            customer_id=customer.id
+        )
     
     db.commit()
     db.refresh(customer)
+    wake_outbox_relay()
     
     return customer
 
@@ -201,8 +235,9 @@ async def update_customer(
 @router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_customer(
     customer_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("customer.delete"))
+    current_user: Principal = Depends(require_permission("customer.delete"))
 ):
     """
     Delete a customer
@@ -214,8 +249,19 @@ async def delete_customer(
             detail="Customer not found"
         )
     
+    add_outbox_event(db, WebhookEvent.CUSTOMER_DELETED, {
+        "id": customer.id,
+        "customer_no": customer.customer_no,
+        "name": customer.name,
+        "deleted_by": current_user.id,
+    }, customer_id=customer.id)
+    assigned_user_ids = [assignment.user_id for assignment in customer.assignments]
+    customer_details = {"customer_no": customer.customer_no, "name": customer.name, "documents": len(customer.documents)}
     db.delete(customer)
     db.commit()
+    wake_outbox_relay()
+    await invalidate_assignments(*assigned_user_ids)
+    await audit(request, "delete", user_id=current_user.id, customer_id=customer_id, details=customer_details)
     
     return None
 
@@ -226,7 +272,7 @@ async def assign_customer(
     customer_id: UUID,
     assignment_data: CustomerAssignmentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("customer.assign"))
+    current_user: Principal = Depends(require_permission("customer.assign"))
 ):
     """
     Assign a customer to a user
@@ -261,8 +307,12 @@ async def assign_customer(
         user_id=assignment_data.user_id
     )
     db.add(assignment)
+    customer_event = {"customer_id": customer.id, "customer_name": customer.name}
     db.commit()
     
+    await invalidate_assignments(assignment_data.user_id)
+    await notify_user(str(assignment_data.user_id), "customer_assigned", customer_event)
+    
     return {"message": "Customer assigned successfully"}
 
 
@@ -271,7 +321,7 @@ async def unassign_customer(
     customer_id: UUID,
     user_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("customer.assign"))
+    current_user: Principal = Depends(require_permission("customer.assign"))
 ):
     """
     Unassign a customer from a user
@@ -290,5 +340,81 @@ async def unassign_customer(
     db.delete(assignment)
     db.commit()
     
+    await invalidate_assignments(user_id)
+    await notify_user(str(user_id), "customer_unassigned", {"customer_id": str(customer_id)})
+    
     return None
 
+
+@router.post("/assignments/bulk", response_model=CustomerBulkAssignmentResult)
+async def bulk_assign_customers(
+    request: Request,
+    assignment_data: CustomerBulkAssignment,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("customer.assign"))
+):
+    """
+    Assign, unassign or transfer many customers at once
+    Customers are selected by id list and/or status/product filters. A transfer
+    moves from_user_id's assignments (optionally narrowed by the same criteria)
+    to user_id, e.g. when a staff member leaves.
+    The whole operation is recorded as one audit entry and one
+    customers.assigned event carrying the affected counts.
+    """
+    user_ids = {str(assignment_data.user_id)}
+    if assignment_data.from_user_id:
+        user_ids.add(str(assignment_data.from_user_id))
+    found = {row.id for row in db.query(User.id).filter(User.id.in_(user_ids))}
+    if found != user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    service = BulkAssignmentService(db)
+    conditions = service.customer_conditions(
+        customer_ids=assignment_data.customer_ids,
+        status=assignment_data.status,
+        product_id=assignment_data.product_id
+    )
+    user_id = str(assignment_data.user_id)
+    result = {"action": assignment_data.action}
+    
+    if assignment_data.action == "assign":
+        result["matched"] = service.count_customers(conditions)
+        result["assigned"] = service.assign(user_id, conditions)
+        result["skipped"] = result["matched"] - result["assigned"]
+    elif assignment_data.action == "unassign":
+        result["matched"] = service.count_customers(conditions)
+        result["unassigned"] = service.unassign(user_id, conditions)
+        result["skipped"] = result["matched"] - result["unassigned"]
+    else:
+        moved, duplicates = service.transfer(str(assignment_data.from_user_id), user_id, conditions)
+        result.update(matched=moved + duplicates, assigned=moved, unassigned=moved + duplicates, skipped=duplicates)
+    
+    operation = {
+        "action": assignment_data.action,
+        **{key: result.get(key, 0) for key in ("matched", "assigned", "unassigned", "skipped")},
+        "user_id": user_id,
+        "from_user_id": str(assignment_data.from_user_id) if assignment_data.from_user_id else None,
+        "criteria": {
+            "customer_count": len(assignment_data.customer_ids) if assignment_data.customer_ids is not None else None,
+            "status": assignment_data.status,
+            "product_id": str(assignment_data.product_id) if assignment_data.product_id else None,
+        },
+        "performed_by": current_user.id,
+    }
+    add_outbox_event(db, WebhookEvent.CUSTOMERS_ASSIGNED, operation)
+    db.commit()
+    
+    wake_outbox_relay()
+    await audit(request, f"bulk_{assignment_data.action}", user_id=current_user.id, details=operation)
+    await invalidate_assignments(*user_ids)
+    # One notification per affected user, not per customer
+    if result.get("assigned"):
+        await notify_user(user_id, "customers_assigned", {"count": result["assigned"]})
+    if result.get("unassigned"):
+        removed_from = str(assignment_data.from_user_id or assignment_data.user_id)
+        await notify_user(removed_from, "customers_unassigned", {"count": result["unassigned"]})
+    
+    return result
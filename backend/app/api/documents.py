@@ -1,9 +1,13 @@
 """
 Document API Routes
 """
+import asyncio
+import hashlib
+from datetime import datetime, timezone
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form
 from fastapi.responses import FileResponse
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -15,11 +19,19 @@ from ..schemas.document import (
     CustomerDocumentResponse,
     FileUploadResponse,
     DocumentReview,
+    DocumentBulkReview,
+    DocumentBulkReviewResult,
     CompletenessResult,
+    ReconciliationReport,
 )
 from ..core.dependencies import get_current_active_user, require_permission
+from ..core.principals import Principal
 from ..services.storage import storage_service
 from ..services.completeness import CompletenessChecker
+from ..services.reconciliation import reconcile_storage
+from ..core.audit import audit
+from ..core.outbox import add_outbox_event, wake_outbox_relay
+from ..core.webhooks import WebhookEvent
 from ..config import settings
 
 
@@ -40,21 +52,11 @@ def validate_file_type(filename: str, allowed_types: str) -> bool:
     return file_ext in allowed_extensions
 
 
-@router.post("/upload", response_model=List[FileUploadResponse], status_code=status.HTTP_201_CREATED)
-async def upload_documents(
-    customer_id: UUID = Form(...),
-    document_type_id: UUID = Form(...),
-    files: List[UploadFile] = File(...),
-    upload_source: str = Form("web"),
-    note: str = Form(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("document.upload"))
-):
+def get_upload_document_type(db: Session, customer_id: UUID, document_type_id: UUID) -> DocumentType:
     """
-    Upload one or more document files
-    Supports multiple file upload based on document type configuration
+    Check that the customer exists and the document type accepts uploads
+    Returns the document type
     """
-    # Check if customer exists
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
         raise HTTPException(
@@ -62,7 +64,6 @@ async def upload_documents(
             detail="Customer not found"
         )
 
-    # Check if document type exists and is active
     doc_type = db.query(DocumentType).filter(DocumentType.id == document_type_id).first()
     if not doc_type:
         raise HTTPException(
@@ -76,8 +77,13 @@ async def upload_documents(
             detail=f"Document type '{doc_type.name}' is not active"
         )
 
-    # Validate number of files
-    num_files = len(files)
+    return doc_type
+
+
+def validate_file_count(doc_type: DocumentType, num_files: int) -> None:
+    """
+    Validate number of files against document type configuration
+    """
     if num_files < doc_type.min_files:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -90,69 +96,201 @@ async def upload_documents(
             detail=f"Maximum {doc_type.max_files} file(s) allowed for {doc_type.name}"
         )
 
-    uploaded_documents = []
 
-    for file in files:
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
+def validate_upload_file(doc_type: DocumentType, filename: str, file_size: int) -> None:
+    """
+    Validate file size and type against document type configuration
+    """
+    max_size = doc_type.max_file_size if doc_type.max_file_size else settings.MAX_FILE_SIZE
+    if file_size > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File '{filename}' size ({file_size} bytes) exceeds maximum allowed size of {max_size} bytes"
+        )
 
-        # Validate file size against document type configuration
-        max_size = doc_type.max_file_size if doc_type.max_file_size else settings.MAX_FILE_SIZE
-        if file_size > max_size:
+    if doc_type.allowed_file_types:
+        if not validate_file_type(filename, doc_type.allowed_file_types):
             raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File '{file.filename}' size ({file_size} bytes) exceeds maximum allowed size of {max_size} bytes"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File '{filename}' type not allowed. Allowed types: {doc_type.allowed_file_types}"
             )
 
-        # Validate file type against document type configuration
-        if doc_type.allowed_file_types:
-            if not validate_file_type(file.filename, doc_type.allowed_file_types):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"File '{file.filename}' type not allowed. Allowed types: {doc_type.allowed_file_types}"
-                )
-
-        # Generate file path with document type code
-        file_path = storage_service.generate_file_path(
-            file.filename,
-            str(customer_id),
-            doc_type.code
+
+def build_document_record(
+    customer_id: UUID,
+    document_type_id: UUID,
+    file_name: str,
+    file_path: str,
+    file_size: int,
+    file_type: str,
+    upload_source: str,
+    uploaded_by: str,
+    note: str = None,
+    created_at: datetime = None,
+    file_md5: str = None
+) -> CustomerDocument:
+    """
+    Build a document record for a stored file
+    The caller adds all records of a batch with db.add_all() and one flush, so
+    they go out as a single bulk INSERT. Setting created_at client-side avoids
+    fetching the server default back row by row.
+    """
+    return CustomerDocument(
+        customer_id=customer_id,
+        document_type_id=document_type_id,
+        file_name=file_name,
+        file_path=file_path,
+        file_size=file_size,
+        file_type=file_type or "application/octet-stream",
+        upload_source=upload_source,
+        uploaded_by=uploaded_by,
+        note=note,
+        file_md5=file_md5,
+        created_at=created_at or datetime.now(timezone.utc)
+    )
+
+
+def build_upload_response(document: CustomerDocument) -> FileUploadResponse:
+    """
+    Build the upload response for a document record
+    """
+    return FileUploadResponse(
+        file_id=document.id,
+        file_name=document.file_name,
+        file_size=document.file_size,
+        file_url=storage_service.get_file_url(document.file_path),
+        uploaded_at=document.created_at
+    )
+
+
+def build_document_event(document: CustomerDocument) -> dict:
+    """
+    Build the compact document payload pushed to WebSocket and webhook subscribers
+    """
+    return {
+        "id": document.id,
+        "document_type_id": str(document.document_type_id),
+        "file_name": document.file_name,
+        "file_size": document.file_size,
+        "file_url": storage_service.get_file_url(document.file_path),
+        "status": document.status,
+        "uploaded_by": document.uploaded_by,
+        "uploaded_at": document.created_at,
+    }
+
+
+async def audit_document_uploads(request: Request, user_id: str, documents: List[CustomerDocument]) -> None:
+    """
+    Record one audit entry per committed upload
+    """
+    for document in documents:
+        await audit(request, "upload", user_id=user_id, customer_id=document.customer_id, details={
+            "document_id": document.id,
+            "document_type_id": document.document_type_id,
+            "file_name": document.file_name,
+            "file_size": document.file_size,
+            "upload_source": document.upload_source,
+        })
+
+
+def add_document_uploaded_events(db: Session, customer_id: str, documents: List[CustomerDocument]) -> None:
+    """
+    Record one upload event per flushed document in the current transaction
+    """
+    for document in documents:
+        add_outbox_event(
+            db,
+            WebhookEvent.DOCUMENT_UPLOADED,
+            dict(build_document_event(document), customer_id=customer_id),
+            customer_id=customer_id
         )
 
-        # Save file
-        await file.seek(0)  # Reset file pointer
-        await storage_service.save_file(file.file, file_path)
 
-        # Create document record
-        document = CustomerDocument(
+@router.post("/upload", response_model=List[FileUploadResponse], status_code=status.HTTP_201_CREATED)
+async def upload_documents(
+    request: Request,
+    customer_id: UUID = Form(...),
+    document_type_id: UUID = Form(...),
+    files: List[UploadFile] = File(...),
+    upload_source: str = Form("web"),
+    note: str = Form(None),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("document.upload"))
+):
+    """
+    Upload one or more document files
+    Supports multiple file upload based on document type configuration
+    """
+    doc_type = get_upload_document_type(db, customer_id, document_type_id)
+    validate_file_count(doc_type, len(files))
+
+    semaphore = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+
+    async def read_file(file: UploadFile) -> bytes:
+        async with semaphore:
+            return await file.read()
+
+    # Read all files concurrently and validate every one of them before
+    # anything is written, so a bad file never leaves partial uploads behind
+    contents = await asyncio.gather(*(read_file(file) for file in files))
+    for file, content in zip(files, contents):
+        validate_upload_file(doc_type, file.filename, len(content))
+
+    # Generate file paths with document type code
+    file_paths = [
+        storage_service.generate_file_path(file.filename, str(customer_id), doc_type.code)
+        for file in files
+    ]
+
+    def compute_md5s() -> List[str]:
+        return [hashlib.md5(content).hexdigest() for content in contents]
+
+    # Stage files concurrently; already-staged files are discarded if any write fails.
+    # Checksums are computed in a worker thread alongside, off the event loop.
+    _, file_md5s = await asyncio.gather(
+        storage_service.stage_files(
+            list(zip(contents, file_paths)),
+            concurrency=settings.UPLOAD_CONCURRENCY
+        ),
+        asyncio.to_thread(compute_md5s)
+    )
+
+    created_at = datetime.now(timezone.utc)
+    documents = [
+        build_document_record(
             customer_id=customer_id,
             document_type_id=document_type_id,
             file_name=file.filename,
             file_path=file_path,
-            file_size=file_size,
-            file_type=file.content_type or "application/octet-stream",
+            file_size=len(content),
+            file_type=file.content_type,
             upload_source=upload_source,
             uploaded_by=current_user.id,
-            note=note
+            note=note,
+            created_at=created_at,
+            file_md5=file_md5
         )
+        for file, content, file_path, file_md5 in zip(files, contents, file_paths, file_md5s)
+    ]
 
-        db.add(document)
-        db.flush()  # Flush to get the ID without committing
-
-        # Get file URL
-        file_url = storage_service.get_file_url(file_path)
-
-        uploaded_documents.append(FileUploadResponse(
-            file_id=document.id,
-            file_name=document.file_name,
-            file_size=document.file_size,
-            file_url=file_url,
-            uploaded_at=document.created_at
-        ))
-
-    # Commit all documents at once
-    db.commit()
+    # Insert all documents with a single bulk INSERT and commit at once
+    try:
+        db.add_all(documents)
+        db.flush()
+        uploaded_documents = [build_upload_response(document) for document in documents]
+        add_document_uploaded_events(db, str(customer_id), documents)
+        db.commit()
+    except Exception:
+        db.rollback()
+        await storage_service.discard_staged_files(file_paths)
+        raise
+
+    # Files become visible only once their rows are committed; if the process
+    # dies before this point, reconciliation promotes the staged files
+    await storage_service.promote_staged_files(file_paths, concurrency=settings.UPLOAD_CONCURRENCY)
+
+    wake_outbox_relay()
+    await audit_document_uploads(request, current_user.id, documents)
 
     return uploaded_documents
 
@@ -262,8 +400,9 @@ async def download_document(
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     document_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("document.delete"))
+    current_user: Principal = Depends(require_permission("document.delete"))
 ):
     """
     Delete a document
@@ -275,22 +414,49 @@ async def delete_document(
             detail="Document not found"
         )
 
-    # Delete file from storage
-    await storage_service.delete_file(document.file_path)
+    file_path = document.file_path
+    document_event = {
+        "id": document.id,
+        "customer_id": document.customer_id,
+        "document_type_id": document.document_type_id,
+        "file_name": document.file_name,
+        "deleted_by": current_user.id,
+    }
+    add_outbox_event(db, WebhookEvent.DOCUMENT_DELETED, document_event, customer_id=document.customer_id)
 
-    # Delete database record
+    # Delete the database record first: a crash after the commit leaves an
+    # orphan file for reconciliation to reclaim instead of a dangling row
     db.delete(document)
     db.commit()
 
+    # Delete file from storage
+    await storage_service.delete_file(file_path)
+
+    wake_outbox_relay()
+    await audit(request, "delete", user_id=current_user.id, customer_id=document_event["customer_id"], details={
+        "document_id": document_event["id"],
+        "document_type_id": document_event["document_type_id"],
+        "file_name": document_event["file_name"],
+        "file_path": file_path,
+    })
+
     return None
 
 
+def review_action(review_status: str) -> str:
+    """
+    Audit action for a review decision
+    """
+    return "approve" if review_status == "approved" else "reject"
+
+
 @router.post("/{document_id}/review", response_model=dict)
 async def review_document(
     document_id: UUID,
     review_data: DocumentReview,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("document.review"))
+    current_user: Principal = Depends(require_permission("document.review"))
 ):
     """
     Review a document (approve or reject)
@@ -310,13 +476,119 @@ async def review_document(
     
     document.status = review_data.status
     document.reviewed_by = current_user.id
+    document.reviewed_at = datetime.now(timezone.utc)
     document.review_note = review_data.review_note
+    event = WebhookEvent.DOCUMENT_APPROVED if review_data.status == "approved" else WebhookEvent.DOCUMENT_REJECTED
+    add_outbox_event(db, event, {
+        "id": document.id,
+        "customer_id": document.customer_id,
+        "document_type_id": document.document_type_id,
+        "status": document.status,
+        "review_note": document.review_note,
+        "reviewed_by": current_user.id,
+        "reviewed_at": document.reviewed_at,
+        "uploaded_by": document.uploaded_by,
+    }, customer_id=document.customer_id)
     
     db.commit()
+    wake_outbox_relay()
+    await audit(request, review_action(review_data.status), user_id=current_user.id, customer_id=document.customer_id, details={
+        "document_id": document.id,
+        "review_note": review_data.review_note,
+    })
     
     return {"message": f"Document {review_data.status} successfully"}
 
 
+@router.post("/review/bulk", response_model=DocumentBulkReviewResult)
+async def bulk_review_documents(
+    review_data: DocumentBulkReview,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("document.review"))
+):
+    """
+    Approve or reject many documents at once
+    All documents are updated by a single UPDATE; one event is emitted per
+    affected customer rather than per document.
+    """
+    document_ids = list(dict.fromkeys(str(document_id) for document_id in review_data.document_ids))
+    reviewed_at = datetime.now(timezone.utc)
+    statement = update(CustomerDocument).where(CustomerDocument.id.in_(document_ids)).values(
+        status=review_data.status,
+        reviewed_by=current_user.id,
+        reviewed_at=reviewed_at,
+        review_note=review_data.review_note
+    ).execution_options(synchronize_session=False)
+    columns = (
+        CustomerDocument.id,
+        CustomerDocument.customer_id,
+        CustomerDocument.document_type_id,
+        CustomerDocument.uploaded_by,
+    )
+    
+    if db.get_bind().dialect.update_returning:
+        reviewed = db.execute(statement.returning(*columns)).all()
+    else:
+        reviewed = db.execute(select(*columns).where(CustomerDocument.id.in_(document_ids))).all()
+        db.execute(statement)
+    
+    documents_by_customer = {}
+    for row in reviewed:
+        documents_by_customer.setdefault(row.customer_id, []).append({
+            "id": row.id,
+            "document_type_id": row.document_type_id,
+            "uploaded_by": row.uploaded_by,
+        })
+    for customer_id, documents in documents_by_customer.items():
+        add_outbox_event(db, WebhookEvent.DOCUMENTS_REVIEWED, {
+            "customer_id": customer_id,
+            "status": review_data.status,
+            "review_note": review_data.review_note,
+            "reviewed_by": current_user.id,
+            "reviewed_at": reviewed_at,
+            "documents": documents,
+        }, customer_id=customer_id)
+    
+    db.commit()
+    wake_outbox_relay()
+    for row in reviewed:
+        await audit(request, review_action(review_data.status), user_id=current_user.id, customer_id=row.customer_id, details={
+            "document_id": row.id,
+            "review_note": review_data.review_note,
+            "bulk": True,
+        })
+    
+    # Rejected documents stop counting towards requirements, so report the
+    # new completeness of every affected customer
+    checker = CompletenessChecker(db)
+    completeness = []
+    for customer_id in documents_by_customer:
+        try:
+            completeness.append(checker.check_customer_completeness(customer_id))
+        except ValueError:
+            pass
+    
+    found = {row.id for row in reviewed}
+    return {
+        "updated": len(reviewed),
+        "not_found": [document_id for document_id in document_ids if document_id not in found],
+        "completeness": completeness,
+    }
+
+
+@router.post("/maintenance/reconcile", response_model=ReconciliationReport)
+async def reconcile_document_storage(
+    dry_run: bool = True,
+    current_user: Principal = Depends(require_permission("storage.manage"))
+):
+    """
+    Find orphan files and dangling document records
+    With dry_run=false, orphan files are removed and the reclaimed bytes reported
+    """
+    return await asyncio.to_thread(reconcile_storage, dry_run)
+
+
 @router.get("/customer/{customer_id}/completeness", response_model=CompletenessResult)
 async def check_completeness(
     customer_id: UUID,
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
-import pandas as pd
+import asyncio
+import importlib
 import io
 from uuid import UUID
 
@@ -9,16 +10,24 @@ from app.database import get_db
 from app.models.customer import Customer
 from app.models.loan_product import LoanProduct
 from app.core.dependencies import get_current_active_user, require_permission
-from app.models.user import User
+from app.core.principals import Principal
 
 router = APIRouter()
 
 
+async def load_pandas():
+    """
+    按需导入 pandas（连同 openpyxl 约数百毫秒）
+    不在模块导入时加载，worker 启动不承担这部分开销；首次导入放到线程中执行，避免阻塞事件循环
+    """
+    return await asyncio.to_thread(importlib.import_module, "pandas")
+
+
 @router.post("/customers/import")
 async def import_customers(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("customer.create"))
+    current_user: Principal = Depends(require_permission("customer.create"))
 ):
     """
     批量导入客户数据
@@ -32,6 +41,7 @@ async def import_customers(
     if file_ext not in ['xlsx', 'xls', 'csv']:
         raise HTTPException(status_code=400, detail="不支持的文件格式，请上传Excel或CSV文件")
     
+    pd = await load_pandas()
     try:
         # 读取文件内容
         contents = await file.read()
@@ -128,7 +138,7 @@ async def import_customers(
 @router.get("/customers/export")
 async def export_customers(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("customer.view"))
+    current_user: Principal = Depends(require_permission("customer.view"))
 ):
     """
     导出客户数据为Excel
@@ -154,6 +164,7 @@ async def export_customers(
         })
     
     # 创建DataFrame
+    pd = await load_pandas()
     df = pd.DataFrame(data)
     
     # 写入Excel
@@ -190,6 +201,7 @@ async def download_template():
         '备注': ['示例客户', '']
     }
     
+    pd = await load_pandas()
     df = pd.DataFrame(template_data)
     
     # 写入Excel
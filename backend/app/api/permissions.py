@@ -0,0 +1,70 @@
+"""
+Role Permission API Routes
+"""
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models.role_permission import RolePermission
+from ..schemas.user import RolePermissionsUpdate, RolePermissionsResponse
+from ..core.dependencies import require_permission
+from ..core.principals import Principal
+from ..core.permissions import (
+    permission_registry,
+    reload_role_permissions,
+    notify_permissions_changed,
+)
+
+
+router = APIRouter(prefix="/permissions", tags=["Permissions"])
+
+
+def _role_response(role: str, source: str) -> dict:
+    compiled = permission_registry.get(role)
+    return {
+        "role": role,
+        "permissions": sorted(compiled.permissions) if compiled else [],
+        "version": compiled.version if compiled else "",
+        "source": source,
+    }
+
+
+@router.get("/roles", response_model=List[RolePermissionsResponse])
+async def list_role_permissions(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("permission.manage"))
+):
+    """
+    List the effective permissions of every role
+    """
+    stored_roles = {row.role for row in db.query(RolePermission.role).distinct()}
+    return [
+        _role_response(role, "database" if role in stored_roles else "default")
+        for role in sorted(permission_registry.roles())
+    ]
+
+
+@router.put("/roles/{role}", response_model=RolePermissionsResponse)
+async def update_role_permissions(
+    role: str,
+    permission_data: RolePermissionsUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("permission.manage"))
+):
+    """
+    Replace the permissions of a role
+    Every worker reloads its permission sets; tokens issued under the old set
+    are re-checked against the database until they expire.
+    """
+    db.query(RolePermission).filter(RolePermission.role == role).delete(synchronize_session=False)
+    db.add_all([
+        RolePermission(role=role, permission=permission, created_by=current_user.id)
+        for permission in sorted(set(permission_data.permissions))
+    ])
+    db.commit()
+
+    await reload_role_permissions()
+    await notify_permissions_changed()
+
+    return _role_response(role, "database" if permission_data.permissions else "default")
@@ -23,6 +23,9 @@ from ..schemas.loan_product import (
 )
 from ..schemas.common import PaginatedResponse
 from ..core.dependencies import get_current_active_user, require_permission
+from ..core.principals import Principal
+from ..core.outbox import add_outbox_event, wake_outbox_relay
+from ..core.webhooks import WebhookEvent
 
 
 router = APIRouter(prefix="/products", tags=["Loan Products"])
@@ -74,7 +77,7 @@ async def get_document_type(
 async def create_document_type(
     document_type_data: DocumentTypeCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("product.manage"))
+    current_user: Principal = Depends(require_permission("product.manage"))
 ):
     """
     Create a new document type
@@ -100,7 +103,7 @@ async def update_document_type(
     document_type_id: UUID,
     document_type_data: DocumentTypeUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("product.manage"))
+    current_user: Principal = Depends(require_permission("product.manage"))
 ):
     """
     Update a document type
@@ -127,7 +130,7 @@ async def update_document_type(
 async def delete_document_type(
     document_type_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("product.manage"))
+    current_user: Principal = Depends(require_permission("product.manage"))
 ):
     """
     Delete a document type
@@ -215,7 +218,7 @@ async def get_product(
 async def create_product(
     product_data: LoanProductCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("product.manage"))
+    current_user: Principal = Depends(require_permission("product.manage"))
 ):
     """
     Create a new loan product
@@ -243,8 +246,15 @@ async def create_product(
             )
             db.add(requirement)
     
+    add_outbox_event(db, WebhookEvent.PRODUCT_CREATED, {
+        "id": product.id,
+        "code": product.code,
+        "name": product.name,
+    })
+    
     db.commit()
     db.refresh(product)
+    wake_outbox_relay()
     
     return product
 
@@ -254,7 +264,7 @@ async def update_product(
     product_id: UUID,
     product_data: LoanProductUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("product.manage"))
+    current_user: Principal = Depends(require_permission("product.manage"))
 ):
     """
     Update a loan product
@@ -271,8 +281,16 @@ async def update_product(
     for field, value in update_data.items():
         setattr(product, field, value)
     
+    add_outbox_event(db, WebhookEvent.PRODUCT_UPDATED, {
+        "id": product.id,
+        "changed_fields": list(update_data),
+        "code": product.code,
+        "name": product.name,
+    })
+    
     db.commit()
     db.refresh(product)
+    wake_outbox_relay()
     
     return product
 
@@ -281,7 +299,7 @@ async def update_product(
 async def delete_product(
     product_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("product.manage"))
+    current_user: Principal = Depends(require_permission("product.manage"))
 ):
     """
     Delete a loan product
@@ -293,8 +311,14 @@ async def delete_product(
             detail="Product not found"
         )
     
+    add_outbox_event(db, WebhookEvent.PRODUCT_DELETED, {
+        "id": product.id,
+        "code": product.code,
+        "name": product.name,
+    })
     db.delete(product)
     db.commit()
+    wake_outbox_relay()
     
     return None
 
@@ -305,7 +329,7 @@ async def add_document_requirement(
     product_id: UUID,
     requirement_data: ProductDocumentRequirementCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("product.manage"))
+    current_user: Principal = Depends(require_permission("product.manage"))
 ):
     """
     Add a document requirement to a product
@@ -353,7 +377,7 @@ async def remove_document_requirement(
     product_id: UUID,
     requirement_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("product.manage"))
+    current_user: Principal = Depends(require_permission("product.manage"))
 ):
     """
     Remove a document requirement from a product
@@ -0,0 +1,443 @@
+"""
+Resumable Upload API Routes
+
+Chunked upload protocol for unreliable (mobile) networks:
+1. POST   /documents/uploads                   create a session per file
+2. PUT    /documents/uploads/{id}?offset=N     send the next chunk as the raw request body
+3. GET    /documents/uploads/{id}              query the received offset after a reconnect
+4. POST   /documents/uploads/finalize          turn completed sessions into documents
+
+With object storage, POST /documents/uploads/direct returns a presigned URL
+instead: the client PUTs the file straight to storage and the same finalize
+call verifies the object (size, type, MD5) before creating the document.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from ..database import get_db
+from ..models.upload_session import UploadSession
+from ..schemas.document import (
+    FileUploadResponse,
+    UploadSessionCreate,
+    UploadSessionResponse,
+    DirectUploadCreate,
+    DirectUploadResponse,
+    UploadFinalize,
+)
+from ..core.dependencies import require_permission
+from ..core.principals import Principal
+from ..core.outbox import wake_outbox_relay
+from ..services.storage import storage_service
+from ..config import settings
+from .documents import (
+    get_upload_document_type,
+    validate_file_count,
+    validate_upload_file,
+    build_document_record,
+    build_upload_response,
+    add_document_uploaded_events,
+    audit_document_uploads,
+)
+
+
+router = APIRouter(prefix="/documents/uploads", tags=["Documents"])
+
+
+def _session_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+
+def _is_expired(upload_session: UploadSession) -> bool:
+    expires_at = upload_session.expires_at
+    if expires_at.tzinfo is None:
+        # SQLite returns naive datetimes
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+def _session_response(upload_session: UploadSession) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        upload_id=upload_session.id,
+        mode=upload_session.mode,
+        customer_id=upload_session.customer_id,
+        document_type_id=upload_session.document_type_id,
+        file_name=upload_session.file_name,
+        file_size=upload_session.file_size,
+        received_size=upload_session.received_size,
+        status=upload_session.status,
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        expires_at=upload_session.expires_at
+    )
+
+
+def _get_upload_session(db: Session, upload_id: UUID, current_user: Principal) -> UploadSession:
+    """
+    Load an active upload session owned by the current user
+    """
+    upload_session = db.query(UploadSession).filter(
+        UploadSession.id == str(upload_id),
+        UploadSession.created_by == current_user.id
+    ).first()
+    if not upload_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+
+    if upload_session.status != "uploading":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is already {upload_session.status}"
+        )
+
+    if _is_expired(upload_session):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Upload session has expired"
+        )
+
+    # The staging file is the source of truth after a crash mid-chunk
+    if upload_session.mode != "chunked":
+        return upload_session
+    staged_size = storage_service.get_staged_size(upload_session.id)
+    if staged_size < upload_session.received_size:
+        upload_session.received_size = staged_size
+        db.commit()
+
+    return upload_session
+
+
+@router.post("", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    session_data: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("document.upload"))
+):
+    """
+    Start a resumable upload for a single file
+    """
+    doc_type = get_upload_document_type(db, session_data.customer_id, session_data.document_type_id)
+    validate_upload_file(doc_type, session_data.file_name, session_data.file_size)
+
+    upload_session = UploadSession(
+        customer_id=str(session_data.customer_id),
+        document_type_id=str(session_data.document_type_id),
+        file_name=session_data.file_name,
+        file_type=session_data.file_type,
+        file_size=session_data.file_size,
+        received_size=0,
+        status="uploading",
+        upload_source=session_data.upload_source,
+        note=session_data.note,
+        created_by=current_user.id,
+        expires_at=_session_expiry()
+    )
+    db.add(upload_session)
+    db.commit()
+    db.refresh(upload_session)
+
+    return _session_response(upload_session)
+
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    upload_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("document.upload"))
+):
+    """
+    Get the upload progress, used by clients to resume after a reconnect
+    """
+    upload_session = _get_upload_session(db, upload_id, current_user)
+    return _session_response(upload_session)
+
+
+@router.put("/{upload_id}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    upload_id: UUID,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of this chunk"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("document.upload"))
+):
+    """
+    Append a chunk (raw request body) to an upload session
+    The offset must equal the session's received size; on mismatch the current
+    offset is returned in the Upload-Offset header so the client can resume.
+    """
+    upload_session = _get_upload_session(db, upload_id, current_user)
+
+    if upload_session.mode != "chunked":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Direct upload sessions are uploaded to the presigned URL"
+        )
+
+    if offset != upload_session.received_size:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Offset mismatch, expected {upload_session.received_size}",
+            headers={"Upload-Offset": str(upload_session.received_size)}
+        )
+
+    if upload_session.is_complete:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="All bytes already received, finalize the upload"
+        )
+
+    max_bytes = min(settings.UPLOAD_MAX_CHUNK_SIZE, upload_session.file_size - offset)
+    try:
+        written = await storage_service.write_chunk(
+            upload_session.id,
+            offset,
+            request.stream(),
+            max_bytes
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+
+    # Optimistic update guards against a retried chunk racing the original request
+    updated = db.query(UploadSession).filter(
+        UploadSession.id == upload_session.id,
+        UploadSession.received_size == offset
+    ).update(
+        {
+            UploadSession.received_size: offset + written,
+            UploadSession.expires_at: _session_expiry(),
+        },
+        synchronize_session=False
+    )
+    db.commit()
+
+    if not updated:
+        db.refresh(upload_session)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Concurrent chunk upload detected",
+            headers={"Upload-Offset": str(upload_session.received_size)}
+        )
+
+    db.refresh(upload_session)
+    return _session_response(upload_session)
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    upload_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("document.upload"))
+):
+    """
+    Abort an upload session and discard received chunks
+    """
+    upload_session = _get_upload_session(db, upload_id, current_user)
+
+    upload_session.status = "aborted"
+    db.commit()
+
+    if upload_session.mode == "direct":
+        await storage_service.delete_file(upload_session.file_path)
+    else:
+        await storage_service.discard_staged_upload(upload_session.id)
+
+    return None
+
+
+@router.post("/direct", response_model=DirectUploadResponse, status_code=status.HTTP_201_CREATED)
+async def create_direct_upload(
+    upload_data: DirectUploadCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("document.upload"))
+):
+    """
+    Start an upload straight to object storage
+    Returns a presigned URL; file bytes never pass through the API.
+    """
+    if not storage_service.supports_direct_upload:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Direct upload is not available for storage type '{storage_service.storage_type}'"
+        )
+
+    doc_type = get_upload_document_type(db, upload_data.customer_id, upload_data.document_type_id)
+    validate_upload_file(doc_type, upload_data.file_name, upload_data.file_size)
+
+    file_path = storage_service.generate_file_path(
+        upload_data.file_name,
+        str(upload_data.customer_id),
+        doc_type.code
+    )
+    file_md5 = upload_data.file_md5.lower()
+    url, headers = storage_service.presign_upload(
+        file_path,
+        upload_data.file_type,
+        file_md5,
+        settings.DIRECT_UPLOAD_URL_EXPIRE_SECONDS
+    )
+
+    upload_session = UploadSession(
+        customer_id=str(upload_data.customer_id),
+        document_type_id=str(upload_data.document_type_id),
+        file_name=upload_data.file_name,
+        file_type=upload_data.file_type,
+        file_size=upload_data.file_size,
+        received_size=0,
+        status="uploading",
+        mode="direct",
+        file_path=file_path,
+        file_md5=file_md5,
+        upload_source=upload_data.upload_source,
+        note=upload_data.note,
+        created_by=current_user.id,
+        expires_at=_session_expiry()
+    )
+    db.add(upload_session)
+    db.commit()
+    db.refresh(upload_session)
+
+    return DirectUploadResponse(
+        **_session_response(upload_session).model_dump(),
+        upload_url=url,
+        upload_headers=headers
+    )
+
+
+async def _verify_direct_upload(upload_session: UploadSession) -> Tuple[Optional[str], bool]:
+    """
+    Check a directly uploaded object against what the client declared
+    Returns (error message or None, whether the stored object must be rejected)
+    """
+    stat = await storage_service.stat_object(upload_session.file_path)
+    if stat is None:
+        # Not uploaded (yet): keep the session open so the client can retry
+        return f"'{upload_session.file_name}' was not uploaded", False
+    if stat["size"] != upload_session.file_size:
+        return f"'{upload_session.file_name}' size {stat['size']} does not match declared {upload_session.file_size}", True
+    if upload_session.file_type and stat["content_type"] and stat["content_type"] != upload_session.file_type:
+        return f"'{upload_session.file_name}' type {stat['content_type']} does not match declared {upload_session.file_type}", True
+    if stat["md5"] != upload_session.file_md5:
+        return f"'{upload_session.file_name}' content hash does not match", True
+    return None, False
+
+
+@router.post("/finalize", response_model=List[FileUploadResponse], status_code=status.HTTP_201_CREATED)
+async def finalize_upload_sessions(
+    finalize_data: UploadFinalize,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("document.upload"))
+):
+    """
+    Create documents from completed upload sessions
+    All sessions must belong to the same customer and document type, and are
+    validated exactly like a multi-file form upload.
+    """
+    upload_sessions = [
+        _get_upload_session(db, upload_id, current_user)
+        for upload_id in dict.fromkeys(finalize_data.upload_ids)
+    ]
+
+    # Verify direct uploads against storage; a mismatching object is removed
+    direct_sessions = [s for s in upload_sessions if s.mode == "direct"]
+    results = await asyncio.gather(*(_verify_direct_upload(s) for s in direct_sessions))
+    errors = []
+    for upload_session, (error, reject) in zip(direct_sessions, results):
+        if error is None:
+            upload_session.received_size = upload_session.file_size
+            continue
+        errors.append(error)
+        if reject:
+            upload_session.status = "rejected"
+            await storage_service.delete_file(upload_session.file_path)
+    if errors:
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Upload verification failed: {'; '.join(errors)}"
+        )
+
+    incomplete = [s.file_name for s in upload_sessions if not s.is_complete]
+    if incomplete:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload not complete: {', '.join(incomplete)}"
+        )
+
+    targets = {(s.customer_id, s.document_type_id) for s in upload_sessions}
+    if len(targets) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="All uploads must belong to the same customer and document type"
+        )
+    customer_id, document_type_id = targets.pop()
+
+    doc_type = get_upload_document_type(db, customer_id, document_type_id)
+    validate_file_count(doc_type, len(upload_sessions))
+    for upload_session in upload_sessions:
+        validate_upload_file(doc_type, upload_session.file_name, upload_session.file_size)
+
+    documents = []
+    staged = []
+
+    try:
+        for upload_session in upload_sessions:
+            if upload_session.mode == "direct":
+                # Already in place in object storage
+                file_path = upload_session.file_path
+                file_md5 = upload_session.file_md5
+            else:
+                file_path = storage_service.generate_file_path(
+                    upload_session.file_name,
+                    customer_id,
+                    doc_type.code
+                )
+                file_md5 = await asyncio.to_thread(
+                    storage_service.compute_md5,
+                    storage_service.get_staging_path(upload_session.id)
+                )
+                await storage_service.stage_chunked_upload(upload_session.id, file_path)
+                staged.append((upload_session.id, file_path))
+
+            documents.append(build_document_record(
+                customer_id=customer_id,
+                document_type_id=document_type_id,
+                file_name=upload_session.file_name,
+                file_path=file_path,
+                file_size=upload_session.file_size,
+                file_type=upload_session.file_type,
+                upload_source=upload_session.upload_source,
+                uploaded_by=current_user.id,
+                note=upload_session.note,
+                file_md5=file_md5
+            ))
+            upload_session.status = "finalized"
+
+        db.add_all(documents)
+        db.flush()
+        uploaded_documents = [build_upload_response(document) for document in documents]
+        add_document_uploaded_events(db, str(customer_id), documents)
+        db.commit()
+    except Exception:
+        db.rollback()
+        # Put received bytes back so the client can retry finalize without re-uploading
+        for upload_id, file_path in staged:
+            await storage_service.unstage_chunked_upload(upload_id, file_path)
+        raise
+
+    await storage_service.promote_staged_files(
+        [file_path for _, file_path in staged],
+        concurrency=settings.UPLOAD_CONCURRENCY
+    )
+
+    wake_outbox_relay()
+    await audit_document_uploads(request, current_user.id, documents)
+
+    return uploaded_documents
@@ -0,0 +1,171 @@
+"""
+Webhook API Routes
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from ..database import get_db
+from ..models.webhook import WebhookSubscriptionRecord, WebhookDelivery
+from ..schemas.webhook import (
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionUpdate,
+    WebhookSubscriptionResponse,
+    WebhookDeliveryResponse,
+)
+from ..core.dependencies import require_permission
+from ..core.principals import Principal
+from ..core.webhooks import webhook_manager, requeue_dead_deliveries
+
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+
+def _get_subscription(db: Session, subscription_id: UUID) -> WebhookSubscriptionRecord:
+    subscription = db.query(WebhookSubscriptionRecord).filter(
+        WebhookSubscriptionRecord.id == subscription_id
+    ).first()
+    if not subscription:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook subscription not found"
+        )
+    return subscription
+
+
+def _check_url_available(db: Session, url: str, exclude_id: Optional[UUID] = None) -> None:
+    query = db.query(WebhookSubscriptionRecord.id).filter(WebhookSubscriptionRecord.url == url)
+    if exclude_id is not None:
+        query = query.filter(WebhookSubscriptionRecord.id != exclude_id)
+    if query.first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A webhook subscription for this URL already exists"
+        )
+
+
+@router.get("/", response_model=List[WebhookSubscriptionResponse])
+async def list_webhook_subscriptions(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("webhook.manage"))
+):
+    """
+    List webhook subscriptions
+    """
+    return db.query(WebhookSubscriptionRecord).order_by(WebhookSubscriptionRecord.created_at).all()
+
+
+@router.post("/", response_model=WebhookSubscriptionResponse, status_code=status.HTTP_201_CREATED)
+async def create_webhook_subscription(
+    subscription_data: WebhookSubscriptionCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("webhook.manage"))
+):
+    """
+    Create a webhook subscription
+    """
+    _check_url_available(db, subscription_data.url)
+
+    data = subscription_data.model_dump()
+    data["events"] = [event.value for event in subscription_data.events]
+    subscription = WebhookSubscriptionRecord(**data, created_by=current_user.id)
+    db.add(subscription)
+    db.commit()
+    db.refresh(subscription)
+
+    # Rebuild the event routing index on every worker
+    await webhook_manager.notify_changed()
+
+    return subscription
+
+
+@router.get("/deliveries", response_model=List[WebhookDeliveryResponse])
+async def list_webhook_deliveries(
+    delivery_status: Optional[str] = Query(None, alias="status", description="pending, delivering, delivered, dead"),
+    url: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("webhook.manage"))
+):
+    """
+    List recent webhook deliveries, newest first
+    """
+    query = db.query(WebhookDelivery)
+    if delivery_status:
+        query = query.filter(WebhookDelivery.status == delivery_status)
+    if url:
+        query = query.filter(WebhookDelivery.url == url)
+    return query.order_by(WebhookDelivery.created_at.desc()).limit(limit).all()
+
+
+@router.post("/deliveries/requeue", response_model=dict)
+async def requeue_webhook_deliveries(
+    url: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("webhook.manage"))
+):
+    """
+    Put dead-lettered deliveries back on the queue, optionally for one URL
+    """
+    count = requeue_dead_deliveries(db, url)
+    return {"requeued": count}
+
+
+@router.get("/{subscription_id}", response_model=WebhookSubscriptionResponse)
+async def get_webhook_subscription(
+    subscription_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("webhook.manage"))
+):
+    """
+    Get a webhook subscription
+    """
+    return _get_subscription(db, subscription_id)
+
+
+@router.put("/{subscription_id}", response_model=WebhookSubscriptionResponse)
+async def update_webhook_subscription(
+    subscription_id: UUID,
+    subscription_data: WebhookSubscriptionUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("webhook.manage"))
+):
+    """
+    Update a webhook subscription
+    """
+    subscription = _get_subscription(db, subscription_id)
+
+    update_data = subscription_data.model_dump(exclude_unset=True)
+    if "url" in update_data:
+        _check_url_available(db, update_data["url"], exclude_id=subscription_id)
+    if update_data.get("events") is not None:
+        update_data["events"] = [event.value for event in subscription_data.events]
+    for field, value in update_data.items():
+        setattr(subscription, field, value)
+
+    db.commit()
+    db.refresh(subscription)
+
+    await webhook_manager.notify_changed()
+
+    return subscription
+
+
+@router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_webhook_subscription(
+    subscription_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_permission("webhook.manage"))
+):
+    """
+    Delete a webhook subscription
+    Pending deliveries for its URL are dead-lettered by the dispatcher.
+    """
+    subscription = _get_subscription(db, subscription_id)
+    db.delete(subscription)
+    db.commit()
+
+    await webhook_manager.notify_changed()
+
+    return None
@@ -1,97 +1,403 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from typing import Dict, Set
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+import asyncio
 import json
 import logging
-from app.core.dependencies import get_current_user
-from app.models.user import User
+import os
+import sys
+import time
+from app.config import settings
+from app.core.assignments import has_customer_access
+from app.core.dependencies import require_permission
+from app.core.outbox import outbox_relay
+from app.core.principals import Principal, authenticate_token
+from app.core.pubsub import broker, json_default
+from app.core.webhooks import WebhookEvent
+from app.database import SessionLocal
+from app.models.customer import Customer
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+CUSTOMER_CHANNEL = "ws:customer:"
+USER_CHANNEL = "ws:user:"
+
+# 只关心最新状态的消息类型：队列积压时同一对象只保留最新一条
+# 值为 (合并键名, 区分对象的消息字段)；在线状态按客户和用户区分，不同用户的进出互不覆盖
+COALESCE_KEYS = {
+    "user_joined": ("presence", ("customer_id", "user_id")),
+    "user_left": ("presence", ("customer_id", "user_id")),
+    "customer_updated": ("customer_updated", ("customer_id",)),
+}
+
+
+def serialize_message(message: dict) -> str:
+    """消息只序列化一次，供所有连接共享"""
+    return json.dumps(message, ensure_ascii=False, default=json_default)
+
+
+def current_rss_bytes() -> Optional[int]:
+    """当前进程常驻内存（字节），无法获取时返回 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return None
+    # 无 /proc 时退化为峰值内存（macOS 单位为字节，Linux 为 KB）
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def coalesce_key(message: dict) -> Optional[str]:
+    spec = COALESCE_KEYS.get(message.get("type"))
+    if spec is None:
+        return None
+    name, fields = spec
+    return ":".join([name] + [str(message.get(field)) for field in fields])
+
+
+class ClientConnection:
+    """
+    单个WebSocket连接的发送端
+    消息进入有界队列，由独立的写任务发送，慢客户端不会阻塞广播方；
+    队列满时合并同类状态消息或丢弃最旧消息，持续跟不上的连接会被断开
+    """
+    
+    def __init__(self, websocket: WebSocket, customer_id: Optional[str], user_id: str):
+        self.websocket = websocket
+        self.customer_id = customer_id
+        self.user_id = user_id
+        self.connected_at = time.time()
+        self.last_seen = time.monotonic()
+        self.dropped = 0
+        # 上次清空队列以来丢弃的消息数，用于判断是否持续跟不上
+        self._backlog_drops = 0
+        self._queue: Deque[Tuple[Optional[str], str]] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._writer: Optional[asyncio.Task] = None
+    
+    def start(self, on_close):
+        self._writer = asyncio.create_task(self._write_loop(on_close))
+    
+    def enqueue(self, text: str, key: Optional[str] = None):
+        """放入发送队列，不等待发送完成"""
+        if self._closed:
+            return
+        if key is not None:
+            for index, (queued_key, _) in enumerate(self._queue):
+                if queued_key == key:
+                    # 尚未发送的旧状态直接被新状态替换
+                    self._queue[index] = (key, text)
+                    return
+        if len(self._queue) >= settings.WS_SEND_QUEUE_SIZE:
+            self._queue.popleft()
+            self.dropped += 1
+            self._backlog_drops += 1
+        self._queue.append((key, text))
+        self._ready.set()
+    
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+    
+    @property
+    def is_slow(self) -> bool:
+        return self._backlog_drops >= settings.WS_MAX_DROPPED_MESSAGES
+    
+    async def _write_loop(self, on_close):
+        try:
+            while not self._closed:
+                if not self._queue:
+                    self._backlog_drops = 0
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                _, text = self._queue.popleft()
+                await asyncio.wait_for(
+                    self.websocket.send_text(text),
+                    timeout=settings.WS_SEND_TIMEOUT_SECONDS
+                )
+                if self.is_slow:
+                    logger.warning(
+                        f"Closing slow WebSocket consumer: customer={self.customer_id}, "
+                        f"user={self.user_id}, dropped={self.dropped}"
+                    )
+                    await self.websocket.close(code=1013, reason="Too slow")
+                    break
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            # 发送超时或出错：关闭底层连接，客户端收到关闭帧后可以重连
+            logger.error(f"Error sending message: {e}")
+            await self._close_socket(code=1011)
+        on_close(self)
+    
+    async def _close_socket(self, code: int):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), timeout=settings.WS_SEND_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.debug(f"Error closing WebSocket: {e}")
+    
+    def close(self):
+        self._closed = True
+        self._queue.clear()
+        if self._writer and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+
 class ConnectionManager:
-    """WebSocket连接管理器"""
+    """
+    WebSocket连接管理器
+    连接保存在本进程内；广播先投递给本进程的连接，再经 pub/sub 转发给其他 worker
+    """
     
     def __init__(self):
-        # 存储每个客户的活跃连接: {customer_id: Set[WebSocket]}
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
-        # 存储每个用户的连接: {user_id: Set[WebSocket]}
-        self.user_connections: Dict[str, Set[WebSocket]] = {}
+        # 存储每个客户的活跃连接: {customer_id: Set[ClientConnection]}
+        self.active_connections: Dict[str, Set[ClientConnection]] = {}
+        # 存储每个用户的连接: {user_id: Set[ClientConnection]}
+        self.user_connections: Dict[str, Set[ClientConnection]] = {}
+        # WebSocket -> 发送端
+        self.clients: Dict[WebSocket, ClientConnection] = {}
     
-    async def connect(self, websocket: WebSocket, customer_id: str, user_id: str):
-        """接受WebSocket连接"""
+    def check_limits(self, customer_id: Optional[str], user_id: str) -> Optional[str]:
+        """检查连接数限制，超限时返回拒绝原因"""
+        if len(self.clients) >= settings.WS_MAX_CONNECTIONS:
+            return "Too many connections on this server"
+        if len(self.user_connections.get(user_id, ())) >= settings.WS_MAX_CONNECTIONS_PER_USER:
+            return "Too many connections for this user"
+        if customer_id and len(self.active_connections.get(customer_id, ())) >= settings.WS_MAX_CONNECTIONS_PER_CUSTOMER:
+            return "Too many connections for this customer"
+        return None
+    
+    async def connect(self, websocket: WebSocket, customer_id: Optional[str], user_id: str) -> bool:
+        """
+        接受WebSocket连接，超出连接数限制时拒绝并返回 False
+        customer_id 为空表示只接收个人通知的连接
+        """
+        reason = self.check_limits(customer_id, user_id)
+        if reason:
+            logger.warning(f"WebSocket rejected: customer={customer_id}, user={user_id}: {reason}")
+            await websocket.close(code=1013, reason=reason)
+            return False
+        
         await websocket.accept()
+        client = ClientConnection(websocket, customer_id, user_id)
+        self.clients[websocket] = client
         
         # 添加到客户连接池
-        if customer_id not in self.active_connections:
-            self.active_connections[customer_id] = set()
-        self.active_connections[customer_id].add(websocket)
+        if customer_id:
+            self.active_connections.setdefault(customer_id, set()).add(client)
         
         # 添加到用户连接池
         if user_id not in self.user_connections:
             self.user_connections[user_id] = set()
-        self.user_connections[user_id].add(websocket)
+        self.user_connections[user_id].add(client)
         
+        client.start(self._remove_client)
         logger.info(f"WebSocket connected: customer={customer_id}, user={user_id}")
+        return True
+    
+    def touch(self, websocket: WebSocket):
+        """记录收到客户端消息的时间"""
+        client = self.clients.get(websocket)
+        if client:
+            client.last_seen = time.monotonic()
     
-    def disconnect(self, websocket: WebSocket, customer_id: str, user_id: str):
+    def disconnect(self, websocket: WebSocket, customer_id: Optional[str], user_id: str):
         """断开WebSocket连接"""
+        client = self.clients.get(websocket)
+        if client:
+            self._remove_client(client)
+        logger.info(f"WebSocket disconnected: customer={customer_id}, user={user_id}")
+    
+    def _remove_client(self, client: ClientConnection):
+        client.close()
+        self.clients.pop(client.websocket, None)
+        
         # 从客户连接池移除
-        if customer_id in self.active_connections:
-            self.active_connections[customer_id].discard(websocket)
-            if not self.active_connections[customer_id]:
-                del self.active_connections[customer_id]
+        if client.customer_id in self.active_connections:
+            self.active_connections[client.customer_id].discard(client)
+            if not self.active_connections[client.customer_id]:
+                del self.active_connections[client.customer_id]
         
         # 从用户连接池移除
-        if user_id in self.user_connections:
-            self.user_connections[user_id].discard(websocket)
-            if not self.user_connections[user_id]:
-                del self.user_connections[user_id]
-        
-        logger.info(f"WebSocket disconnected: customer={customer_id}, user={user_id}")
+        if client.user_id in self.user_connections:
+            self.user_connections[client.user_id].discard(client)
+            if not self.user_connections[client.user_id]:
+                del self.user_connections[client.user_id]
     
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """发送个人消息"""
-        await websocket.send_json(message)
+        client = self.clients.get(websocket)
+        if client:
+            client.enqueue(serialize_message(message))
     
     async def broadcast_to_customer(self, customer_id: str, message: dict, exclude: WebSocket = None):
-        """向关注某个客户的所有连接广播消息"""
-        if customer_id in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[customer_id]:
-                if connection != exclude:
-                    try:
-                        await connection.send_json(message)
-                    except Exception as e:
-                        logger.error(f"Error sending message: {e}")
-                        disconnected.add(connection)
-            
-            # 清理断开的连接
-            for connection in disconnected:
-                self.active_connections[customer_id].discard(connection)
+        """向关注某个客户的所有连接广播消息（跨 worker）"""
+        await self.send_to_local_customer(customer_id, message, exclude=exclude)
+        await broker.publish(CUSTOMER_CHANNEL + customer_id, message, local=False)
     
     async def broadcast_to_user(self, user_id: str, message: dict):
-        """向某个用户的所有连接广播消息"""
-        if user_id in self.user_connections:
-            disconnected = set()
-            for connection in self.user_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message: {e}")
-                    disconnected.add(connection)
-            
-            # 清理断开的连接
-            for connection in disconnected:
-                self.user_connections[user_id].discard(connection)
+        """向某个用户的所有连接广播消息（跨 worker）"""
+        await self.send_to_local_user(user_id, message)
+        await broker.publish(USER_CHANNEL + user_id, message, local=False)
+    
+    async def send_to_local_customer(self, customer_id: str, message: dict, exclude: WebSocket = None):
+        """向本进程内关注某个客户的连接发送消息"""
+        clients = self.active_connections.get(customer_id)
+        if not clients:
+            return
+        text, key = serialize_message(message), coalesce_key(message)
+        for client in clients:
+            if client.websocket is not exclude:
+                client.enqueue(text, key)
+    
+    async def send_to_local_user(self, user_id: str, message: dict):
+        """向本进程内某个用户的连接发送消息"""
+        clients = self.user_connections.get(user_id)
+        if not clients:
+            return
+        text, key = serialize_message(message), coalesce_key(message)
+        for client in clients:
+            client.enqueue(text, key)
+    
+    async def on_broker_message(self, channel: str, message: dict):
+        """处理其他 worker 转发的广播"""
+        if channel.startswith(CUSTOMER_CHANNEL):
+            await self.send_to_local_customer(channel[len(CUSTOMER_CHANNEL):], message)
+        elif channel.startswith(USER_CHANNEL):
+            await self.send_to_local_user(channel[len(USER_CHANNEL):], message)
     
     def get_customer_connection_count(self, customer_id: str) -> int:
         """获取某个客户的连接数"""
         return len(self.active_connections.get(customer_id, set()))
+    
+    def get_stats(self) -> dict:
+        """本 worker 的连接统计"""
+        return {
+            "pid": os.getpid(),
+            "connections": len(self.clients),
+            "users": len(self.user_connections),
+            "customers": len(self.active_connections),
+            "queued_messages": sum(client.queued for client in self.clients.values()),
+            "dropped_messages": sum(client.dropped for client in self.clients.values()),
+            "rss_bytes": current_rss_bytes(),
+        }
+    
+    async def run_heartbeat(self):
+        """
+        后台任务：定期向所有连接发送 ping，并上报本 worker 的连接统计
+        空闲连接由各连接的接收循环按 WS_IDLE_TIMEOUT_SECONDS 断开
+        """
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL_SECONDS)
+            text = serialize_message({"type": "ping", "ts": int(time.time())})
+            for client in list(self.clients.values()):
+                # 未发出的旧 ping 直接被替换，不会在慢连接上堆积
+                client.enqueue(text, "ping")
+            try:
+                await broker.report_state("ws", self.get_stats())
+            except Exception as e:
+                logger.warning(f"Failed to report WebSocket stats: {e}")
 
 
 # 全局连接管理器实例
 manager = ConnectionManager()
+broker.subscribe("ws:", manager.on_broker_message)
+
+
+async def authenticate_websocket(websocket: WebSocket) -> Optional[Principal]:
+    """
+    校验查询参数中的token，失败时关闭连接并返回 None
+    """
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.close(code=1008, reason="Missing token")
+        return None
+    
+    principal = await asyncio.to_thread(authenticate_token, token)
+    if principal is None:
+        await websocket.close(code=1008, reason="Invalid token")
+        return None
+    return principal
+
+
+def can_access_customer(principal: Principal, customer_id: str) -> bool:
+    """
+    客户是否存在且当前用户有权查看（客服只能查看分配给自己的客户）
+    """
+    db = SessionLocal()
+    try:
+        if not db.query(Customer.id).filter(Customer.id == customer_id).first():
+            return False
+        return has_customer_access(db, principal.id, principal.role, customer_id)
+    finally:
+        db.close()
+
+
+async def iter_client_messages(websocket: WebSocket):
+    """
+    逐条读取客户端消息，心跳消息在此处理不向上返回
+    超过空闲时间未收到任何消息（含 pong）时抛出 asyncio.TimeoutError
+    """
+    while True:
+        data = await asyncio.wait_for(
+            websocket.receive_text(),
+            timeout=settings.WS_IDLE_TIMEOUT_SECONDS
+        )
+        manager.touch(websocket)
+        message_data = json.loads(data)
+        
+        if isinstance(message_data, dict) and message_data.get("type") in ("ping", "pong"):
+            if message_data["type"] == "ping":
+                await manager.send_personal_message({"type": "pong"}, websocket)
+            continue
+        yield message_data
+
+
+async def close_idle(websocket: WebSocket):
+    try:
+        await websocket.close(code=1001, reason="Idle timeout")
+    except Exception:
+        # 半开连接，关闭帧发不出去
+        pass
+
+
+@router.websocket("/ws")
+async def personal_websocket_endpoint(websocket: WebSocket):
+    """
+    个人通知WebSocket端点（审核结果、客户分配等）
+    客户端连接时需要提供token作为查询参数: /ws?token=xxx
+    """
+    principal = await authenticate_websocket(websocket)
+    if principal is None:
+        return
+    user_id = principal.id
+    
+    if not await manager.connect(websocket, None, user_id):
+        return
+    
+    try:
+        await manager.send_personal_message({"type": "connected", "user_id": user_id}, websocket)
+        # 个人通道只下发消息，客户端消息仅用于保活
+        async for _ in iter_client_messages(websocket):
+            pass
+    except asyncio.TimeoutError:
+        logger.info(f"Closing idle WebSocket: user={user_id}")
+        await close_idle(websocket)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"WebSocket error: {e}")
+    manager.disconnect(websocket, None, user_id)
 
 
 @router.websocket("/ws/{customer_id}")
@@ -103,23 +409,17 @@ async def websocket_endpoint(
     WebSocket端点
     客户端连接时需要提供token作为查询参数: /ws/{customer_id}?token=xxx
     """
-    # 从查询参数获取token
-    token = websocket.query_params.get("token")
-    if not token:
-        await websocket.close(code=1008, reason="Missing token")
+    principal = await authenticate_websocket(websocket)
+    if principal is None:
         return
+    user_id = principal.id
     
-    # 验证token并获取用户信息
-    try:
-        # 这里简化处理，实际应该验证JWT token
-        # user = await get_current_user_from_token(token)
-        # 暂时使用一个模拟的user_id
-        user_id = "temp_user"  # TODO: 从token解析真实user_id
-    except Exception as e:
-        await websocket.close(code=1008, reason="Invalid token")
+    if not await asyncio.to_thread(can_access_customer, principal, customer_id):
+        await websocket.close(code=1008, reason="You don't have access to this customer")
         return
     
-    await manager.connect(websocket, customer_id, user_id)
+    if not await manager.connect(websocket, customer_id, user_id):
+        return
     
     try:
         # 发送欢迎消息
@@ -134,28 +434,32 @@ async def websocket_endpoint(
         await manager.broadcast_to_customer(customer_id, {
             "type": "user_joined",
             "customer_id": customer_id,
+            "user_id": user_id,
+            "username": principal.username,
             "connection_count": manager.get_customer_connection_count(customer_id)
         }, exclude=websocket)
         
         # 保持连接并处理消息
-        while True:
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
-            
+        async for message_data in iter_client_messages(websocket):
             # 广播消息给其他连接
             await manager.broadcast_to_customer(customer_id, {
                 "type": "message",
                 "data": message_data,
-                "customer_id": customer_id
+                "customer_id": customer_id,
+                "user_id": user_id
             }, exclude=websocket)
             
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, asyncio.TimeoutError) as e:
+        if isinstance(e, asyncio.TimeoutError):
+            logger.info(f"Closing idle WebSocket: customer={customer_id}, user={user_id}")
+            await close_idle(websocket)
         manager.disconnect(websocket, customer_id, user_id)
         
         # 通知其他连接有用户离开
         await manager.broadcast_to_customer(customer_id, {
             "type": "user_left",
             "customer_id": customer_id,
+            "user_id": user_id,
             "connection_count": manager.get_customer_connection_count(customer_id)
         })
     except Exception as e:
@@ -163,6 +467,24 @@ async def websocket_endpoint(
         manager.disconnect(websocket, customer_id, user_id)
 
 
+@router.get("/ws/stats", response_model=dict)
+async def websocket_stats(
+    current_user: Principal = Depends(require_permission("system.monitor"))
+):
+    """
+    Live WebSocket connection counts and memory per worker
+    Workers report every WS_HEARTBEAT_INTERVAL_SECONDS; with Redis the
+    numbers cover every worker and host, otherwise only this process.
+    """
+    await broker.report_state("ws", manager.get_stats())
+    workers = await broker.collect_states("ws", max_age=settings.WS_HEARTBEAT_INTERVAL_SECONDS * 3)
+    return {
+        "backend": broker.backend,
+        "total_connections": sum(state["connections"] for state in workers.values()),
+        "workers": [dict(state, worker_id=worker_id) for worker_id, state in sorted(workers.items())],
+    }
+
+
 # 辅助函数：在其他API中调用以广播事件
 async def broadcast_document_uploaded(customer_id: str, document_data: dict):
     """广播文档上传事件"""
@@ -182,6 +504,33 @@ async def broadcast_document_deleted(customer_id: str, document_id: str):
     })
 
 
+async def broadcast_document_reviewed(customer_id: str, document_data: dict):
+    """广播文档审核事件"""
+    await manager.broadcast_to_customer(customer_id, {
+        "type": "document_reviewed",
+        "customer_id": customer_id,
+        "data": document_data
+    })
+
+
+async def broadcast_documents_reviewed(customer_id: str, review_data: dict):
+    """广播批量审核事件（一批中同一客户的文档合并为一条）"""
+    await manager.broadcast_to_customer(customer_id, {
+        "type": "documents_reviewed",
+        "customer_id": customer_id,
+        "data": review_data
+    })
+
+
+async def notify_user(user_id: str, event: str, data: dict):
+    """向指定用户推送个人通知，只送达该用户自己的连接"""
+    await manager.broadcast_to_user(user_id, {
+        "type": "notification",
+        "event": event,
+        "data": data
+    })
+
+
 async def broadcast_customer_updated(customer_id: str, customer_data: dict):
     """广播客户信息更新事件"""
     await manager.broadcast_to_customer(customer_id, {
@@ -190,3 +539,48 @@ async def broadcast_customer_updated(customer_id: str, customer_data: dict):
         "data": customer_data
     })
 
+
+
+# 发件箱事件提交后推送给 WebSocket 订阅者
+async def _on_document_event(event: str, customer_id: Optional[str], data: dict):
+    if event == WebhookEvent.DOCUMENT_UPLOADED.value:
+        await broadcast_document_uploaded(customer_id, data)
+    elif event == WebhookEvent.DOCUMENT_DELETED.value:
+        await broadcast_document_deleted(customer_id, data["id"])
+    else:
+        await broadcast_document_reviewed(customer_id, data)
+        # 直接通知上传人，即使其未订阅该客户
+        if data.get("uploaded_by") and data["uploaded_by"] != data.get("reviewed_by"):
+            await notify_user(data["uploaded_by"], "document_reviewed", data)
+
+
+async def _on_documents_reviewed(event: str, customer_id: Optional[str], data: dict):
+    await broadcast_documents_reviewed(customer_id, data)
+    # 每个上传人只通知一次
+    document_ids_by_uploader = {}
+    for document in data.get("documents", []):
+        document_ids_by_uploader.setdefault(document["uploaded_by"], []).append(document["id"])
+    for uploaded_by, document_ids in document_ids_by_uploader.items():
+        if uploaded_by and uploaded_by != data.get("reviewed_by"):
+            await notify_user(uploaded_by, "documents_reviewed", {
+                "customer_id": customer_id,
+                "status": data.get("status"),
+                "document_ids": document_ids,
+            })
+
+
+async def _on_customer_updated(event: str, customer_id: Optional[str], data: dict):
+    await broadcast_customer_updated(customer_id, data)
+
+
+outbox_relay.subscribe(
+    (
+        WebhookEvent.DOCUMENT_UPLOADED,
+        WebhookEvent.DOCUMENT_DELETED,
+        WebhookEvent.DOCUMENT_APPROVED,
+        WebhookEvent.DOCUMENT_REJECTED,
+    ),
+    _on_document_event
+)
+outbox_relay.subscribe((WebhookEvent.DOCUMENTS_REVIEWED,), _on_documents_reviewed)
+outbox_relay.subscribe((WebhookEvent.CUSTOMER_UPDATED,), _on_customer_updated)
@@ -17,14 +17,50 @@ class Settings(BaseSettings):
     
     # 数据库配置（从环境变量读取，必需）
     DATABASE_URL: str
+    # 启动时的表结构处理：auto（DEBUG 时为 create，否则为 check）、
+    # check（只校验 alembic 版本，不执行 DDL）、create（空库时建表并标记为最新版本，开发用）、off
+    DB_SCHEMA_MODE: str = "auto"
+    DB_SCHEMA_STRICT: bool = True  # check 模式下迁移版本落后时拒绝启动
+    # 连接池（PostgreSQL 与 SQLite 文件库）
+    DB_POOL_SIZE: int = 10  # 常驻连接数，多 worker 时总连接数 = worker 数 ×（池大小 + 溢出）
+    DB_MAX_OVERFLOW: int = 20  # 高峰时允许额外创建的连接数
+    DB_POOL_TIMEOUT: float = 30.0  # 等待空闲连接的最长秒数，超时抛出错误
+    DB_POOL_RECYCLE: int = 1800  # 连接存活超过该秒数后重建，避免被数据库或代理断开
+    DB_POOL_PRE_PING: bool = True  # 借出前探测连接是否可用
+    DB_POOL_SLOW_HOLD_MS: float = 1000.0  # 连接占用超过该值计为慢占用（长时间占用是请求等待连接的主要原因）
+    DB_CONNECT_TIMEOUT: int = 10  # PostgreSQL 建立连接超时（秒）
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # PostgreSQL 单条语句超时，0 表示不限制
+    # SQLite 连接参数（每个新连接执行 PRAGMA）
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL 下读写互不阻塞
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 模式下 NORMAL 足够安全且明显减少 fsync
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 写锁被占用时的等待时间
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射读取的大小（字节），0 表示关闭
+    SQLITE_CACHE_SIZE: int = -65536  # 页缓存，负数表示 KiB（64 MiB）
 
     # Redis配置（从环境变量读取，可选）
     REDIS_URL: str = "redis://localhost:6379/0"
+    # 跨 worker 消息分发：auto（Redis 不可用时退化为进程内）、redis、memory
+    PUBSUB_BACKEND: str = "auto"
+    PUBSUB_CHANNEL_PREFIX: str = "cdc:"
     
     # JWT配置
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # 访问令牌携带角色声明，有效期宜短
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7  # 刷新令牌有效期，每次刷新轮换
+    # 密码哈希（argon2 参数参考 OWASP 建议：19 MiB 内存、2 次迭代、单线程）
+    PASSWORD_HASH_SCHEME: str = "argon2"  # argon2 或 bcrypt
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 19456  # KiB
+    ARGON2_PARALLELISM: int = 1
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = os.cpu_count() or 1  # 哈希线程池大小，默认每核一个
+    # 长连接身份解析缓存（WebSocket 鉴权）
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    # 客服已分配客户集合缓存（客户访问范围校验）
+    ASSIGNMENT_CACHE_TTL_SECONDS: int = 60
+    ASSIGNMENT_CACHE_SIZE: int = 10000
     
     # CORS配置
     CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:3000"]
@@ -33,6 +69,8 @@ class Settings(BaseSettings):
     STORAGE_TYPE: str = "local"  # local, oss, minio
     # Use absolute path based on project root for cross-platform compatibility
     UPLOAD_DIR: str = str(Path(__file__).parent.parent.parent / "uploads")
+    # 断点续传分片暂存目录（不对外提供静态访问）
+    UPLOAD_STAGING_DIR: str = str(Path(__file__).parent.parent.parent / "uploads_staging")
     
     # 阿里云OSS配置
     OSS_ACCESS_KEY_ID: str = ""
@@ -50,6 +88,74 @@ class Settings(BaseSettings):
     # 文件上传限制
     MAX_FILE_SIZE: int = 20971520  # 20MB
     ALLOWED_EXTENSIONS: List[str] = ["jpg", "jpeg", "png", "pdf", "doc", "docx"]
+    UPLOAD_CONCURRENCY: int = 4  # 单次多文件上传的并发处理数
+
+    # 上传文件静态服务：路径含UUID且不可变，可长期缓存
+    FILES_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+    FILES_ETAG_CACHE_SIZE: int = 10000  # 文件MD5查询的LRU缓存条数
+    # 上传后生成 .gz 预压缩版本的文件类型（图片、PDF、docx 本身已压缩）
+    PRECOMPRESS_EXTENSIONS: List[str] = ["doc", "txt", "csv", "xml", "json", "svg", "bmp", "tif", "tiff"]
+
+    # 断点续传配置
+    UPLOAD_CHUNK_SIZE: int = 5242880  # 建议分片大小 5MB
+    UPLOAD_MAX_CHUNK_SIZE: int = 10485760  # 单个分片上限 10MB
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # 上传会话有效期
+    DIRECT_UPLOAD_URL_EXPIRE_SECONDS: int = 900  # 对象存储直传预签名URL有效期
+
+    # WebSocket 发送队列：慢客户端不阻塞广播
+    WS_SEND_QUEUE_SIZE: int = 100  # 每个连接待发送消息上限，满时丢弃最旧消息
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0  # 单条消息发送超时，超时断开连接
+    WS_MAX_DROPPED_MESSAGES: int = 500  # 队列清空前丢弃达到该数量视为慢客户端并断开
+    # WebSocket 心跳与连接限制（连接数限制按 worker 计算）
+    WS_HEARTBEAT_INTERVAL_SECONDS: int = 25  # 服务端 ping 间隔
+    WS_IDLE_TIMEOUT_SECONDS: int = 60  # 超过该时间未收到客户端消息（含 pong）则断开
+    WS_MAX_CONNECTIONS: int = 5000
+    WS_MAX_CONNECTIONS_PER_USER: int = 10
+    WS_MAX_CONNECTIONS_PER_CUSTOMER: int = 200
+
+    # Webhook 投递队列
+    WEBHOOK_DISPATCHER_ENABLED: bool = True  # 是否在本进程运行后台分发器
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = 5.0  # 无新事件时轮询队列的间隔
+    WEBHOOK_DISPATCH_BATCH_SIZE: int = 100  # 每次领取的投递记录数
+    WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    WEBHOOK_HTTP2: bool = True  # 安装了 h2 时使用 HTTP/2
+    WEBHOOK_MAX_CONNECTIONS: int = 100  # 共享客户端连接池大小
+    WEBHOOK_MAX_CONNECTIONS_PER_HOST: int = 10  # 同一主机的并发请求上限
+    WEBHOOK_KEEPALIVE_SECONDS: float = 60.0  # 空闲连接保活时间
+    WEBHOOK_MAX_ATTEMPTS: int = 8  # 超过后转为死信
+    WEBHOOK_RETRY_BASE_SECONDS: int = 10  # 指数退避初始间隔
+    WEBHOOK_RETRY_MAX_SECONDS: int = 3600  # 退避间隔上限
+    WEBHOOK_CLAIM_LEASE_SECONDS: int = 120  # 领取租约，worker 崩溃后到期重新投递
+    WEBHOOK_MAX_CONCURRENCY_PER_SUBSCRIBER: int = 4  # 每个订阅地址的并发请求数
+    WEBHOOK_BATCH_MAX_EVENTS: int = 50  # 批量订阅单次 POST 的最大事件数
+    WEBHOOK_DELIVERY_RETENTION_DAYS: int = 7  # 已送达记录保留天数
+
+    # 事务性发件箱
+    OUTBOX_RELAY_ENABLED: bool = True  # 是否在本进程运行发件箱中继
+    OUTBOX_BATCH_SIZE: int = 200  # 每次转发的事件数
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0  # 无新事件时轮询发件箱的间隔
+    OUTBOX_GAP_TIMEOUT_SECONDS: float = 5.0  # id 空洞（可能是未提交的事务）最长等待时间，超时视为已回滚
+    OUTBOX_RETENTION_DAYS: int = 3  # 已处理事件保留天数
+
+    # 审计日志（进程内攒批写入）
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_QUEUE_SIZE: int = 10000  # 待写入记录上限，超过后请求等待
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 0.5  # 队列满时的最长等待，超时后由请求直接写入
+    AUDIT_DROP_WHEN_FULL: bool = False  # 为 True 时超时后丢弃该记录（不保证审计记录完整）
+    AUDIT_BATCH_SIZE: int = 500  # 单次批量插入的记录数
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0  # 未凑满一批时的最长等待
+    AUDIT_WRITE_ATTEMPTS: int = 3  # 写入失败重试次数，之后丢弃该批并记录错误
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 2  # PostgreSQL 预先创建的月分区数
+    AUDIT_RETENTION_MONTHS: int = 12  # 在线保留的月数，更早的月表归档后删除
+    AUDIT_ARCHIVE_ENABLED: bool = True  # 删除前是否归档为 gzip 压缩的 JSON Lines
+    AUDIT_ARCHIVE_DIR: str = "./audit_archive"
+    AUDIT_MAINTENANCE_INTERVAL_HOURS: float = 24  # 分区维护间隔，0 表示不在后台运行
+    AUDIT_QUERY_MAX_DAYS: int = 93  # 审计日志查询的最大时间跨度
+
+    # 存储对账（清理孤儿文件）配置
+    STORAGE_RECONCILE_INTERVAL_MINUTES: int = 0  # 后台对账间隔，0 表示不启用
+    STORAGE_RECONCILE_GRACE_SECONDS: int = 3600  # 新于该时间的文件不视为孤儿，避免误删进行中的上传
+    STORAGE_RECONCILE_BATCH_SIZE: int = 500
     
     # 日志配置
     LOG_LEVEL: str = "INFO"
@@ -0,0 +1,96 @@
+"""
+客户分配范围
+客服只能访问分配给自己的客户。按用户缓存已分配客户ID集合，
+访问校验为集合查找；分配变更后经 pub/sub 通知所有 worker 清除缓存。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.pubsub import broker
+from app.models.customer import CustomerAssignment
+
+# 访问范围受分配限制的角色
+SCOPED_ROLES = frozenset({"customer_service"})
+
+
+class AssignmentCache:
+    """用户ID -> 已分配客户ID集合 的 TTL + LRU 缓存"""
+
+    def __init__(self, ttl_seconds: int, maxsize: int):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, Tuple[float, FrozenSet[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[FrozenSet[str]]:
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+            expires_at, customer_ids = item
+            if expires_at < time.monotonic():
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return customer_ids
+
+    def put(self, user_id: str, customer_ids: FrozenSet[str]) -> None:
+        with self._lock:
+            self._items[user_id] = (time.monotonic() + self.ttl_seconds, customer_ids)
+            self._items.move_to_end(user_id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._items.pop(user_id, None)
+
+
+assignment_cache = AssignmentCache(settings.ASSIGNMENT_CACHE_TTL_SECONDS, settings.ASSIGNMENT_CACHE_SIZE)
+
+ASSIGNMENT_CHANNEL = "assignments:invalidate"
+
+
+def assigned_customers_subquery(user_id: str):
+    """
+    用户已分配客户ID的子查询，用于 Customer.id.in_(...) 半连接
+    由 (user_id, customer_id) 唯一索引直接提供，无需回表
+    """
+    return select(CustomerAssignment.customer_id).where(CustomerAssignment.user_id == str(user_id))
+
+
+def get_assigned_customer_ids(db: Session, user_id: str) -> FrozenSet[str]:
+    """获取用户已分配的客户ID集合（优先读缓存）"""
+    user_id = str(user_id)
+    customer_ids = assignment_cache.get(user_id)
+    if customer_ids is None:
+        customer_ids = frozenset(db.scalars(assigned_customers_subquery(user_id)).all())
+        assignment_cache.put(user_id, customer_ids)
+    return customer_ids
+
+
+def has_customer_access(db: Session, user_id: str, role: str, customer_id: str) -> bool:
+    """用户是否可访问该客户（不校验客户是否存在）"""
+    if role not in SCOPED_ROLES:
+        return True
+    return str(customer_id) in get_assigned_customer_ids(db, user_id)
+
+
+async def invalidate_assignments(*user_ids: str) -> None:
+    """分配变更提交后调用，清除所有 worker 上这些用户的缓存"""
+    for user_id in user_ids:
+        await broker.publish(ASSIGNMENT_CHANNEL, {"user_id": str(user_id)})
+
+
+async def _on_assignments_invalidated(channel: str, message: dict) -> None:
+    if message.get("user_id"):
+        assignment_cache.invalidate(message["user_id"])
+
+
+broker.subscribe(ASSIGNMENT_CHANNEL, _on_assignments_invalidated)
@@ -0,0 +1,190 @@
+"""
+审计日志
+请求内只把记录放入进程内有界队列，不做同步插入；后台写入器按条数或时间阈值
+攒批，用一条批量 INSERT 写入 audit_logs。队列满时请求最多等待
+AUDIT_ENQUEUE_TIMEOUT_SECONDS，仍无空位则由请求直接写入该记录，写入失败时等待队列空位；
+只有开启 AUDIT_DROP_WHEN_FULL 时才丢弃并计数。关闭时写完队列中剩余记录。
+"""
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import insert
+
+from app.config import settings
+from app.core.pubsub import json_default
+from app.database import SessionLocal
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """
+    审计日志批量写入器
+    记录在入队时生成 id 与 created_at，写入延迟不影响记录的时间顺序
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.AUDIT_QUEUE_SIZE)
+        self._batch: List[Dict[str, Any]] = []
+        self.written = 0
+        self.written_inline = 0
+        self.dropped = 0
+        self.failed = 0
+
+    async def record(
+        self,
+        action: str,
+        user_id: Optional[str] = None,
+        customer_id: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None
+    ) -> bool:
+        """
+        记录一条审计日志（通常只入队，不等待写入）
+
+        Returns:
+            是否已入队或写入；只有开启 AUDIT_DROP_WHEN_FULL 且队列持续已满时返回 False
+        """
+        if not settings.AUDIT_LOG_ENABLED:
+            return False
+        row = {
+            "id": str(uuid.uuid4()),
+            "action": action,
+            "user_id": str(user_id) if user_id else None,
+            "customer_id": str(customer_id) if customer_id else None,
+            "details": json.loads(json.dumps(details, default=json_default)) if details else None,
+            "ip_address": ip_address,
+            "created_at": datetime.now(timezone.utc),
+        }
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except asyncio.QueueFull:
+            pass
+        # 背压：写入跟不上时让请求短暂等待，而不是无限占用内存
+        try:
+            await asyncio.wait_for(self._queue.put(row), timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS)
+            return True
+        except asyncio.TimeoutError:
+            pass
+        if settings.AUDIT_DROP_WHEN_FULL:
+            self.dropped += 1
+            logger.warning(f"Audit queue full, dropped {action} record ({self.dropped} dropped so far)")
+            return False
+        # 审计记录不能丢失：写入器跟不上时由请求直接写入
+        try:
+            await asyncio.to_thread(self._insert, [row])
+            self.written_inline += 1
+            return True
+        except Exception as e:
+            logger.error(f"Audit queue full and direct write failed, waiting for queue space: {e}")
+        await self._queue.put(row)
+        return True
+
+    async def run(self):
+        """后台任务：攒批并写入"""
+        while True:
+            await self._collect_batch()
+            await self._write_batch()
+
+    async def close(self) -> None:
+        """写完当前批次与队列中的剩余记录（应在取消 run 任务之后调用）"""
+        while not self._queue.empty():
+            self._batch.append(self._queue.get_nowait())
+        while self._batch:
+            await self._write_batch()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() + len(self._batch),
+            "written": self.written,
+            "written_inline": self.written_inline,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    async def _collect_batch(self) -> None:
+        """等待第一条记录，之后在 AUDIT_FLUSH_INTERVAL_SECONDS 内凑满 AUDIT_BATCH_SIZE 条"""
+        loop = asyncio.get_running_loop()
+        if not self._batch:
+            self._batch.append(await self._queue.get())
+        deadline = loop.time() + settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        while len(self._batch) < settings.AUDIT_BATCH_SIZE:
+            try:
+                self._batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                return
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                return
+
+    async def _write_batch(self) -> None:
+        # 先取出批次再写入：写入线程在任务取消后仍会完成，避免关闭时重复写入
+        batch = self._batch[:settings.AUDIT_BATCH_SIZE]
+        del self._batch[:len(batch)]
+        for attempt in range(1, settings.AUDIT_WRITE_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(self._insert, batch)
+                self.written += len(batch)
+                return
+            except Exception as e:
+                if attempt == settings.AUDIT_WRITE_ATTEMPTS:
+                    self.failed += len(batch)
+                    logger.error(f"Failed to write {len(batch)} audit records: {e}")
+                    return
+                try:
+                    await asyncio.sleep(min(2 ** attempt, 30))
+                except asyncio.CancelledError:
+                    # 关闭时放回批次，由 close 写入
+                    self._batch[:0] = batch
+                    raise
+
+    @staticmethod
+    def _insert(rows: List[Dict[str, Any]]) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(insert(AuditLog), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+audit_writer = AuditLogWriter()
+
+
+def client_ip(request: Optional[Request]) -> Optional[str]:
+    """请求来源地址"""
+    if request is None or request.client is None:
+        return None
+    return request.client.host
+
+
+async def audit(
+    request: Optional[Request],
+    action: str,
+    user_id: Optional[str] = None,
+    customer_id: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None
+) -> bool:
+    """记录一条来自请求的审计日志"""
+    return await audit_writer.record(
+        action,
+        user_id=user_id,
+        customer_id=customer_id,
+        details=details,
+        ip_address=client_ip(request)
+    )
@@ -1,6 +1,8 @@
 """
 FastAPI Dependencies
 """
+import asyncio
+from functools import lru_cache
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -11,6 +13,8 @@ from ..database import get_db
 from ..models.user import User
 from ..core.security import decode_access_token
 from ..core.permissions import check_permission
+from ..core.principals import Principal, authenticate_claims, authenticate_token
+from ..core.revocation import is_token_revoked
 
 
 security = HTTPBearer()
@@ -33,7 +37,7 @@ async def get_current_user(
         token = credentials.credentials
         payload = decode_access_token(token)
         user_id_str: str = payload.get("sub")
-        if user_id_str is None:
+        if user_id_str is None or is_token_revoked(payload):
             raise credentials_exception
         # user_id 现在是字符串，直接使用
         user_id = user_id_str
@@ -67,13 +71,27 @@ async def get_current_active_user(
     return current_user
 
 
+@lru_cache(maxsize=None)
 def require_permission(permission: str):
     """
     Dependency factory for permission checking
+    Authorizes from the access token's role claims; the user is only looked up
+    for tokens issued before claims existed or before a permission change.
+    One checker is shared per permission, so FastAPI also reuses its result
+    within a request.
     """
     async def permission_checker(
-        current_user: User = Depends(get_current_active_user)
-    ) -> User:
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ) -> Principal:
+        current_user = authenticate_claims(credentials.credentials)
+        if current_user is None:
+            current_user = await asyncio.to_thread(authenticate_token, credentials.credentials)
+        if current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
         if not check_permission(current_user.role, permission):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -84,6 +102,7 @@ def require_permission(permission: str):
     return permission_checker
 
 
+@lru_cache(maxsize=None)
 def require_role(role: str):
     """
     Dependency factory for role checking
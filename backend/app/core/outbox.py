@@ -0,0 +1,226 @@
+"""
+事务性发件箱
+路由在业务事务内调用 add_outbox_event 写入事件，随业务数据一起提交或回滚；
+后台中继按 id 顺序读取已提交的事件，在同一事务中生成 Webhook 投递记录并标记已处理，
+提交后再执行 WebSocket 推送等进程内处理器。
+
+投递保证：Webhook 至少一次，同一订阅下同一聚合（客户、产品）的事件按 id 顺序逐条投递，
+前一条送达或转为死信后才发送下一条；WebSocket 至多一次，按 id 顺序推送。
+id 在写入时分配，提交顺序可能不同：中继从已处理的最大 id 起按连续的 id 转发，
+遇到空洞（尚未提交的事务）时暂停，超过 OUTBOX_GAP_TIMEOUT_SECONDS 仍未出现视为已回滚；
+超时之后才提交的事件仍会转发，但排在已转发的事件之后。接收方应按 metadata.event_id 去重。
+PostgreSQL 上同一时刻只有一个中继在处理（事务级 advisory 锁）；
+SQLite 不支持行锁，标记已处理的条件更新保证同一事件只被一个中继转发。
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.pubsub import json_default
+from app.core.webhooks import WebhookEvent, webhook_dispatcher, webhook_manager
+from app.database import SessionLocal
+from app.models.outbox import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[str, Optional[str], Dict[str, Any]], Awaitable[None]]
+
+# 中继的 PostgreSQL advisory 锁编号
+RELAY_LOCK_ID = 0x6f757462
+
+
+def add_outbox_event(
+    db: Session,
+    event: WebhookEvent,
+    data: Dict[str, Any],
+    customer_id: Optional[str] = None
+) -> OutboxEvent:
+    """
+    在当前事务中写入领域事件（不提交）
+
+    Args:
+        db: 业务事务所在的数据库会话
+        event: 事件类型
+        data: 事件数据，时间与UUID会转换为字符串
+        customer_id: 关联客户
+    """
+    outbox_event = OutboxEvent(
+        event=event.value,
+        customer_id=str(customer_id) if customer_id else None,
+        payload=json.loads(json.dumps(data, default=json_default))
+    )
+    db.add(outbox_event)
+    return outbox_event
+
+
+def ordering_key(event: str, customer_id: Optional[str], payload: Dict[str, Any]) -> Optional[str]:
+    """事件所属聚合，作为 Webhook 投递的顺序键；批量分配等不属于单个聚合的事件返回 None"""
+    if customer_id:
+        return f"customer:{customer_id}"
+    if isinstance(payload, dict) and payload.get("id"):
+        return f"{event.split('.')[0]}:{payload['id']}"
+    return None
+
+
+class OutboxRelay:
+    """
+    发件箱中继
+    每个 worker 都可以运行中继：PostgreSQL 上未取得 advisory 锁的中继跳过本轮，
+    其他数据库上先以条件更新认领事件，认领不完整的批次回滚后重试。
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[OutboxHandler]] = {}
+        self._wakeup = asyncio.Event()
+        self._last_purge = 0.0
+        # id 空洞起点 -> 首次发现时间
+        self._gaps: Dict[int, float] = {}
+
+    def subscribe(self, events: Iterable[WebhookEvent], handler: OutboxHandler) -> None:
+        """注册事件提交后执行的进程内处理器（如 WebSocket 推送）"""
+        for event in events:
+            self._handlers.setdefault(event.value, []).append(handler)
+
+    def wake(self) -> None:
+        """有新事件提交时唤醒中继，无需等待下一次轮询"""
+        self._wakeup.set()
+
+    async def run(self):
+        """后台任务：持续转发已提交的事件"""
+        while True:
+            try:
+                processed = await self.relay_once()
+                if time.monotonic() - self._last_purge > 3600:
+                    self._last_purge = time.monotonic()
+                    await asyncio.to_thread(self._purge_processed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox relay failed: {e}")
+                processed = 0
+
+            if processed:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.OUTBOX_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def relay_once(self, limit: Optional[int] = None) -> int:
+        """
+        转发一批事件
+
+        Returns:
+            处理的事件数
+        """
+        events = await asyncio.to_thread(self._process_batch, limit or settings.OUTBOX_BATCH_SIZE)
+        if not events:
+            return 0
+
+        webhook_dispatcher.wake()
+        for event_id, event, customer_id, payload in events:
+            for handler in self._handlers.get(event, []):
+                try:
+                    await handler(event, customer_id, payload)
+                except Exception as e:
+                    logger.error(f"Outbox handler failed for event {event_id} ({event}): {e}")
+        return len(events)
+
+    def _process_batch(self, limit: int) -> list:
+        """在一个事务中认领一批事件、生成 Webhook 投递记录并标记已处理"""
+        db = SessionLocal()
+        try:
+            if db.get_bind().dialect.name == "postgresql" and not db.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": RELAY_LOCK_ID}
+            ):
+                # 其他 worker 的中继正在处理
+                db.rollback()
+                return []
+
+            rows = self._contiguous(db, db.query(OutboxEvent).filter(
+                OutboxEvent.processed_at.is_(None)
+            ).order_by(OutboxEvent.id).limit(limit).all())
+            if not rows:
+                db.rollback()
+                return []
+
+            # 先认领再生成投递记录：没有行锁时，并发的中继只有一个能标记成功
+            claimed = db.query(OutboxEvent).filter(
+                OutboxEvent.id.in_([row.id for row in rows]),
+                OutboxEvent.processed_at.is_(None)
+            ).update({OutboxEvent.processed_at: datetime.now(timezone.utc)}, synchronize_session=False)
+            if claimed != len(rows):
+                db.rollback()
+                return []
+
+            for row in rows:
+                webhook_manager.enqueue(
+                    db,
+                    WebhookEvent(row.event),
+                    row.payload,
+                    metadata={"event_id": row.id},
+                    timestamp=row.created_at,
+                    ordering_key=ordering_key(row.event, row.customer_id, row.payload),
+                    sequence=row.id
+                )
+            events = [(row.id, row.event, row.customer_id, row.payload) for row in rows]
+            db.commit()
+            return events
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _contiguous(self, db: Session, rows: List[OutboxEvent]) -> List[OutboxEvent]:
+        """
+        截取可按顺序转发的事件
+        已处理的最大 id 之后出现空洞时，只转发空洞之前的事件，等待空洞对应的事务提交
+        """
+        watermark = db.query(func.max(OutboxEvent.id)).filter(OutboxEvent.processed_at.isnot(None)).scalar()
+        expected = None if watermark is None else watermark + 1
+        now = time.monotonic()
+        ready = []
+        for row in rows:
+            if expected is not None and row.id > expected:
+                if now - self._gaps.setdefault(expected, now) < settings.OUTBOX_GAP_TIMEOUT_SECONDS:
+                    break
+                logger.warning(f"Outbox events {expected}-{row.id - 1} never committed; treating them as rolled back")
+            ready.append(row)
+            # 低于水位线的是空洞超时后才提交的事件，直接转发
+            expected = max(expected or 0, row.id + 1)
+        self._gaps = {gap: seen for gap, seen in self._gaps.items() if gap >= expected}
+        return ready
+
+    def _purge_processed(self) -> None:
+        """清理超过保留期的已处理事件"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+        db = SessionLocal()
+        try:
+            deleted = db.query(OutboxEvent).filter(
+                OutboxEvent.processed_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                logger.info(f"Purged {deleted} processed outbox events")
+        finally:
+            db.close()
+
+
+# 全局发件箱中继实例
+outbox_relay = OutboxRelay()
+
+
+def wake_outbox_relay() -> None:
+    """
+    业务事务提交（及提交后的收尾工作，如上传文件转正）完成后调用，立即转发事件
+    """
+    outbox_relay.wake()
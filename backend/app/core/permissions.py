@@ -1,8 +1,19 @@
 """
 权限管理系统
+角色权限在导入时预编译为 frozenset，鉴权为常数时间的集合查找；
+支持 "*"（全部权限）与 "document.*"（某一模块下全部权限）通配。
+角色权限可由 role_permissions 表覆盖，修改后经 pub/sub 通知所有 worker 重新加载。
 """
-from typing import List, Dict
+import asyncio
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional
 from fastapi import HTTPException, status
+from app.core.pubsub import broker
+
+logger = logging.getLogger(__name__)
 
 # 角色权限配置
 ROLE_PERMISSIONS: Dict[str, List[str]] = {
@@ -27,6 +38,72 @@ ROLE_PERMISSIONS: Dict[str, List[str]] = {
 }
 
 
+@dataclass(frozen=True)
+class CompiledRole:
+    """预编译的角色权限"""
+    permissions: FrozenSet[str]  # 原始权限（含通配）
+    wildcards: FrozenSet[str]  # 通配前缀，如 "document."
+    allow_all: bool
+    version: str
+
+    def allows(self, permission: str) -> bool:
+        if self.allow_all or permission in self.permissions:
+            return True
+        if not self.wildcards:
+            return False
+        # 逐级检查前缀：document.review.batch 依次匹配 document.、document.review.
+        index = permission.find(".")
+        while index != -1:
+            if permission[:index + 1] in self.wildcards:
+                return True
+            index = permission.find(".", index + 1)
+        return False
+
+
+def compile_role(role: str, permissions: Iterable[str]) -> CompiledRole:
+    """将角色权限列表编译为集合，版本号为排序后权限列表的摘要"""
+    permissions = frozenset(permissions)
+    digest = hashlib.sha256(f"{role}:{','.join(sorted(permissions))}".encode()).hexdigest()[:12]
+    return CompiledRole(
+        permissions=permissions,
+        wildcards=frozenset(p[:-1] for p in permissions if p.endswith(".*")),
+        allow_all="*" in permissions,
+        version=digest,
+    )
+
+
+class PermissionRegistry:
+    """
+    角色 -> 预编译权限
+    重新加载时整体替换映射，读取无需加锁
+    """
+
+    def __init__(self, defaults: Mapping[str, List[str]]):
+        self._defaults = {role: list(permissions) for role, permissions in defaults.items()}
+        self._roles: Dict[str, CompiledRole] = {}
+        self._lock = threading.Lock()
+        self.load({})
+
+    def load(self, overrides: Mapping[str, Iterable[str]]) -> None:
+        """以代码中的默认配置为基础，用数据库中配置的角色覆盖"""
+        merged = dict(self._defaults)
+        merged.update({role: list(permissions) for role, permissions in overrides.items()})
+        compiled = {role: compile_role(role, permissions) for role, permissions in merged.items()}
+        with self._lock:
+            self._roles = compiled
+
+    def get(self, role: str) -> Optional[CompiledRole]:
+        return self._roles.get(role)
+
+    def roles(self) -> Dict[str, CompiledRole]:
+        return dict(self._roles)
+
+
+permission_registry = PermissionRegistry(ROLE_PERMISSIONS)
+
+PERMISSION_CHANNEL = "permissions:changed"
+
+
 def check_permission(user_role: str, required_permission: str) -> bool:
     """
     检查用户角色是否拥有指定权限
@@ -38,16 +115,10 @@ def check_permission(user_role: str, required_permission: str) -> bool:
     Returns:
         是否拥有权限
     """
-    if user_role not in ROLE_PERMISSIONS:
+    compiled = permission_registry.get(user_role)
+    if compiled is None:
         return False
-    
-    permissions = ROLE_PERMISSIONS[user_role]
-    
-    # 管理员拥有所有权限
-    if "*" in permissions:
-        return True
-    
-    return required_permission in permissions
+    return compiled.allows(required_permission)
 
 
 def require_permission(required_permission: str):
@@ -81,5 +152,61 @@ def get_user_permissions(user_role: str) -> List[str]:
     Returns:
         权限列表
     """
-    return ROLE_PERMISSIONS.get(user_role, [])
+    compiled = permission_registry.get(user_role)
+    return sorted(compiled.permissions) if compiled else []
+
+
+def permission_version(user_role: str) -> str:
+    """
+    角色权限集合的版本号（权限列表的摘要）
+    写入访问令牌的 pv 声明；权限配置变更后旧令牌的 pv 不再匹配，鉴权退回查询数据库
+    
+    Args:
+        user_role: 用户角色
+    
+    Returns:
+        版本号
+    """
+    compiled = permission_registry.get(user_role)
+    return compiled.version if compiled else ""
+
+
+def load_role_permissions() -> int:
+    """
+    从 role_permissions 表加载角色权限覆盖（同步，会查询数据库）
+    
+    Returns:
+        数据库中配置的角色数
+    """
+    from app.database import SessionLocal
+    from app.models.role_permission import RolePermission
+
+    db = SessionLocal()
+    try:
+        rows = db.query(RolePermission.role, RolePermission.permission).all()
+    finally:
+        db.close()
+
+    overrides: Dict[str, List[str]] = {}
+    for row in rows:
+        overrides.setdefault(row.role, []).append(row.permission)
+    permission_registry.load(overrides)
+    return len(overrides)
+
+
+async def reload_role_permissions() -> None:
+    """重新加载本 worker 的角色权限"""
+    count = await asyncio.to_thread(load_role_permissions)
+    logger.info(f"Loaded role permissions ({count} roles overridden from database)")
+
+
+async def notify_permissions_changed() -> None:
+    """角色权限修改后通知所有 worker 重新加载"""
+    await broker.publish(PERMISSION_CHANNEL, {})
+
+
+async def _on_permissions_changed(channel: str, message: dict) -> None:
+    await reload_role_permissions()
+
 
+broker.subscribe(PERMISSION_CHANNEL, _on_permissions_changed)
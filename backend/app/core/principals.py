@@ -0,0 +1,140 @@
+"""
+身份解析
+访问令牌携带角色与权限版本声明，声明有效时直接由令牌构造身份，不查询数据库；
+旧格式令牌或权限配置已变更时按用户ID查询，并短时间缓存查询结果。
+用户角色或启用状态变更时，变更前签发的访问令牌经吊销列表按用户截止（见 revocation），
+同时清除各 worker 的缓存身份，因此令牌声明中的角色与启用状态始终可信。
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.core.permissions import permission_version
+from app.core.pubsub import broker
+from app.core.revocation import is_token_revoked
+from app.core.security import decode_access_token
+
+
+@dataclass(frozen=True)
+class Principal:
+    """已认证用户的只读身份信息"""
+    id: str
+    username: str
+    role: str
+    is_active: bool
+
+
+class PrincipalCache:
+    """用户ID -> Principal 的 TTL + LRU 缓存"""
+
+    def __init__(self, ttl_seconds: int, maxsize: int):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Principal]:
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+            expires_at, principal = item
+            if expires_at < time.monotonic():
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: Principal) -> None:
+        with self._lock:
+            self._items[principal.id] = (time.monotonic() + self.ttl_seconds, principal)
+            self._items.move_to_end(principal.id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._items.pop(user_id, None)
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_SIZE)
+
+PRINCIPAL_CHANNEL = "principal:invalidate"
+
+
+def resolve_principal(user_id: str) -> Optional[Principal]:
+    """
+    按用户ID解析身份（同步，会查询数据库，需在线程中调用）
+    """
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    from app.database import SessionLocal
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        user = db.query(User.id, User.username, User.role, User.is_active).filter(User.id == user_id).first()
+    finally:
+        db.close()
+
+    if user is None:
+        return None
+    principal = Principal(id=user.id, username=user.username, role=user.role, is_active=bool(user.is_active))
+    principal_cache.put(principal)
+    return principal
+
+
+def principal_from_claims(payload: dict) -> Optional[Principal]:
+    """
+    由访问令牌声明构造身份（不查询数据库）
+    令牌未携带角色或权限版本与当前配置不一致时返回 None；
+    停用或变更角色的用户此前签发的令牌已被吊销列表拒绝，这里可视为活跃用户
+    """
+    role = payload.get("role")
+    if not role or payload.get("pv") != permission_version(role):
+        return None
+    return Principal(id=payload["sub"], username=payload.get("username", ""), role=role, is_active=True)
+
+
+def authenticate_claims(token: str) -> Optional[Principal]:
+    """
+    仅凭令牌声明认证（热路径，不查询数据库），无法仅凭声明认证时返回 None
+    """
+    payload = decode_access_token(token)
+    if not payload or not payload.get("sub") or is_token_revoked(payload):
+        return None
+    return principal_from_claims(payload)
+
+
+def authenticate_token(token: str) -> Optional[Principal]:
+    """
+    校验访问令牌并解析为活跃用户身份，无效时返回 None
+    声明无法直接使用时查询数据库（同步，需在线程中调用）
+    """
+    payload = decode_access_token(token)
+    if not payload or not payload.get("sub") or is_token_revoked(payload):
+        return None
+    principal = principal_from_claims(payload)
+    if principal is not None:
+        return principal
+    principal = resolve_principal(payload["sub"])
+    if principal is None or not principal.is_active:
+        return None
+    return principal
+
+
+async def invalidate_principal(user_id: str) -> None:
+    """用户角色或状态变更后，清除所有 worker 上的缓存身份"""
+    await broker.publish(PRINCIPAL_CHANNEL, {"user_id": user_id})
+
+
+async def _on_principal_invalidated(channel: str, message: dict) -> None:
+    principal_cache.invalidate(message.get("user_id"))
+
+
+broker.subscribe(PRINCIPAL_CHANNEL, _on_principal_invalidated)
@@ -0,0 +1,227 @@
+"""
+跨进程发布/订阅
+多 worker（uvicorn --workers N）或多主机部署时，通过 Redis pub/sub 在进程间转发消息；
+单 worker 或 Redis 不可用时退化为进程内分发。
+
+消息先直接分发给本进程的订阅者，再发布到 Redis；
+每条消息携带来源 worker 标识，worker 收到自己发布的消息时跳过，避免重复投递。
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def json_default(value: Any) -> Any:
+    """消息 JSON 序列化：时间使用 ISO 8601，其余（UUID、Decimal 等）转为字符串"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class InProcessBroker:
+    """进程内消息分发（单 worker 模式）"""
+
+    backend = "memory"
+
+    def __init__(self):
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: List[Tuple[str, MessageHandler]] = []
+        self._states: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def subscribe(self, prefix: str, handler: MessageHandler) -> None:
+        """订阅以 prefix 开头的频道"""
+        self._handlers.append((prefix, handler))
+
+    async def start(self, required: bool = True) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, channel: str, message: Dict[str, Any], local: bool = True) -> None:
+        """
+        发布消息
+        local=False 时不分发给本进程订阅者（调用方已自行完成本地投递）
+        """
+        if local:
+            await self._dispatch(channel, message)
+
+    async def report_state(self, name: str, state: Dict[str, Any]) -> None:
+        """上报本 worker 的状态（如连接统计），供 collect_states 汇总"""
+        self._states.setdefault(name, {})[self.worker_id] = dict(state, reported_at=time.time())
+
+    async def collect_states(self, name: str, max_age: float) -> Dict[str, Dict[str, Any]]:
+        """汇总所有 worker 最近 max_age 秒内上报的状态"""
+        cutoff = time.time() - max_age
+        return {
+            worker_id: state
+            for worker_id, state in self._states.get(name, {}).items()
+            if state["reported_at"] >= cutoff
+        }
+
+    async def _dispatch(self, channel: str, message: Dict[str, Any]) -> None:
+        for prefix, handler in self._handlers:
+            if not channel.startswith(prefix):
+                continue
+            try:
+                await handler(channel, message)
+            except Exception as e:
+                logger.error(f"Pub/sub handler failed on {channel}: {e}")
+
+
+class RedisBroker(InProcessBroker):
+    """基于 Redis pub/sub 的跨进程消息分发"""
+
+    def __init__(self, redis_url: str, channel_prefix: str):
+        super().__init__()
+        self.redis_url = redis_url
+        self.channel_prefix = channel_prefix
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    async def start(self, required: bool = True) -> None:
+        """
+        连接 Redis 并启动监听任务
+        required=False 时连接失败退化为进程内分发（仅适用于单 worker）
+        """
+        import redis.asyncio as aioredis
+
+        client = aioredis.from_url(self.redis_url)
+        try:
+            await client.ping()
+        except Exception as e:
+            await client.close()
+            if required:
+                raise
+            logger.warning(f"Redis unavailable ({e}), falling back to in-process pub/sub")
+            return
+        self._redis = client
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def publish(self, channel: str, message: Dict[str, Any], local: bool = True) -> None:
+        """本进程直接分发，再发布到 Redis 供其他 worker 接收"""
+        if local:
+            await self._dispatch(channel, message)
+        if self._redis is None:
+            return
+        envelope = json.dumps({"origin": self.worker_id, "message": message}, default=json_default)
+        try:
+            await self._redis.publish(self.channel_prefix + channel, envelope)
+        except Exception as e:
+            logger.error(f"Failed to publish to {channel}: {e}")
+
+    async def report_state(self, name: str, state: Dict[str, Any]) -> None:
+        if self._redis is None:
+            return await super().report_state(name, state)
+        state = dict(state, reported_at=time.time())
+        try:
+            await self._redis.hset(
+                f"{self.channel_prefix}state:{name}",
+                self.worker_id,
+                json.dumps(state, default=json_default)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to report {name} state: {e}")
+
+    async def collect_states(self, name: str, max_age: float) -> Dict[str, Dict[str, Any]]:
+        if self._redis is None:
+            return await super().collect_states(name, max_age)
+        key = f"{self.channel_prefix}state:{name}"
+        cutoff = time.time() - max_age
+        states, stale = {}, []
+        for worker_id, raw in (await self._redis.hgetall(key)).items():
+            worker_id = worker_id.decode() if isinstance(worker_id, bytes) else worker_id
+            state = json.loads(raw)
+            if state.get("reported_at", 0) >= cutoff:
+                states[worker_id] = state
+            else:
+                stale.append(worker_id)
+        # 已退出的 worker 不再上报，清理其遗留状态
+        if stale:
+            await self._redis.hdel(key, *stale)
+        return states
+
+    async def _listen(self) -> None:
+        """订阅所有频道，连接断开后退避重连"""
+        delay = 1
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(self.channel_prefix + "*")
+                delay = 1
+                async for item in pubsub.listen():
+                    if item.get("type") != "pmessage":
+                        continue
+                    await self._on_message(item["channel"], item["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis pub/sub connection lost, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def _on_message(self, raw_channel, raw_data) -> None:
+        if isinstance(raw_channel, bytes):
+            raw_channel = raw_channel.decode()
+        try:
+            envelope = json.loads(raw_data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed pub/sub message on {raw_channel}")
+            return
+        # 本进程发布的消息已在 publish 时分发
+        if envelope.get("origin") == self.worker_id:
+            return
+        await self._dispatch(raw_channel[len(self.channel_prefix):], envelope.get("message") or {})
+
+
+def create_broker() -> InProcessBroker:
+    """根据 PUBSUB_BACKEND 创建消息分发器"""
+    if settings.PUBSUB_BACKEND in ("redis", "auto"):
+        return RedisBroker(settings.REDIS_URL, settings.PUBSUB_CHANNEL_PREFIX)
+    return InProcessBroker()
+
+
+# 全局消息分发器实例
+broker = create_broker()
+
+
+async def start_broker() -> None:
+    """启动消息分发器，auto 模式下 Redis 不可用时退化为进程内分发"""
+    await broker.start(required=settings.PUBSUB_BACKEND == "redis")
+    logger.info(f"Pub/sub started: backend={broker.backend}, worker={broker.worker_id}")
+
+
+async def stop_broker() -> None:
+    """停止消息分发器"""
+    await broker.stop()
@@ -0,0 +1,178 @@
+"""
+令牌吊销列表
+访问令牌无状态校验，登出、刷新令牌重放等吊销通过内存吊销列表即时生效：
+吊销记录写入 revoked_tokens 表，并经 pub/sub 通知所有 worker；启动时加载未过期的记录。
+轮换下来的刷新令牌只记录在数据库中，由刷新接口查询，不进入内存列表。
+用户角色或启用状态变更时记录按用户的截止时间：此前签发的访问令牌全部失效，
+客户端用刷新令牌换取携带新角色的令牌（已停用的用户无法刷新）。
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.pubsub import broker
+from app.models.revoked_token import RevokedToken
+
+REVOCATION_CHANNEL = "auth:revoked"
+
+# 只记录在数据库中的吊销原因（刷新令牌轮换）
+ROTATED = "rotated"
+# 按用户截止的吊销记录：id 为 USER_PREFIX + 用户ID，revoked_at 为截止时间
+USER_CHANGED = "user_changed"
+USER_PREFIX = "user:"
+
+
+class RevocationList:
+    """已吊销的令牌 jti / 会话 sid -> 过期时间（unix 秒）"""
+
+    def __init__(self):
+        self._items: Dict[str, float] = {}
+        # 用户ID -> (截止时间, 过期时间)：签发时间早于截止时间的访问令牌已失效
+        self._user_cutoffs: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, token_id: str, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            # 吊销很少发生，顺带清理已过期的记录
+            self._items = {key: exp for key, exp in self._items.items() if exp > now}
+            if expires_at > now:
+                self._items[token_id] = expires_at
+
+    def add_user_cutoff(self, user_id: str, issued_before: float, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._user_cutoffs = {key: item for key, item in self._user_cutoffs.items() if item[1] > now}
+            if expires_at > now:
+                previous = self._user_cutoffs.get(user_id)
+                if previous is None or previous[0] < issued_before:
+                    self._user_cutoffs[user_id] = (issued_before, expires_at)
+
+    def is_issued_before_cutoff(self, user_id: Optional[str], issued_at: Optional[float]) -> bool:
+        if not self._user_cutoffs or not user_id:
+            return False
+        item = self._user_cutoffs.get(user_id)
+        if item is None or item[1] <= time.time():
+            return False
+        # iat 只精确到秒，同一秒内的令牌按已失效处理
+        return issued_at is None or issued_at < item[0]
+
+    def is_revoked(self, *token_ids: Optional[str]) -> bool:
+        if not self._items:
+            return False
+        now = time.time()
+        for token_id in token_ids:
+            expires_at = self._items.get(token_id) if token_id else None
+            if expires_at is not None and expires_at > now:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+revocation_list = RevocationList()
+
+
+def is_token_revoked(payload: dict) -> bool:
+    """令牌本身、其所属登录会话或用户在签发后的变更是否已使其失效（只查内存）"""
+    return (
+        revocation_list.is_revoked(payload.get("jti"), payload.get("sid"))
+        or revocation_list.is_issued_before_cutoff(payload.get("sub"), payload.get("iat"))
+    )
+
+
+def revoke_token(
+    db: Session,
+    token_id: str,
+    user_id: Optional[str],
+    expires_at: datetime,
+    reason: str
+) -> None:
+    """
+    在当前事务中记录吊销（不提交）
+    非轮换记录需在提交后调用 publish_revocation 通知所有 worker
+    """
+    db.merge(RevokedToken(id=token_id, user_id=user_id, reason=reason, expires_at=expires_at))
+
+
+async def publish_revocation(token_id: str, expires_at: datetime) -> None:
+    """通知所有 worker 将令牌/会话加入内存吊销列表"""
+    await broker.publish(REVOCATION_CHANNEL, {"id": token_id, "expires_at": _timestamp(expires_at)})
+
+
+def revoke_user_tokens(db: Session, user_id: str) -> RevokedToken:
+    """
+    在当前事务中记录用户的令牌截止时间（不提交），提交后调用 publish_user_revocation
+    只需覆盖访问令牌的有效期：刷新接口会重新读取用户的角色与状态
+    """
+    from app.config import settings
+
+    now = datetime.now(timezone.utc)
+    return db.merge(RevokedToken(
+        id=f"{USER_PREFIX}{user_id}",
+        user_id=user_id,
+        reason=USER_CHANGED,
+        revoked_at=now,
+        expires_at=now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    ))
+
+
+async def publish_user_revocation(record: RevokedToken) -> None:
+    """通知所有 worker 使该用户此前签发的访问令牌失效"""
+    await broker.publish(REVOCATION_CHANNEL, {
+        "user_id": record.user_id,
+        "issued_before": _timestamp(record.revoked_at),
+        "expires_at": _timestamp(record.expires_at),
+    })
+
+
+def load_revocations() -> int:
+    """
+    启动时清理过期记录并加载仍有效的吊销记录（同步，会查询数据库）
+
+    Returns:
+        加载的记录数
+    """
+    from app.database import SessionLocal
+
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        db.query(RevokedToken).filter(RevokedToken.expires_at < now).delete(synchronize_session=False)
+        db.commit()
+        rows = db.query(
+            RevokedToken.id, RevokedToken.user_id, RevokedToken.reason,
+            RevokedToken.expires_at, RevokedToken.revoked_at
+        ).filter(RevokedToken.reason != ROTATED).all()
+    finally:
+        db.close()
+
+    for row in rows:
+        if row.reason == USER_CHANGED:
+            revocation_list.add_user_cutoff(row.user_id, _timestamp(row.revoked_at), _timestamp(row.expires_at))
+        else:
+            revocation_list.add(row.id, _timestamp(row.expires_at))
+    return len(rows)
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite 取回的时间不带时区，按 UTC 处理
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+async def _on_token_revoked(channel: str, message: dict) -> None:
+    if message.get("user_id"):
+        revocation_list.add_user_cutoff(
+            message["user_id"], float(message.get("issued_before") or 0), float(message.get("expires_at") or 0)
+        )
+    elif message.get("id"):
+        revocation_list.add(message["id"], float(message.get("expires_at") or 0))
+
+
+broker.subscribe(REVOCATION_CHANNEL, _on_token_revoked)
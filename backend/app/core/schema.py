@@ -0,0 +1,155 @@
+"""
+数据库表结构版本
+启动时只用一条查询读取 alembic_version 并与迁移脚本的最新版本比较，不做表结构反射；
+生产环境不执行任何 DDL，表结构由部署流程中的 alembic upgrade head 负责。
+开发环境的空库可用 create_schema 直接建表并标记为最新版本。
+"""
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent.parent / "alembic"
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """数据库迁移版本落后于代码"""
+
+
+@dataclass
+class SchemaStatus:
+    current: Optional[str]
+    head: str
+    known: bool  # 当前版本是否为本代码已知的迁移版本
+    created: bool = False
+
+    @property
+    def up_to_date(self) -> bool:
+        return self.current == self.head
+
+    def to_dict(self) -> dict:
+        return {
+            "current": self.current,
+            "head": self.head,
+            "up_to_date": self.up_to_date,
+            "created": self.created,
+        }
+
+
+_REVISION_PATTERN = re.compile(r"^(revision|down_revision)\s*=\s*['\"]?([\w]+|None)['\"]?", re.MULTILINE)
+
+
+@lru_cache(maxsize=None)
+def _script_revisions() -> Tuple[str, FrozenSet[str]]:
+    """
+    (最新版本, 全部版本)
+    直接从迁移脚本文本中读取 revision / down_revision，不导入迁移模块，也不连接数据库
+    """
+    revisions = set()
+    parents = set()
+    for path in (ALEMBIC_DIR / "versions").glob("*.py"):
+        values = dict(_REVISION_PATTERN.findall(path.read_text(encoding="utf-8")))
+        if "revision" not in values:
+            continue
+        revisions.add(values["revision"])
+        if values.get("down_revision") not in (None, "None"):
+            parents.add(values["down_revision"])
+    heads = revisions - parents
+    if len(heads) != 1:
+        raise RuntimeError(f"Expected a single alembic head, found {sorted(heads)}")
+    return heads.pop(), frozenset(revisions)
+
+
+def head_revision() -> str:
+    """迁移脚本的最新版本"""
+    return _script_revisions()[0]
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    """数据库当前的迁移版本；没有 alembic_version 表时返回 None"""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        return None
+
+
+def schema_mode() -> str:
+    """启动时的表结构处理方式：auto 按 DEBUG 选择 create（开发）或 check（生产）"""
+    mode = settings.DB_SCHEMA_MODE.lower()
+    if mode == "auto":
+        return "create" if settings.DEBUG else "check"
+    return mode
+
+
+def create_schema(engine: Engine) -> bool:
+    """
+    空库：create_all 建表并把 alembic_version 标记为最新版本
+    已有表但没有版本记录（旧版本启动时 create_all 建的库）：只补建缺失的表，不标记版本
+
+    Returns:
+        是否标记了版本
+    """
+    from app.database import Base
+    import app.models  # noqa: F401  注册所有模型
+
+    with engine.connect() as connection:
+        empty = not engine.dialect.get_table_names(connection)
+    Base.metadata.create_all(bind=engine)
+    if not empty:
+        logger.warning(
+            "Database has tables but no alembic_version; created missing tables only. "
+            "Run 'alembic stamp <revision>' for the schema it matches, then 'alembic upgrade head'."
+        )
+        return False
+
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)"
+        ))
+        connection.execute(text("DELETE FROM alembic_version"))
+        connection.execute(text("INSERT INTO alembic_version (version_num) VALUES (:head)"), {"head": head_revision()})
+    return True
+
+
+def verify_schema(engine: Engine) -> SchemaStatus:
+    """
+    启动时校验迁移版本（同步）
+    check 模式下版本落后且 DB_SCHEMA_STRICT 时抛出 SchemaOutOfDateError；
+    数据库版本比代码新（滚动发布中先执行了迁移）只记录警告。
+    """
+    head, revisions = _script_revisions()
+    mode = schema_mode()
+    current = current_revision(engine)
+    created = False
+
+    if mode == "create" and current is None:
+        created = create_schema(engine)
+        current = current_revision(engine)
+
+    status = SchemaStatus(current=current, head=head, known=current in revisions, created=created)
+    if mode == "off" or status.up_to_date:
+        return status
+
+    if status.current is not None and not status.known:
+        logger.warning(f"Database schema revision {status.current} is newer than this code (head {head})")
+        return status
+
+    message = (
+        f"Database schema revision is {status.current or 'missing'}, expected {head}; "
+        "run 'alembic upgrade head' before starting the application"
+    )
+    if mode == "check" and settings.DB_SCHEMA_STRICT:
+        raise SchemaOutOfDateError(message)
+    logger.warning(message)
+    return status
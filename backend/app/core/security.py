@@ -1,14 +1,43 @@
 """
 安全相关功能：密码加密、JWT生成和验证
 """
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import jwt, JWTError as InvalidTokenError
+import asyncio
 import hashlib
+import hmac
 import secrets
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from jose import jwt, JWTError as InvalidTokenError
+from passlib.context import CryptContext
 from app.config import settings
 
-# 简单的密码哈希实现（用于测试）
+# 密码哈希：默认 argon2id，仍可验证 bcrypt；非默认算法及参数过时的哈希在登录时自动升级
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    default=settings.PASSWORD_HASH_SCHEME,
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+# 哈希计算在独立线程池中执行（argon2/bcrypt 计算时释放 GIL），不阻塞事件循环；
+# 线程数限制同时进行的哈希计算，登录高峰时多余请求排队而不是争抢 CPU
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
+LEGACY_HASH_PREFIX = "sha256$"
+
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+
+# 简单的密码哈希实现（旧版本遗留，仅用于验证存量哈希）
 def get_password_hash_simple(password: str) -> str:
     """使用 SHA256 生成密码哈希"""
     salt = secrets.token_hex(16)
@@ -24,19 +53,63 @@ def verify_password_simple(plain_password: str, hashed_password: str) -> bool:
         salt = parts[1]
         stored_hash = parts[2]
         pwd_hash = hashlib.sha256((plain_password + salt).encode()).hexdigest()
-        return pwd_hash == stored_hash
+        return hmac.compare_digest(pwd_hash, stored_hash)
     except:
         return False
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    return verify_password_simple(plain_password, hashed_password)
+    """验证密码（兼容旧版 SHA256 哈希）"""
+    if hashed_password.startswith(LEGACY_HASH_PREFIX):
+        return verify_password_simple(plain_password, hashed_password)
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except ValueError:
+        # 无法识别的哈希格式
+        return False
 
 
 def get_password_hash(password: str) -> str:
     """生成密码哈希"""
-    return get_password_hash_simple(password)
+    return pwd_context.hash(password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    验证密码，并在哈希需要升级时用明文重新计算
+
+    Returns:
+        (是否正确, 新哈希)；无需升级或密码错误时新哈希为 None
+    """
+    if hashed_password.startswith(LEGACY_HASH_PREFIX):
+        if not verify_password_simple(plain_password, hashed_password):
+            return False, None
+        return True, get_password_hash(plain_password)
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except ValueError:
+        return False, None
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在哈希线程池中执行 verify_password"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """在哈希线程池中执行 verify_and_update_password"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_and_update_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """在哈希线程池中执行 get_password_hash"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -44,25 +117,53 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     创建JWT访问令牌
     
     Args:
-        data: 要编码的数据（通常包含用户ID等信息）
+        data: 要编码的数据（用户ID、角色、权限版本等声明）
         expires_delta: 过期时间增量
     
     Returns:
         JWT令牌字符串
     """
     to_encode = data.copy()
+    now = datetime.utcnow()
     
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.setdefault("type", ACCESS_TOKEN_TYPE)
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     
     return encoded_jwt
 
 
+def create_refresh_token(user_id: str, session_id: str) -> str:
+    """
+    创建刷新令牌
+    每次使用后轮换；同一登录会话内的令牌共享 sid，便于整体吊销
+    
+    Args:
+        user_id: 用户ID
+        session_id: 登录会话ID
+    
+    Returns:
+        JWT令牌字符串
+    """
+    return create_access_token(
+        {"sub": user_id, "sid": session_id, "type": REFRESH_TOKEN_TYPE},
+        expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+
+
+def _decode_token(token: str) -> Optional[dict]:
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except InvalidTokenError:
+        return None
+
+
 def decode_access_token(token: str) -> Optional[dict]:
     """
     解码JWT访问令牌
@@ -71,11 +172,25 @@ def decode_access_token(token: str) -> Optional[dict]:
         token: JWT令牌字符串
 
     Returns:
-        解码后的数据，如果令牌无效则返回None
+        解码后的数据，如果令牌无效（或为刷新令牌）则返回None
     """
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except InvalidTokenError:
+    payload = _decode_token(token)
+    if payload is None or payload.get("type", ACCESS_TOKEN_TYPE) != ACCESS_TOKEN_TYPE:
         return None
+    return payload
+
+
+def decode_refresh_token(token: str) -> Optional[dict]:
+    """
+    解码刷新令牌
 
+    Args:
+        token: JWT令牌字符串
+
+    Returns:
+        解码后的数据，如果令牌无效或不是刷新令牌则返回None
+    """
+    payload = _decode_token(token)
+    if payload is None or payload.get("type") != REFRESH_TOKEN_TYPE:
+        return None
+    return payload
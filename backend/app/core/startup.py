@@ -0,0 +1,44 @@
+"""
+启动耗时统计
+按阶段记录启动各步骤的耗时，启动完成后写入日志，并通过 /api/health/startup 查询
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class StartupTimer:
+    """启动阶段计时（毫秒）"""
+
+    def __init__(self):
+        self.created_at = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.completed_at: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def complete(self) -> None:
+        self.completed_at = time.perf_counter()
+
+    @property
+    def total_ms(self) -> Optional[float]:
+        """从创建计时器（应用模块导入）到启动完成的总耗时"""
+        if self.completed_at is None:
+            return None
+        return round((self.completed_at - self.created_at) * 1000, 2)
+
+    def summary(self) -> str:
+        phases = ", ".join(f"{name} {elapsed:.1f}ms" for name, elapsed in self.phases.items())
+        return f"{self.total_ms:.1f}ms ({phases})"
+
+    def to_dict(self) -> dict:
+        return {
+            "total_ms": self.total_ms,
+            "phases_ms": dict(self.phases),
+        }
@@ -0,0 +1,133 @@
+"""
+上传文件静态服务
+文件以 UUID 路径存储、写入后不再改变，因此可以长期缓存：
+- Cache-Control: immutable，浏览器与 nginx 无需重新验证
+- 基于数据库中文件 MD5 的强 ETag，支持 If-None-Match 返回 304
+- 客户端支持 gzip 时优先返回预压缩的 .gz 版本
+"""
+import mimetypes
+import os
+import stat
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.config import settings
+
+
+class FileHashCache:
+    """文件路径 -> MD5 的 LRU 缓存（文件路径不可变，缓存无需失效）"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> Optional[str]:
+        with self._lock:
+            file_md5 = self._items.get(file_path)
+            if file_md5 is not None:
+                self._items.move_to_end(file_path)
+            return file_md5
+
+    def put(self, file_path: str, file_md5: str) -> None:
+        with self._lock:
+            self._items[file_path] = file_md5
+            self._items.move_to_end(file_path)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+file_hash_cache = FileHashCache(settings.FILES_ETAG_CACHE_SIZE)
+
+
+def lookup_file_md5(file_path: str) -> Optional[str]:
+    """
+    查询文件的已存储MD5
+    未记录MD5的旧文件不缓存，存储对账回填后即可生效
+    """
+    file_md5 = file_hash_cache.get(file_path)
+    if file_md5 is not None:
+        return file_md5
+
+    from app.database import SessionLocal
+    from app.models.document import CustomerDocument
+
+    db = SessionLocal()
+    try:
+        row = db.query(CustomerDocument.file_md5).filter(
+            CustomerDocument.file_path == file_path
+        ).first()
+    finally:
+        db.close()
+
+    if row and row.file_md5:
+        file_hash_cache.put(file_path, row.file_md5)
+        return row.file_md5
+    return None
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """为不可变上传文件提供长缓存、强ETag与预压缩支持的静态文件服务"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        except PermissionError:
+            raise HTTPException(status_code=401)
+
+        if not stat_result or not stat.S_ISREG(stat_result.st_mode):
+            raise HTTPException(status_code=404)
+
+        request_headers = Headers(scope=scope)
+        file_path = Path(path).as_posix()
+        file_md5 = await anyio.to_thread.run_sync(lookup_file_md5, file_path)
+
+        headers = {
+            "cache-control": settings.FILES_CACHE_CONTROL,
+            "vary": "Accept-Encoding",
+        }
+
+        serve_path, serve_stat, encoding = full_path, stat_result, None
+        if "gzip" in request_headers.get("accept-encoding", ""):
+            gz_path, gz_stat = await anyio.to_thread.run_sync(self._lookup_precompressed, full_path)
+            if gz_stat is not None:
+                serve_path, serve_stat, encoding = gz_path, gz_stat, "gzip"
+                headers["content-encoding"] = "gzip"
+
+        if file_md5:
+            # 不同编码的表示必须使用不同的强ETag
+            headers["etag"] = f'"{file_md5}-gz"' if encoding else f'"{file_md5}"'
+
+        response = FileResponse(
+            serve_path,
+            stat_result=serve_stat,
+            headers=headers,
+            media_type=self._guess_media_type(full_path)
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @staticmethod
+    def _lookup_precompressed(full_path: str) -> Tuple[str, Optional[os.stat_result]]:
+        gz_path = full_path + ".gz"
+        try:
+            return gz_path, os.stat(gz_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return gz_path, None
+
+    @staticmethod
+    def _guess_media_type(full_path: str) -> str:
+        return mimetypes.guess_type(full_path)[0] or "application/octet-stream"
@@ -1,16 +1,39 @@
 """
 Webhook 系统
 支持事件通知和外部系统集成
+事件先写入 webhook_deliveries 投递队列，由后台分发器异步发送、失败重试
 """
 import asyncio
-import httpx
+import hashlib
+import hmac
+import importlib
+import importlib.util
+import json
 import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import os
+import random
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
+from datetime import datetime, timedelta, timezone
 from enum import Enum
+from urllib.parse import urlsplit
+
+from sqlalchemy import and_, exists
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.database import SessionLocal
+from app.core.pubsub import broker
+from app.models.webhook import WebhookDelivery, WebhookSubscriptionRecord
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
+WEBHOOK_CHANNEL = "webhooks:changed"
+
 
 class WebhookEvent(str, Enum):
     """Webhook 事件类型"""
@@ -19,12 +42,14 @@ class WebhookEvent(str, Enum):
     CUSTOMER_UPDATED = "customer.updated"
     CUSTOMER_DELETED = "customer.deleted"
     CUSTOMER_STATUS_CHANGED = "customer.status_changed"
+    CUSTOMERS_ASSIGNED = "customers.assigned"  # 批量分配/转移，每次操作一条
     
     # 文档事件
     DOCUMENT_UPLOADED = "document.uploaded"
     DOCUMENT_APPROVED = "document.approved"
     DOCUMENT_REJECTED = "document.rejected"
     DOCUMENT_DELETED = "document.deleted"
+    DOCUMENTS_REVIEWED = "documents.reviewed"  # 批量审核，每个客户一条
     
     # 产品事件
     PRODUCT_CREATED = "product.created"
@@ -64,13 +89,16 @@ class WebhookSubscription:
         events: List[WebhookEvent],
         secret: Optional[str] = None,
         headers: Optional[Dict[str, str]] = None,
-        enabled: bool = True
+        enabled: bool = True,
+        batch: bool = False
     ):
         self.url = url
         self.events = events
         self.secret = secret
         self.headers = headers or {}
         self.enabled = enabled
+        # 接收方支持时启用：请求体始终为 {"events": [...]}，多个待发送事件合并为一次 POST
+        self.batch = batch
     
     def should_trigger(self, event: WebhookEvent) -> bool:
         """检查是否应该触发此订阅"""
@@ -91,94 +119,549 @@ class WebhookManager:
         if self._initialized:
             return
         
-        self._subscriptions: List[WebhookSubscription] = []
+        # 代码中注册的订阅（register_webhook）与数据库中的订阅
+        self._static_subscriptions: List[WebhookSubscription] = []
+        self._stored_subscriptions: List[WebhookSubscription] = []
+        # 路由索引: (事件类型 -> 启用的订阅列表, 地址 -> 订阅)，整体替换保证读取一致
+        self._routing: Tuple[Dict[str, List[WebhookSubscription]], Dict[str, WebhookSubscription]] = ({}, {})
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
         self._initialized = True
     
+    def get_client(self) -> "httpx.AsyncClient":
+        """
+        共享的 HTTP 客户端：连接保活复用，避免每次投递重新握手 TCP/TLS
+        安装了 h2 时启用 HTTP/2，同一主机的请求复用一个连接
+        httpx 在首次使用时才导入，不计入 worker 启动耗时
+        """
+        if self._client is None or self._client.is_closed:
+            import httpx
+
+            http2 = settings.WEBHOOK_HTTP2 and importlib.util.find_spec("h2") is not None
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+                    keepalive_expiry=settings.WEBHOOK_KEEPALIVE_SECONDS
+                ),
+                headers={"User-Agent": "CCD-Webhook/1.0"}
+            )
+            logger.info(f"Webhook HTTP client created (http2={http2})")
+        return self._client
+    
+    async def aclose(self):
+        """关闭共享的 HTTP 客户端"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """每个主机的并发请求上限（多个订阅可能指向同一主机）"""
+        host = urlsplit(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(settings.WEBHOOK_MAX_CONNECTIONS_PER_HOST)
+        return self._host_semaphores[host]
+    
     def subscribe(self, subscription: WebhookSubscription):
         """添加订阅"""
-        self._subscriptions.append(subscription)
+        self._static_subscriptions.append(subscription)
+        self._rebuild_index()
         logger.info(f"Added webhook subscription for {subscription.url}")
     
     def unsubscribe(self, url: str):
         """移除订阅"""
-        self._subscriptions = [s for s in self._subscriptions if s.url != url]
+        self._static_subscriptions = [s for s in self._static_subscriptions if s.url != url]
+        self._rebuild_index()
         logger.info(f"Removed webhook subscription for {url}")
     
     def get_subscriptions(self, event: WebhookEvent) -> List[WebhookSubscription]:
         """获取特定事件的所有订阅"""
-        return [s for s in self._subscriptions if s.should_trigger(event)]
+        return self._routing[0].get(getattr(event, "value", event), [])
+    
+    def get_subscription(self, url: str) -> Optional[WebhookSubscription]:
+        """按地址获取启用的订阅（已停用的订阅返回 None）"""
+        subscription = self._routing[1].get(url)
+        if subscription is None or not subscription.enabled:
+            return None
+        return subscription
+    
+    def _rebuild_index(self):
+        by_event: Dict[str, List[WebhookSubscription]] = {}
+        by_url: Dict[str, WebhookSubscription] = {}
+        # 数据库中的订阅覆盖代码中注册的同地址订阅
+        for subscription in self._static_subscriptions + self._stored_subscriptions:
+            by_url[subscription.url] = subscription
+        for subscription in by_url.values():
+            if not subscription.enabled:
+                continue
+            for event in dict.fromkeys(getattr(e, "value", e) for e in subscription.events):
+                by_event.setdefault(event, []).append(subscription)
+        self._routing = (by_event, by_url)
+    
+    def load_subscriptions(self, db: Session) -> int:
+        """
+        从数据库加载订阅并重建路由索引
+        
+        Returns:
+            加载的订阅数
+        """
+        records = db.query(WebhookSubscriptionRecord).all()
+        self._stored_subscriptions = [self._from_record(record) for record in records]
+        self._rebuild_index()
+        return len(records)
+    
+    def refresh_subscriptions(self, urls: List[str]) -> None:
+        """
+        从数据库重新读取指定地址的订阅并更新路由索引
+        变更通知可能尚未送达（新建的订阅、进程内消息回退），投递前以数据库为准
+        """
+        db = SessionLocal()
+        try:
+            records = db.query(WebhookSubscriptionRecord).filter(WebhookSubscriptionRecord.url.in_(urls)).all()
+        finally:
+            db.close()
+        self._stored_subscriptions = [
+            s for s in self._stored_subscriptions if s.url not in urls
+        ] + [self._from_record(record) for record in records]
+        self._rebuild_index()
+    
+    @staticmethod
+    def _from_record(record: WebhookSubscriptionRecord) -> WebhookSubscription:
+        return WebhookSubscription(
+            url=record.url,
+            events=list(record.events or []),
+            secret=record.secret,
+            headers=record.headers or {},
+            enabled=record.enabled,
+            batch=record.batch
+        )
+    
+    async def reload(self):
+        """在线程中重新加载订阅"""
+        def load() -> int:
+            db = SessionLocal()
+            try:
+                return self.load_subscriptions(db)
+            finally:
+                db.close()
+        
+        count = await asyncio.to_thread(load)
+        logger.info(f"Loaded {count} webhook subscriptions")
+    
+    async def notify_changed(self):
+        """订阅变更后通知所有 worker（含本进程）重新加载"""
+        await broker.publish(WEBHOOK_CHANNEL, {})
+    
+    def enqueue(
+        self,
+        db: Session,
+        event: WebhookEvent,
+        data: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[datetime] = None,
+        ordering_key: Optional[str] = None,
+        sequence: Optional[int] = None
+    ) -> int:
+        """
+        为所有匹配的订阅写入投递记录（不提交事务）
+        
+        Args:
+            timestamp: 事件发生时间，默认为当前时间（发件箱转发时使用事件写入时间）
+            ordering_key: 顺序键，同一订阅下相同顺序键的记录按 sequence 依次投递
+            sequence: 顺序键内的序号（发件箱事件 id）
+        
+        Returns:
+            写入的投递记录数
+        """
+        subscriptions = self.get_subscriptions(event)
+        if not subscriptions:
+            logger.debug(f"No subscriptions for event {event.value}")
+            return 0
+        
+        # 负载只序列化一次，所有订阅共享同一份字节
+        payload = json.dumps(WebhookPayload(event, data, timestamp=timestamp, metadata=metadata).to_dict(), default=str)
+        now = datetime.now(timezone.utc)
+        db.add_all([
+            WebhookDelivery(
+                url=subscription.url,
+                event=event.value,
+                payload=payload,
+                status="pending",
+                attempts=0,
+                next_attempt_at=now,
+                ordering_key=ordering_key,
+                sequence=sequence
+            )
+            for subscription in subscriptions
+        ])
+        return len(subscriptions)
     
     async def trigger(self, event: WebhookEvent, data: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None):
         """
         触发 Webhook 事件
+        只写入投递队列，由后台分发器发送，不占用调用方的请求时间
         
         Args:
             event: 事件类型
             data: 事件数据
             metadata: 元数据
         """
-        payload = WebhookPayload(event, data, metadata=metadata)
-        subscriptions = self.get_subscriptions(event)
+        def enqueue_and_commit() -> int:
+            db = SessionLocal()
+            try:
+                count = self.enqueue(db, event, data, metadata)
+                db.commit()
+                return count
+            finally:
+                db.close()
         
-        if not subscriptions:
+        if not self.get_subscriptions(event):
             logger.debug(f"No subscriptions for event {event.value}")
             return
         
-        logger.info(f"Triggering {len(subscriptions)} webhooks for event {event.value}")
-        
-        # 异步发送所有 webhook
-        tasks = [self._send_webhook(sub, payload) for sub in subscriptions]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        count = await asyncio.to_thread(enqueue_and_commit)
+        logger.info(f"Queued {count} webhooks for event {event.value}")
+        webhook_dispatcher.wake()
     
-    async def _send_webhook(self, subscription: WebhookSubscription, payload: WebhookPayload):
+    async def _send_webhook(
+        self,
+        subscription: WebhookSubscription,
+        body: bytes,
+        event: str,
+        delivery_ids: List[str]
+    ) -> Tuple[Optional[int], Optional[str]]:
         """
-        发送单个 Webhook
+        发送单个 Webhook 请求
+        签名与发送使用同一份请求体字节
         
         Args:
             subscription: 订阅信息
-            payload: 负载数据
+            body: 已序列化的请求体
+            event: 事件类型（批量发送时为 batch）
+            delivery_ids: 本次请求包含的投递记录ID，接收方可据此去重
+        
+        Returns:
+            (HTTP 状态码, 错误信息)，成功时错误信息为 None
         """
         try:
             headers = {
                 "Content-Type": "application/json",
-                "User-Agent": "CCD-Webhook/1.0",
+                "X-Webhook-Event": event,
+                "X-Webhook-Delivery": ",".join(delivery_ids),
                 **subscription.headers
             }
             
             # 如果有密钥，添加签名
             if subscription.secret:
-                import hmac
-                import hashlib
-                import json
-                
-                payload_str = json.dumps(payload.to_dict())
                 signature = hmac.new(
                     subscription.secret.encode(),
-                    payload_str.encode(),
+                    body,
                     hashlib.sha256
                 ).hexdigest()
                 headers["X-Webhook-Signature"] = f"sha256={signature}"
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
+            async with self._host_semaphore(subscription.url):
+                response = await self.get_client().post(
                     subscription.url,
-                    json=payload.to_dict(),
+                    content=body,
                     headers=headers
                 )
-                
-                if response.status_code >= 200 and response.status_code < 300:
-                    logger.info(f"Webhook sent successfully to {subscription.url}")
-                else:
-                    logger.warning(
-                        f"Webhook failed with status {response.status_code}: {subscription.url}"
-                    )
+            
+            if 200 <= response.status_code < 300:
+                logger.info(f"Webhook sent successfully to {subscription.url}")
+                return response.status_code, None
+            logger.warning(
+                f"Webhook failed with status {response.status_code}: {subscription.url}"
+            )
+            return response.status_code, f"HTTP {response.status_code}"
         
         except Exception as e:
             logger.error(f"Error sending webhook to {subscription.url}: {str(e)}")
+            return None, str(e) or type(e).__name__
+
+
+class WebhookDispatcher:
+    """
+    Webhook 后台分发器
+    从 webhook_deliveries 表领取到期记录并发送：失败按指数退避重试，
+    超过最大次数转为 dead（死信）；每个订阅地址的并发请求数受限。
+    领取时写入租约，发送期间定期续约，worker 崩溃后租约到期的记录会被重新领取，
+    因此投递语义为至少一次，接收方应按 X-Webhook-Delivery 去重。
+    写回结果时只更新仍由本 worker 持有的记录，租约已被他人接管的结果丢弃。
+    带顺序键的记录按 sequence 依次投递：同一订阅下更早的同键记录送达或转为死信前，之后的记录不会被领取。
+    """
+    
+    def __init__(self, manager: WebhookManager):
+        self.manager = manager
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._last_purge = 0.0
+    
+    def wake(self):
+        """有新投递时唤醒分发器，无需等待下一次轮询"""
+        self._wakeup.set()
+    
+    async def run(self):
+        """后台任务：持续分发到期的投递记录"""
+        # 在线程中预先导入 httpx，首次投递时不阻塞事件循环
+        await asyncio.to_thread(importlib.import_module, "httpx")
+        while True:
+            try:
+                processed = await self.dispatch_once()
+                if time.monotonic() - self._last_purge > 3600:
+                    self._last_purge = time.monotonic()
+                    await asyncio.to_thread(self._purge_delivered)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook dispatch failed: {e}")
+                processed = 0
+            
+            if processed:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.WEBHOOK_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def dispatch_once(self) -> int:
+        """
+        领取并发送一批到期记录
+        
+        Returns:
+            处理的记录数
+        """
+        deliveries = await asyncio.to_thread(self._claim_due, settings.WEBHOOK_DISPATCH_BATCH_SIZE)
+        if not deliveries:
+            return 0
+        
+        requests = []
+        by_url: Dict[str, list] = {}
+        for delivery in deliveries:
+            by_url.setdefault(delivery.url, []).append(delivery)
+        # 索引中没有的地址先查数据库，确认订阅确已删除或停用后才转为死信
+        missing = [url for url in by_url if self.manager.get_subscription(url) is None]
+        if missing:
+            await asyncio.to_thread(self.manager.refresh_subscriptions, missing)
+        for url, url_deliveries in by_url.items():
+            subscription = self.manager.get_subscription(url)
+            if subscription is not None and subscription.batch:
+                size = settings.WEBHOOK_BATCH_MAX_EVENTS
+                requests.extend(
+                    (subscription, url_deliveries[i:i + size])
+                    for i in range(0, len(url_deliveries), size)
+                )
+            else:
+                requests.extend((subscription, [delivery]) for delivery in url_deliveries)
+        
+        # 并发与主机限流下整批发送可能超过租约时长，发送期间持续续约
+        renewer = asyncio.create_task(self._keep_lease([delivery.id for delivery in deliveries]))
+        try:
+            results = await asyncio.gather(*(
+                self._deliver(subscription, batch) for subscription, batch in requests
+            ))
+        finally:
+            renewer.cancel()
+        await asyncio.to_thread(
+            self._record_results,
+            [result for batch_results in results for result in batch_results]
+        )
+        return len(deliveries)
+    
+    async def _deliver(self, subscription: Optional[WebhookSubscription], deliveries: list) -> list:
+        if subscription is None:
+            # 数据库中订阅也已删除或停用，转为死信（重新启用后可用 requeue_dead_deliveries 重新投递）
+            return [(delivery, None, "Subscription removed or disabled", True) for delivery in deliveries]
+        
+        if not subscription.batch:
+            body, event = deliveries[0].payload.encode(), deliveries[0].event
+        else:
+            # 批量订阅的请求体格式固定，即使本次只有一条；拼接已序列化的负载，不重新序列化
+            body = ('{"events": [' + ", ".join(d.payload for d in deliveries) + ']}').encode()
+            event = "batch"
+        
+        semaphore = self._semaphores.get(subscription.url)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.WEBHOOK_MAX_CONCURRENCY_PER_SUBSCRIBER)
+            self._semaphores[subscription.url] = semaphore
+        async with semaphore:
+            status_code, error = await self.manager._send_webhook(
+                subscription, body, event, [d.id for d in deliveries]
+            )
+        return [(delivery, status_code, error, False) for delivery in deliveries]
+    
+    def _claim_due(self, limit: int) -> list:
+        """
+        领取到期的投递记录（含租约过期的 delivering 记录）
+        同一订阅下还有更早的同键记录未完成（等待重试或发送中）时跳过该记录
+        """
+        now = datetime.now(timezone.utc)
+        due = and_(
+            WebhookDelivery.status.in_(["pending", "delivering"]),
+            WebhookDelivery.next_attempt_at <= now
+        )
+        earlier = aliased(WebhookDelivery)
+        blocked = exists().where(
+            earlier.url == WebhookDelivery.url,
+            earlier.ordering_key == WebhookDelivery.ordering_key,
+            earlier.sequence < WebhookDelivery.sequence,
+            earlier.status.in_(["pending", "delivering"])
+        )
+        db = SessionLocal()
+        try:
+            ids = [
+                row.id for row in db.query(WebhookDelivery.id).filter(due, ~blocked)
+                .order_by(WebhookDelivery.created_at).limit(limit).all()
+            ]
+            if not ids:
+                return []
+            # 条件更新保证多个 worker 不会领取同一条记录
+            db.query(WebhookDelivery).filter(WebhookDelivery.id.in_(ids), due).update({
+                WebhookDelivery.status: "delivering",
+                WebhookDelivery.claimed_by: self.worker_id,
+                WebhookDelivery.next_attempt_at: now + timedelta(seconds=settings.WEBHOOK_CLAIM_LEASE_SECONDS),
+            }, synchronize_session=False)
+            db.commit()
+            return db.query(
+                WebhookDelivery.id,
+                WebhookDelivery.url,
+                WebhookDelivery.event,
+                WebhookDelivery.payload,
+                WebhookDelivery.attempts
+            ).filter(
+                WebhookDelivery.id.in_(ids),
+                WebhookDelivery.status == "delivering",
+                WebhookDelivery.claimed_by == self.worker_id
+            ).order_by(WebhookDelivery.created_at).all()
+        finally:
+            db.close()
+    
+    async def _keep_lease(self, ids: List[str]) -> None:
+        """每隔三分之一租约时长为仍在发送的记录续约"""
+        interval = max(settings.WEBHOOK_CLAIM_LEASE_SECONDS / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self._renew_lease, ids)
+            except Exception as e:
+                logger.error(f"Webhook lease renewal failed: {e}")
+    
+    def _renew_lease(self, ids: List[str]) -> int:
+        """延长本 worker 持有的 delivering 记录的租约"""
+        db = SessionLocal()
+        try:
+            renewed = db.query(WebhookDelivery).filter(
+                WebhookDelivery.id.in_(ids),
+                WebhookDelivery.status == "delivering",
+                WebhookDelivery.claimed_by == self.worker_id
+            ).update({
+                WebhookDelivery.next_attempt_at: datetime.now(timezone.utc)
+                + timedelta(seconds=settings.WEBHOOK_CLAIM_LEASE_SECONDS),
+            }, synchronize_session=False)
+            db.commit()
+            return renewed
+        finally:
+            db.close()
+    
+    def _record_results(self, results: list) -> None:
+        """
+        在一个事务中写回本批次的发送结果
+        只更新仍由本 worker 持有的记录：租约过期后被其他 worker 重新领取的记录不覆盖
+        """
+        now = datetime.now(timezone.utc)
+        updates = []
+        for delivery, status_code, error, dead in results:
+            attempts = delivery.attempts + 1
+            update = {
+                "attempts": attempts,
+                "claimed_by": None,
+                "last_status_code": status_code,
+                "last_error": error,
+            }
+            if error is None:
+                update.update(status="delivered", delivered_at=now)
+            elif dead or attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                update.update(status="dead")
+                logger.warning(f"Webhook {delivery.id} to {delivery.url} dead-lettered after {attempts} attempts: {error}")
+            else:
+                update.update(status="pending", next_attempt_at=now + timedelta(seconds=self.backoff(attempts)))
+            updates.append((delivery, update))
+        
+        db = SessionLocal()
+        try:
+            lost = 0
+            for delivery, update in updates:
+                lost += 1 - db.query(WebhookDelivery).filter(
+                    WebhookDelivery.id == delivery.id,
+                    WebhookDelivery.status == "delivering",
+                    WebhookDelivery.claimed_by == self.worker_id
+                ).update(update, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        if lost:
+            logger.warning(f"Discarded {lost} webhook results whose lease was taken over by another worker")
+    
+    @staticmethod
+    def backoff(attempts: int) -> float:
+        """第 attempts 次失败后的等待秒数：指数增长并加入随机抖动"""
+        delay = min(settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.WEBHOOK_RETRY_MAX_SECONDS)
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def _purge_delivered(self) -> None:
+        """清理超过保留期的已送达记录（死信保留供排查与重新投递）"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.WEBHOOK_DELIVERY_RETENTION_DAYS)
+        db = SessionLocal()
+        try:
+            deleted = db.query(WebhookDelivery).filter(
+                WebhookDelivery.status == "delivered",
+                WebhookDelivery.delivered_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                logger.info(f"Purged {deleted} delivered webhooks")
+        finally:
+            db.close()
+
+
+def requeue_dead_deliveries(db: Session, url: Optional[str] = None) -> int:
+    """
+    将死信重新放回投递队列
+    
+    Args:
+        db: 数据库会话
+        url: 只重新投递该订阅地址的死信（可选）
+    
+    Returns:
+        重新入队的记录数
+    """
+    query = db.query(WebhookDelivery).filter(WebhookDelivery.status == "dead")
+    if url:
+        query = query.filter(WebhookDelivery.url == url)
+    count = query.update({
+        WebhookDelivery.status: "pending",
+        WebhookDelivery.attempts: 0,
+        WebhookDelivery.next_attempt_at: datetime.now(timezone.utc),
+    }, synchronize_session=False)
+    db.commit()
+    webhook_dispatcher.wake()
+    return count
 
 
 # 全局 Webhook 管理器实例
 webhook_manager = WebhookManager()
+webhook_dispatcher = WebhookDispatcher(webhook_manager)
+
+
+async def _on_subscriptions_changed(channel: str, message: dict):
+    await webhook_manager.reload()
+
+
+broker.subscribe(WEBHOOK_CHANNEL, _on_subscriptions_changed)
 
 
 # 便捷函数
@@ -226,15 +709,14 @@ def register_webhook(
     webhook_manager.subscribe(subscription)
 
 
-# 示例：在应用启动时注册 webhook
-def init_webhooks():
-    """初始化 Webhook 订阅"""
-    # 这里可以从配置文件或数据库加载 webhook 订阅
-    # 示例：
-    # register_webhook(
-    #     "https://example.com/webhook",
-    #     [WebhookEvent.CUSTOMER_CREATED],
-    #     secret="your-secret-key"
-    # )
-    pass
-
+async def init_webhooks():
+    """
+    初始化 Webhook 订阅：从数据库加载
+    也可以在代码中注册固定订阅，例如：
+    register_webhook(
+        "https://example.com/webhook",
+        [WebhookEvent.CUSTOMER_CREATED],
+        secret="your-secret-key"
+    )
+    """
+    await webhook_manager.reload()
@@ -1,37 +1,183 @@
 """
 数据库连接和会话管理
 """
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.config import settings
 
+
+class PoolMetrics:
+    """
+    连接池使用统计，由连接池的公开事件（connect / checkout / checkin）采集
+    占用时长为连接从借出到归还的时间；连接全部借出时后续请求只能等待，计为满载借出
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0  # 新建的数据库连接数
+        self.checkouts = 0
+        self.checkouts_at_capacity = 0  # 借出后连接池已全部占用的次数
+        self.hold_seconds_total = 0.0
+        self.hold_seconds_max = 0.0
+        self.slow_holds = 0  # 占用超过 DB_POOL_SLOW_HOLD_MS 的次数
+        self.timeouts = 0  # 请求中等待空闲连接超时的次数
+        self.sessions_requested = 0  # 注入了数据库会话的请求数
+        self.sessions_opened = 0  # 其中实际访问了数据库的请求数
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self, at_capacity: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if at_capacity:
+                self.checkouts_at_capacity += 1
+
+    def record_checkin(self, seconds: float) -> None:
+        with self._lock:
+            self.hold_seconds_total += seconds
+            self.hold_seconds_max = max(self.hold_seconds_max, seconds)
+            if seconds * 1000 >= settings.DB_POOL_SLOW_HOLD_MS:
+                self.slow_holds += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_session(self, opened: bool) -> None:
+        with self._lock:
+            self.sessions_requested += 1
+            if opened:
+                self.sessions_opened += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkouts_at_capacity": self.checkouts_at_capacity,
+                "hold_ms_avg": round(self.hold_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "hold_ms_max": round(self.hold_seconds_max * 1000, 3),
+                "slow_holds": self.slow_holds,
+                "timeouts": self.timeouts,
+                "sessions_requested": self.sessions_requested,
+                "sessions_opened": self.sessions_opened,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "poolclass": QueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
 # 创建数据库引擎
 # 支持 PostgreSQL 和 SQLite
 if settings.DATABASE_URL.startswith("sqlite"):
-    # SQLite 配置
+    # SQLite 配置（内存库每个连接是独立的数据库，保持 SQLAlchemy 默认连接池）
     engine = create_engine(
         settings.DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        echo=settings.DEBUG
+        connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+        echo=settings.DEBUG,
+        **({} if _is_memory_sqlite(settings.DATABASE_URL) else _pool_options())
     )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """每个新连接设置 WAL、同步级别与内存映射，读写互不阻塞"""
+        cursor = dbapi_connection.cursor()
+        try:
+            if settings.SQLITE_JOURNAL_MODE:
+                cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+            if settings.SQLITE_SYNCHRONOUS:
+                cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+            cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        finally:
+            cursor.close()
 else:
     # PostgreSQL 配置
+    connect_args: Dict[str, Any] = {"connect_timeout": settings.DB_CONNECT_TIMEOUT}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={int(settings.DB_STATEMENT_TIMEOUT_MS)}"
     engine = create_engine(
         settings.DATABASE_URL,
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
-        echo=settings.DEBUG
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+        echo=settings.DEBUG,
+        **_pool_options()
     )
 
+
+@event.listens_for(engine, "connect")
+def _record_connect(dbapi_connection, connection_record):
+    pool_metrics.record_connect()
+
+
+@event.listens_for(engine, "checkout")
+def _record_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info["checked_out_at"] = time.perf_counter()
+    pool = engine.pool
+    at_capacity = isinstance(pool, QueuePool) and pool.checkedout() >= pool.size() + settings.DB_MAX_OVERFLOW
+    pool_metrics.record_checkout(at_capacity)
+
+
+@event.listens_for(engine, "checkin")
+def _record_checkin(dbapi_connection, connection_record):
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    if checked_out_at is not None:
+        pool_metrics.record_checkin(time.perf_counter() - checked_out_at)
+
+
 # 创建会话工厂
+# Session 在首次查询时才借出连接，未访问数据库的请求不占用连接
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+@event.listens_for(SessionLocal, "after_begin")
+def _mark_session_opened(session, transaction, connection):
+    session.info["opened"] = True
+
 # 创建基类
 Base = declarative_base()
 
 
+def pool_status() -> Dict[str, Any]:
+    """连接池当前状态与累计统计"""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    status.update(pool_metrics.to_dict())
+    return status
+
+
 def get_db():
     """
     获取数据库会话
@@ -40,6 +186,9 @@ def get_db():
     db = SessionLocal()
     try:
         yield db
+    except PoolTimeoutError:
+        pool_metrics.record_timeout()
+        raise
     finally:
+        pool_metrics.record_session(db.info.get("opened", False))
         db.close()
-
@@ -1,20 +1,27 @@
 """
 FastAPI主应用
 """
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
 from app.config import settings
-from app.database import engine, Base
+from app.core.dependencies import require_permission
+from app.core.startup import StartupTimer
+from app.core.static_files import ImmutableStaticFiles
+from app.database import engine
+import asyncio
 import traceback
 import logging
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# 启动耗时统计（从导入路由开始计时）
+startup_timer = StartupTimer()
+
 # Import routers
-from app.api import auth, products, customers, documents, websocket, import_export, dashboard
+with startup_timer.phase("import_routers"):
+    from app.api import auth, products, customers, documents, uploads, websocket, webhooks, permissions, import_export, dashboard, audit
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -40,14 +47,18 @@ app.include_router(auth.router, prefix="/api")
 app.include_router(products.router, prefix="/api")
 app.include_router(customers.router, prefix="/api")
 app.include_router(documents.router, prefix="/api")
+app.include_router(uploads.router, prefix="/api")
 app.include_router(websocket.router, prefix="/api")
+app.include_router(webhooks.router, prefix="/api")
+app.include_router(permissions.router, prefix="/api")
 app.include_router(import_export.router, prefix="/api")
 app.include_router(dashboard.router, prefix="/api")
+app.include_router(audit.router, prefix="/api")
 
-# Mount static files for uploaded documents
+# Mount static files for uploaded documents (immutable UUID paths, long-lived cache)
 upload_dir = Path(settings.UPLOAD_DIR)
 upload_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/api/files", StaticFiles(directory=str(upload_dir)), name="files")
+app.mount("/api/files", ImmutableStaticFiles(directory=str(upload_dir)), name="files")
 
 
 # 全局异常处理器
@@ -66,18 +77,92 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
-# 创建数据库表
+async def _timed(name: str, awaitable):
+    with startup_timer.phase(name):
+        return await awaitable
+
+
 @app.on_event("startup")
 async def startup_event():
     """应用启动时执行"""
-    # 创建所有表（生产环境应使用Alembic迁移）
-    Base.metadata.create_all(bind=engine)
+    # 校验迁移版本（一条查询）；生产环境不执行 DDL，版本落后时拒绝启动
+    from app.core.schema import verify_schema
+    with startup_timer.phase("schema"):
+        app.state.schema_status = await asyncio.to_thread(verify_schema, engine)
+
+    # 跨 worker 消息分发（WebSocket 广播等）
+    from app.core.pubsub import start_broker
+    with startup_timer.phase("pubsub"):
+        await start_broker()
+
+    # 并行加载进程内状态：令牌吊销列表（访问令牌按声明无状态校验，吊销只查内存）、
+    # 数据库中配置的角色权限、Webhook 订阅
+    from app.core.revocation import load_revocations
+    from app.core.permissions import reload_role_permissions
+    from app.core.webhooks import init_webhooks, webhook_dispatcher
+    await asyncio.gather(
+        _timed("revocations", asyncio.to_thread(load_revocations)),
+        _timed("role_permissions", reload_role_permissions()),
+        _timed("webhooks", init_webhooks()),
+    )
+
+    # Webhook 投递队列分发
+    if settings.WEBHOOK_DISPATCHER_ENABLED:
+        app.state.webhook_task = asyncio.create_task(webhook_dispatcher.run())
+
+    # 事务性发件箱：已提交的领域事件转为 Webhook 投递与 WebSocket 推送
+    if settings.OUTBOX_RELAY_ENABLED:
+        from app.core.outbox import outbox_relay
+        app.state.outbox_task = asyncio.create_task(outbox_relay.run())
+
+    # 审计日志分区：写入任务启动前同步建好当月及后续分区（与维护间隔无关），
+    # 之后由维护任务定期轮转与过期
+    if settings.AUDIT_LOG_ENABLED:
+        from app.services.audit_partitions import ensure_audit_partitions
+        with startup_timer.phase("audit_partitions"):
+            await asyncio.to_thread(ensure_audit_partitions)
+    if settings.AUDIT_MAINTENANCE_INTERVAL_HOURS > 0:
+        from app.services.audit_partitions import run_periodic_audit_maintenance
+        app.state.audit_maintenance_task = asyncio.create_task(
+            run_periodic_audit_maintenance(settings.AUDIT_MAINTENANCE_INTERVAL_HOURS)
+        )
+    if settings.AUDIT_LOG_ENABLED:
+        from app.core.audit import audit_writer
+        app.state.audit_task = asyncio.create_task(audit_writer.run())
+
+    # WebSocket 心跳与连接统计上报
+    app.state.ws_heartbeat_task = asyncio.create_task(websocket.manager.run_heartbeat())
+
+    # 定期清理孤儿文件
+    if settings.STORAGE_RECONCILE_INTERVAL_MINUTES > 0:
+        from app.services.reconciliation import run_periodic_reconciliation
+        app.state.reconcile_task = asyncio.create_task(
+            run_periodic_reconciliation(settings.STORAGE_RECONCILE_INTERVAL_MINUTES)
+        )
+
+    startup_timer.complete()
+    app.state.startup_timer = startup_timer
+    logger.info(f"Startup completed in {startup_timer.summary()}")
     print("[OK] {} v{} started successfully".format(settings.APP_NAME, settings.APP_VERSION))
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时执行"""
+    for task_name in ("reconcile_task", "ws_heartbeat_task", "webhook_task", "outbox_task", "audit_maintenance_task", "audit_task"):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
+    # 写完尚未落库的审计日志
+    from app.core.audit import audit_writer
+    audit_task = getattr(app.state, "audit_task", None)
+    if audit_task:
+        await asyncio.gather(audit_task, return_exceptions=True)
+    await audit_writer.close()
+    from app.core.pubsub import stop_broker
+    await stop_broker()
+    from app.core.webhooks import webhook_manager
+    await webhook_manager.aclose()
     print("[OK] {} shutdown".format(settings.APP_NAME))
 
 
@@ -97,6 +182,23 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/api/health/db", dependencies=[Depends(require_permission("system.monitor"))])
+async def database_pool_status():
+    """数据库连接池使用情况（需要 system.monitor 权限）"""
+    from app.database import pool_status
+    return pool_status()
+
+
+@app.get("/api/health/startup")
+async def startup_report():
+    """启动耗时与迁移版本"""
+    schema_status = getattr(app.state, "schema_status", None)
+    return {
+        **startup_timer.to_dict(),
+        "schema": schema_status.to_dict() if schema_status else None,
+    }
+
+
 # 导入路由（后续添加）
 # from app.api import auth, customers, documents, products, websocket
 # app.include_router(auth.router, prefix="/api/auth", tags=["认证"])
@@ -7,6 +7,11 @@ from app.models.loan_product import LoanProduct, ProductDocumentRequirement
 from app.models.document import DocumentType, CustomerDocument
 from app.models.audit_log import AuditLog
 from app.models.import_record import ImportRecord
+from app.models.upload_session import UploadSession
+from app.models.webhook import WebhookSubscriptionRecord, WebhookDelivery
+from app.models.outbox import OutboxEvent
+from app.models.revoked_token import RevokedToken
+from app.models.role_permission import RolePermission
 
 __all__ = [
     "User",
@@ -18,5 +23,11 @@ __all__ = [
     "CustomerDocument",
     "AuditLog",
     "ImportRecord",
+    "UploadSession",
+    "WebhookSubscriptionRecord",
+    "WebhookDelivery",
+    "OutboxEvent",
+    "RevokedToken",
+    "RolePermission",
 ]
 
@@ -1,7 +1,7 @@
 """
 审计日志模型
 """
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, JSON
 from sqlalchemy.sql import func
 import uuid
 from app.database import Base
@@ -10,14 +10,18 @@ from app.database import Base
 class AuditLog(Base):
     """操作日志表"""
     __tablename__ = "audit_logs"
+    # PostgreSQL 上为按月范围分区的父表，分区由 app.services.audit_partitions 维护
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    customer_id = Column(String(36), ForeignKey("customers.id"), index=True)
-    user_id = Column(String(36), ForeignKey("users.id"), index=True)
-    action = Column(String(50), nullable=False)  # upload, delete, approve, reject, create, update
+    # 不设外键：审计记录需在客户、用户删除后保留
+    customer_id = Column(String(36), index=True)
+    user_id = Column(String(36), index=True)
+    action = Column(String(50), nullable=False)  # upload, delete, approve, reject, create, update, bulk_assign, bulk_unassign, bulk_transfer
     details = Column(JSON)  # 使用通用 JSON 类型，支持 SQLite 和 PostgreSQL
     ip_address = Column(String(50))
-    created_at = Column(DateTime(timezone=True), default=func.now(), index=True)
+    # 分区键须包含在主键中
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=func.now(), index=True)
     
     def __repr__(self):
         return f"<AuditLog {self.action} by {self.user_id}>"
@@ -1,7 +1,7 @@
 """
 客户模型
 """
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -38,6 +38,10 @@ class Customer(Base):
 class CustomerAssignment(Base):
     """客户分配表"""
     __tablename__ = "customer_assignments"
+    __table_args__ = (
+        # 同一客户不能重复分配给同一用户；按用户查询已分配客户时可只扫描索引
+        UniqueConstraint("user_id", "customer_id", name="uq_customer_assignments_user_customer"),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     customer_id = Column(String(36), ForeignKey("customers.id"), nullable=False)
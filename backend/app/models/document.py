@@ -39,9 +39,10 @@ class CustomerDocument(Base):
     customer_id = Column(String(36), ForeignKey("customers.id"), nullable=False, index=True)
     document_type_id = Column(String(36), ForeignKey("document_types.id"), nullable=False)
     file_name = Column(String(255), nullable=False)
-    file_path = Column(String(500), nullable=False)
+    file_path = Column(String(500), nullable=False, index=True)
     file_size = Column(BigInteger)
     file_type = Column(String(50))
+    file_md5 = Column(String(32))  # 文件内容MD5（十六进制），文件路径不可变，可作为强ETag
     uploaded_by = Column(String(36), ForeignKey("users.id"), nullable=False)
     upload_source = Column(String(20))  # mobile, pc, scanner
     status = Column(String(20), default="pending")  # pending, approved, rejected
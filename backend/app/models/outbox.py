@@ -0,0 +1,30 @@
+"""
+事务性发件箱模型
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class OutboxEvent(Base):
+    """
+    领域事件发件箱表
+    与业务数据在同一事务中写入，提交后由后台中继按 id 顺序转发到 Webhook 与 WebSocket；
+    事务回滚时事件一并消失，不会发出未提交的变更
+    """
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # 中继按 processed_at IS NULL + id 顺序取未处理事件
+        Index("ix_outbox_events_processed_id", "processed_at", "id"),
+    )
+
+    # 自增主键决定事件顺序（SQLite 仅 INTEGER 主键支持自增）
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event = Column(String(50), nullable=False)  # WebhookEvent 值，如 document.uploaded
+    customer_id = Column(String(36), index=True)  # 关联客户，用于 WebSocket 推送（客户删除后事件仍保留）
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=func.now())
+    processed_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<OutboxEvent {self.id} {self.event}>"
@@ -0,0 +1,23 @@
+"""
+令牌吊销记录模型
+"""
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class RevokedToken(Base):
+    """
+    令牌吊销表
+    记录已吊销的令牌（jti）、整个登录会话（sid）或用户的令牌截止时间（user:<用户ID>），过期后可清理
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(String(64), primary_key=True)  # 令牌 jti、会话 sid 或 user:<用户ID>
+    user_id = Column(String(36), index=True)
+    reason = Column(String(20), nullable=False)  # rotated, logout, reuse_detected, user_changed
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # 原令牌/会话的过期时间
+    revoked_at = Column(DateTime(timezone=True), default=func.now())  # user_changed 时为截止时间
+
+    def __repr__(self):
+        return f"<RevokedToken {self.id} {self.reason}>"
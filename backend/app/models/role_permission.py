@@ -0,0 +1,27 @@
+"""
+角色权限模型
+"""
+from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+
+class RolePermission(Base):
+    """
+    角色权限表
+    配置了记录的角色以表中权限为准，其余角色使用代码中的默认配置（ROLE_PERMISSIONS）
+    """
+    __tablename__ = "role_permissions"
+    __table_args__ = (
+        UniqueConstraint("role", "permission", name="uq_role_permissions_role_permission"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    role = Column(String(20), nullable=False, index=True)
+    permission = Column(String(100), nullable=False)  # 如 document.review、document.*、*
+    created_by = Column(String(36), ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), default=func.now())
+
+    def __repr__(self):
+        return f"<RolePermission {self.role} {self.permission}>"
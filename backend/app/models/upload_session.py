@@ -0,0 +1,38 @@
+"""
+断点续传上传会话模型
+"""
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, Text
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+
+class UploadSession(Base):
+    """分片上传会话表"""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    customer_id = Column(String(36), ForeignKey("customers.id"), nullable=False, index=True)
+    document_type_id = Column(String(36), ForeignKey("document_types.id"), nullable=False)
+    file_name = Column(String(255), nullable=False)
+    file_type = Column(String(100))
+    file_size = Column(BigInteger, nullable=False)  # 客户端声明的文件总大小
+    received_size = Column(BigInteger, nullable=False, default=0)  # 已接收字节数（即下一个分片的偏移量）
+    status = Column(String(20), nullable=False, default="uploading")  # uploading, finalized, aborted, expired, rejected
+    mode = Column(String(20), nullable=False, default="chunked")  # chunked: 分片经API上传；direct: 客户端直传对象存储
+    file_path = Column(String(500))  # direct 模式下预先生成的存储路径
+    file_md5 = Column(String(32))  # direct 模式下客户端声明的文件MD5（十六进制）
+    upload_source = Column(String(20))
+    note = Column(Text)
+    created_by = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+    @property
+    def is_complete(self) -> bool:
+        """是否已接收全部字节"""
+        return self.received_size >= self.file_size
+
+    def __repr__(self):
+        return f"<UploadSession {self.file_name} {self.received_size}/{self.file_size}>"
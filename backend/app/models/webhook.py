@@ -0,0 +1,56 @@
+"""
+Webhook 投递模型
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, ForeignKey, Text, Index, JSON
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+
+class WebhookSubscriptionRecord(Base):
+    """Webhook 订阅表，启动时及变更后加载到内存的事件路由索引"""
+    __tablename__ = "webhook_subscriptions"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    url = Column(String(500), unique=True, nullable=False)
+    events = Column(JSON, nullable=False)  # 订阅的事件类型列表，如 ["customer.created"]
+    secret = Column(String(255))  # 签名密钥
+    headers = Column(JSON)  # 自定义请求头
+    enabled = Column(Boolean, nullable=False, default=True)
+    batch = Column(Boolean, nullable=False, default=False)  # 是否接收批量事件
+    description = Column(String(200))
+    created_by = Column(String(36), ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<WebhookSubscriptionRecord {self.url}>"
+
+
+class WebhookDelivery(Base):
+    """Webhook 投递队列表（发件箱），由后台分发器异步发送并重试"""
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        # 分发器按状态与到期时间取待发送记录
+        Index("ix_webhook_deliveries_status_next_attempt", "status", "next_attempt_at"),
+        # 分发器按顺序键查找同一订阅中更早的未完成记录
+        Index("ix_webhook_deliveries_ordering", "url", "ordering_key", "sequence"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    url = Column(String(500), nullable=False, index=True)  # 订阅地址
+    event = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # 序列化后的 JSON，入队时只序列化一次
+    status = Column(String(20), nullable=False, default="pending")  # pending, delivering, delivered, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)  # 下次发送时间；delivering 状态下为租约到期时间
+    claimed_by = Column(String(50))  # 正在发送的 worker
+    ordering_key = Column(String(100))  # 顺序键（如 customer:<id>），同一订阅下相同顺序键的记录按 sequence 依次投递
+    sequence = Column(BigInteger)  # 发件箱事件 id
+    last_status_code = Column(Integer)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), default=func.now(), index=True)
+    delivered_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<WebhookDelivery {self.event} -> {self.url} ({self.status})>"
@@ -8,8 +8,11 @@ from .user import (
     UserResponse,
     UserLogin,
     Token,
+    TokenRefresh,
     TokenData,
     PasswordChange,
+    RolePermissionsUpdate,
+    RolePermissionsResponse,
 )
 from .loan_product import (
     DocumentTypeBase,
@@ -34,6 +37,8 @@ from .customer import (
     CustomerSimple,
     CustomerAssignmentCreate,
     CustomerAssignmentResponse,
+    CustomerBulkAssignment,
+    CustomerBulkAssignmentResult,
     CustomerImportRow,
     CustomerImportResult,
 )
@@ -43,15 +48,30 @@ from .document import (
     CustomerDocumentUpdate,
     CustomerDocumentResponse,
     FileUploadResponse,
+    UploadSessionCreate,
+    UploadSessionResponse,
+    DirectUploadCreate,
+    DirectUploadResponse,
+    UploadFinalize,
     DocumentReview,
+    DocumentBulkReview,
+    DocumentBulkReviewResult,
     DocumentRequirementStatus,
     CompletenessResult,
+    ReconciliationReport,
+)
+from .webhook import (
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionUpdate,
+    WebhookSubscriptionResponse,
+    WebhookDeliveryResponse,
 )
 from .common import (
     PaginatedResponse,
     ApiResponse,
     ErrorResponse,
     AuditLogResponse,
+    AuditMaintenanceReport,
 )
 
 __all__ = [
@@ -62,8 +82,11 @@ __all__ = [
     "UserResponse",
     "UserLogin",
     "Token",
+    "TokenRefresh",
     "TokenData",
     "PasswordChange",
+    "RolePermissionsUpdate",
+    "RolePermissionsResponse",
     # Loan Product
     "DocumentTypeBase",
     "DocumentTypeCreate",
@@ -86,6 +109,8 @@ __all__ = [
     "CustomerSimple",
     "CustomerAssignmentCreate",
     "CustomerAssignmentResponse",
+    "CustomerBulkAssignment",
+    "CustomerBulkAssignmentResult",
     "CustomerImportRow",
     "CustomerImportResult",
     # Document
@@ -94,13 +119,27 @@ __all__ = [
     "CustomerDocumentUpdate",
     "CustomerDocumentResponse",
     "FileUploadResponse",
+    "UploadSessionCreate",
+    "UploadSessionResponse",
+    "DirectUploadCreate",
+    "DirectUploadResponse",
+    "UploadFinalize",
     "DocumentReview",
+    "DocumentBulkReview",
+    "DocumentBulkReviewResult",
     "DocumentRequirementStatus",
     "CompletenessResult",
+    "ReconciliationReport",
+    # Webhook
+    "WebhookSubscriptionCreate",
+    "WebhookSubscriptionUpdate",
+    "WebhookSubscriptionResponse",
+    "WebhookDeliveryResponse",
     # Common
     "PaginatedResponse",
     "ApiResponse",
     "ErrorResponse",
     "AuditLogResponse",
+    "AuditMaintenanceReport",
 ]
 
@@ -1,6 +1,7 @@
 """
 Common Schemas
 """
+from datetime import datetime
 from typing import Generic, TypeVar, List, Optional
 from pydantic import BaseModel, Field
 
@@ -40,8 +41,18 @@ class AuditLogResponse(BaseModel):
     action: str
     details: Optional[dict] = None
     ip_address: Optional[str] = None
-    created_at: str
+    created_at: datetime
 
     class Config:
         from_attributes = True
 
+
+class AuditMaintenanceReport(BaseModel):
+    skipped: bool = Field(False, description="Another worker was already running maintenance")
+    partitions: List[str] = Field(default_factory=list, description="Month tables after maintenance")
+    created: List[str] = Field(default_factory=list)
+    rotated: List[str] = Field(default_factory=list)
+    dropped: List[str] = Field(default_factory=list)
+    archived_rows: int = 0
+    duration_seconds: float = 0.0
+
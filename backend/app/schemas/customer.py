@@ -1,9 +1,9 @@
 """
 Customer Schemas
 """
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime, date
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from uuid import UUID
 
 from .loan_product import LoanProductSimple
@@ -68,6 +68,35 @@ class CustomerAssignmentResponse(BaseModel):
         from_attributes = True
 
 
+# Bulk Assignment
+class CustomerBulkAssignment(BaseModel):
+    action: Literal["assign", "unassign", "transfer"]
+    user_id: UUID = Field(..., description="User to assign to / unassign from / transfer to")
+    from_user_id: Optional[UUID] = Field(None, description="Current assignee, required for transfer")
+    customer_ids: Optional[List[UUID]] = Field(None, max_length=10000, description="Explicit customers")
+    status: Optional[str] = Field(None, description="Filter: customer status")
+    product_id: Optional[UUID] = Field(None, description="Filter: loan product")
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if self.action == "transfer":
+            if self.from_user_id is None:
+                raise ValueError("from_user_id is required for transfer")
+            if self.from_user_id == self.user_id:
+                raise ValueError("from_user_id and user_id must differ")
+        elif self.customer_ids is None and self.status is None and self.product_id is None:
+            raise ValueError("Provide customer_ids or at least one filter")
+        return self
+
+
+class CustomerBulkAssignmentResult(BaseModel):
+    action: str
+    matched: int = Field(0, description="Customers selected")
+    assigned: int = Field(0, description="Assignments created for, or moved to, user_id")
+    unassigned: int = Field(0, description="Assignments removed (from from_user_id on transfer)")
+    skipped: int = Field(0, description="Selected customers already in the requested state")
+
+
 # Response Schema
 class CustomerResponse(CustomerBase):
     id: UUID
@@ -1,7 +1,7 @@
 """
 Document Schemas
 """
-from typing import Optional, List
+from typing import Dict, Optional, List, Literal
 from datetime import datetime
 from pydantic import BaseModel, Field, computed_field
 from uuid import UUID
@@ -42,6 +42,7 @@ class CustomerDocumentResponse(CustomerDocumentBase):
     id: UUID
     file_path: str
     file_url: Optional[str] = None  # Signed URL for download
+    file_md5: Optional[str] = None
     status: str
     uploaded_by: Optional[UUID] = None
     created_at: datetime  # Database field - represents upload time
@@ -68,6 +69,45 @@ class FileUploadResponse(BaseModel):
     uploaded_at: datetime
 
 
+# Resumable Upload Session Schemas
+class UploadSessionCreate(BaseModel):
+    customer_id: UUID
+    document_type_id: UUID
+    file_name: str = Field(..., max_length=255)
+    file_size: int = Field(..., gt=0, description="Total file size in bytes")
+    file_type: Optional[str] = Field(None, max_length=100, description="MIME type")
+    upload_source: str = Field("mobile", description="Upload source: web, mobile, scanner")
+    note: Optional[str] = None
+
+
+class DirectUploadCreate(UploadSessionCreate):
+    file_type: str = Field(..., max_length=100, description="MIME type sent with the PUT")
+    file_md5: str = Field(..., pattern=r"^[0-9a-fA-F]{32}$", description="Hex MD5 of the file content")
+
+
+class UploadSessionResponse(BaseModel):
+    upload_id: UUID
+    mode: str = "chunked"
+    customer_id: UUID
+    document_type_id: UUID
+    file_name: str
+    file_size: int
+    received_size: int = Field(..., description="Offset of the next chunk")
+    status: str
+    chunk_size: int = Field(..., description="Recommended chunk size in bytes")
+    expires_at: datetime
+
+
+class DirectUploadResponse(UploadSessionResponse):
+    method: str = "PUT"
+    upload_url: str = Field(..., description="Presigned URL to upload the file to")
+    upload_headers: Dict[str, str] = Field(default_factory=dict, description="Headers to send with the upload")
+
+
+class UploadFinalize(BaseModel):
+    upload_ids: List[UUID] = Field(..., min_length=1, description="Upload sessions to turn into documents")
+
+
 # Document Review Schema
 class DocumentReview(BaseModel):
     status: str = Field(..., description="approved or rejected")
@@ -97,3 +137,30 @@ class CompletenessResult(BaseModel):
     is_complete: bool
     requirements: List[DocumentRequirementStatus]
 
+
+# Bulk Review Schemas
+class DocumentBulkReview(BaseModel):
+    document_ids: List[UUID] = Field(..., min_length=1, max_length=500)
+    status: Literal["approved", "rejected"]
+    review_note: Optional[str] = None
+
+
+class DocumentBulkReviewResult(BaseModel):
+    updated: int
+    not_found: List[UUID] = Field(default_factory=list, description="Requested ids that do not exist")
+    completeness: List[CompletenessResult] = Field(default_factory=list, description="Affected customers after the review")
+
+
+
+# Storage Reconciliation Report
+class ReconciliationReport(BaseModel):
+    dry_run: bool = False
+    scanned_files: int = 0
+    orphan_files: int = 0
+    reclaimed_bytes: int = 0
+    promoted_files: int = 0
+    expired_sessions: int = 0
+    dangling_documents: int = 0
+    dangling_document_ids: List[str] = Field(default_factory=list, description="First dangling document IDs (capped)")
+    backfilled_md5: int = 0
+    duration_seconds: float = 0.0
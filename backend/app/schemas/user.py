@@ -1,9 +1,9 @@
 """
 User Schemas
 """
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, constr
 from uuid import UUID
 
 
@@ -62,9 +62,28 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = Field(None, description="Access token lifetime in seconds")
+
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
     user_id: Optional[UUID] = None
     username: Optional[str] = None
 
+
+# Role Permission Schemas
+class RolePermissionsUpdate(BaseModel):
+    permissions: List[constr(pattern=r"^(\*|[a-z_]+(\.[a-z_]+)*(\.\*)?)$", max_length=100)] = Field(
+        ..., description="e.g. document.review, document.* or *; an empty list restores the defaults"
+    )
+
+
+class RolePermissionsResponse(BaseModel):
+    role: str
+    permissions: List[str]
+    version: str
+    source: str = Field(..., description="database or default")
@@ -0,0 +1,71 @@
+"""
+Webhook Schemas
+"""
+from typing import Optional, List, Dict
+from datetime import datetime
+from pydantic import BaseModel, Field, computed_field
+from uuid import UUID
+
+from ..core.webhooks import WebhookEvent
+
+
+# Subscription Create Schema
+class WebhookSubscriptionCreate(BaseModel):
+    url: str = Field(..., max_length=500, pattern=r"^https?://", description="Endpoint that receives POSTed events")
+    events: List[WebhookEvent] = Field(..., min_length=1, description="Subscribed event types")
+    secret: Optional[str] = Field(None, max_length=255, description="HMAC-SHA256 signing secret")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Extra request headers")
+    enabled: bool = True
+    batch: bool = Field(False, description="Receive every POST as {\"events\": [...]}, with several events per request when queued")
+    description: Optional[str] = Field(None, max_length=200)
+
+
+# Subscription Update Schema
+class WebhookSubscriptionUpdate(BaseModel):
+    url: Optional[str] = Field(None, max_length=500, pattern=r"^https?://")
+    events: Optional[List[WebhookEvent]] = Field(None, min_length=1)
+    secret: Optional[str] = Field(None, max_length=255)
+    headers: Optional[Dict[str, str]] = None
+    enabled: Optional[bool] = None
+    batch: Optional[bool] = None
+    description: Optional[str] = Field(None, max_length=200)
+
+
+# Subscription Response Schema (the secret is never returned)
+class WebhookSubscriptionResponse(BaseModel):
+    id: UUID
+    url: str
+    events: List[str]
+    headers: Optional[Dict[str, str]] = None
+    enabled: bool
+    batch: bool
+    description: Optional[str] = None
+    created_by: Optional[UUID] = None
+    created_at: datetime
+    updated_at: datetime
+    secret: Optional[str] = Field(None, exclude=True)
+
+    class Config:
+        from_attributes = True
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def has_secret(self) -> bool:
+        return bool(self.secret)
+
+
+# Delivery Response Schema
+class WebhookDeliveryResponse(BaseModel):
+    id: UUID
+    url: str
+    event: str
+    status: str
+    attempts: int
+    next_attempt_at: datetime
+    last_status_code: Optional[int] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    delivered_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,122 @@
+"""
+Bulk Customer Assignment Service
+"""
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import String, cast, delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session, aliased
+
+from ..models.customer import Customer, CustomerAssignment
+
+
+class BulkAssignmentService:
+    """
+    Set-based assignment changes: each operation runs a fixed number of
+    statements no matter how many customers it touches
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    @staticmethod
+    def customer_conditions(
+        customer_ids: Optional[List[UUID]] = None,
+        status: Optional[str] = None,
+        product_id: Optional[UUID] = None
+    ) -> list:
+        """
+        Build the WHERE conditions selecting customers by id list and filters
+        """
+        conditions = []
+        if customer_ids is not None:
+            conditions.append(Customer.id.in_([str(customer_id) for customer_id in customer_ids]))
+        if status:
+            conditions.append(Customer.status == status)
+        if product_id:
+            conditions.append(Customer.product_id == str(product_id))
+        return conditions
+
+    def count_customers(self, conditions: list) -> int:
+        """
+        Count the selected customers
+        """
+        return self.db.scalar(select(func.count(Customer.id)).where(*conditions))
+
+    def assign(self, user_id: str, conditions: list) -> int:
+        """
+        Assign every selected customer to a user with one INSERT ... SELECT
+        Existing assignments are left alone via ON CONFLICT DO NOTHING.
+
+        Returns:
+            Number of assignments created
+        """
+        rows = select(
+            self._uuid_expression(),
+            Customer.id,
+            literal(str(user_id), String),
+            func.now()
+        ).where(*conditions)
+        columns = ["id", "customer_id", "user_id", "assigned_at"]
+
+        if self.dialect in ("postgresql", "sqlite"):
+            if self.dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            statement = dialect_insert(CustomerAssignment).from_select(columns, rows).on_conflict_do_nothing(
+                index_elements=["user_id", "customer_id"]
+            )
+        else:
+            existing = select(CustomerAssignment.customer_id).where(CustomerAssignment.user_id == str(user_id))
+            statement = insert(CustomerAssignment).from_select(columns, rows.where(Customer.id.not_in(existing)))
+
+        return self.db.execute(statement).rowcount
+
+    def unassign(self, user_id: str, conditions: list) -> int:
+        """
+        Remove a user's assignments to every selected customer with one DELETE
+
+        Returns:
+            Number of assignments removed
+        """
+        statement = delete(CustomerAssignment).where(CustomerAssignment.user_id == str(user_id))
+        if conditions:
+            statement = statement.where(CustomerAssignment.customer_id.in_(select(Customer.id).where(*conditions)))
+        return self.db.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+    def transfer(self, from_user_id: str, to_user_id: str, conditions: list) -> tuple:
+        """
+        Move assignments from one user to another
+        One UPDATE re-points the rows the target does not already have; one
+        DELETE drops the remaining duplicates.
+
+        Returns:
+            (moved, duplicates removed)
+        """
+        target = aliased(CustomerAssignment)
+        already_assigned = select(target.customer_id).where(target.user_id == str(to_user_id))
+
+        moved = update(CustomerAssignment).where(
+            CustomerAssignment.user_id == str(from_user_id),
+            CustomerAssignment.customer_id.not_in(already_assigned)
+        )
+        if conditions:
+            moved = moved.where(CustomerAssignment.customer_id.in_(select(Customer.id).where(*conditions)))
+        moved = moved.values(user_id=str(to_user_id), assigned_at=func.now())
+        moved_count = self.db.execute(moved.execution_options(synchronize_session=False)).rowcount
+
+        duplicates = self.unassign(from_user_id, conditions)
+        return moved_count, duplicates
+
+    def _uuid_expression(self):
+        """
+        SQL expression generating a UUID string per inserted row
+        """
+        if self.dialect == "postgresql":
+            return cast(func.gen_random_uuid(), String)
+        if self.dialect == "mysql":
+            return func.uuid()
+        # SQLite: format random bytes as 8-4-4-4-12 hex groups
+        parts = [func.lower(func.hex(func.randomblob(size))) for size in (4, 2, 2, 2, 6)]
+        return func.printf("%s-%s-%s-%s-%s", *parts)
@@ -0,0 +1,372 @@
+"""
+Audit Log Partition Service
+
+Keeps audit_logs split by calendar month so that queries and retention only
+touch the months involved:
+
+- PostgreSQL: audit_logs is range-partitioned on created_at with one
+  partition per month (audit_logs_YYYYMM); partitions are created ahead of
+  time and the planner prunes them for time-bounded queries.
+- SQLite (and a PostgreSQL audit_logs that was never partitioned): rows of
+  completed months are rotated out of audit_logs into audit_logs_YYYYMM
+  tables; queries union only the tables in range.
+
+Months older than the retention period are written to gzip-compressed JSON
+lines under AUDIT_ARCHIVE_DIR and then dropped.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import column, delete, func, insert, inspect, select, table, text, union_all
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..core.pubsub import json_default
+from ..database import SessionLocal
+from ..models.audit_log import AuditLog
+from ..schemas.common import AuditMaintenanceReport
+
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = AuditLog.__tablename__
+PARTITION_PATTERN = re.compile(rf"^{PARENT_TABLE}_(\d{{4}})(\d{{2}})$")
+
+# Serializes maintenance across workers on PostgreSQL
+MAINTENANCE_LOCK_ID = 0x61756469
+
+
+def as_utc(value: datetime) -> datetime:
+    """
+    Convert to UTC, treating naive datetimes as UTC
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def month_start(value: datetime) -> datetime:
+    """
+    First instant of the month containing value (UTC)
+    """
+    value = as_utc(value)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """
+    Shift a month start by a number of months
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: datetime) -> str:
+    """
+    Table name holding the given month, e.g. audit_logs_202610
+    """
+    return f"{PARENT_TABLE}_{month.year:04d}{month.month:02d}"
+
+
+def audit_table(name: str):
+    """
+    Lightweight table construct for a parent or month table, typed like AuditLog
+    """
+    return table(name, *(column(audit_column.name, audit_column.type) for audit_column in AuditLog.__table__.columns))
+
+
+class AuditPartitionManager:
+    """
+    Creates, rotates, archives and queries monthly audit log tables
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.partitioned = db.get_bind().dialect.name == "postgresql" and bool(db.scalar(text(
+            "SELECT 1 FROM pg_partitioned_table JOIN pg_class ON pg_partitioned_table.partrelid = pg_class.oid "
+            "WHERE pg_class.relname = :parent"
+        ), {"parent": PARENT_TABLE}))
+
+    def list_partitions(self) -> List[Tuple[datetime, str]]:
+        """
+        Existing month tables as (month start, table name), oldest first
+        """
+        if self.partitioned:
+            names = self.db.execute(text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+                "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+                "WHERE parent.relname = :parent"
+            ), {"parent": PARENT_TABLE}).scalars().all()
+        else:
+            names = inspect(self.db.connection()).get_table_names()
+
+        partitions = []
+        for name in names:
+            match = PARTITION_PATTERN.match(name)
+            if match:
+                month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+                partitions.append((month, name))
+        return sorted(partitions)
+
+    def ensure_partitions(self, months_ahead: Optional[int] = None) -> List[str]:
+        """
+        Create PostgreSQL partitions from the current month up to months_ahead
+        SQLite month tables are created on rotation instead.
+
+        Returns:
+            Names of the partitions created
+        """
+        if not self.partitioned:
+            return []
+        if months_ahead is None:
+            months_ahead = settings.AUDIT_PARTITION_MONTHS_AHEAD
+
+        existing = {name for _, name in self.list_partitions()}
+        current = month_start(datetime.now(timezone.utc))
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(month)
+            if name in existing:
+                continue
+            self.db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+        return created
+
+    def rotate(self) -> List[str]:
+        """
+        Without native partitioning, move rows of completed months out of
+        audit_logs into month tables
+
+        Returns:
+            Names of the month tables that received rows
+        """
+        if self.partitioned:
+            return []
+        current = month_start(datetime.now(timezone.utc))
+        oldest = self.db.scalar(select(func.min(AuditLog.created_at)).where(AuditLog.created_at < current))
+        if oldest is None:
+            return []
+
+        parent = audit_table(PARENT_TABLE)
+        rotated = []
+        month = month_start(oldest)
+        while month < current:
+            next_month = add_months(month, 1)
+            in_month = (parent.c.created_at >= month, parent.c.created_at < next_month)
+            if self.db.scalar(select(parent.c.id).where(*in_month).limit(1)):
+                name = partition_name(month)
+                self.db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} AS SELECT * FROM {PARENT_TABLE} WHERE 1 = 0"))
+                for indexed in ("customer_id", "user_id", "created_at"):
+                    self.db.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{name}_{indexed} ON {name} ({indexed})"))
+                self.db.execute(insert(audit_table(name)).from_select([c.name for c in parent.c], select(parent).where(*in_month)))
+                self.db.execute(delete(parent).where(*in_month))
+                rotated.append(name)
+            month = next_month
+        return rotated
+
+    def expire(self, retention_months: Optional[int] = None, archive: Optional[bool] = None) -> Tuple[List[str], int]:
+        """
+        Archive and drop month tables older than the retention period
+
+        Returns:
+            (dropped table names, archived rows)
+        """
+        if retention_months is None:
+            retention_months = settings.AUDIT_RETENTION_MONTHS
+        if archive is None:
+            archive = settings.AUDIT_ARCHIVE_ENABLED
+        cutoff = add_months(month_start(datetime.now(timezone.utc)), -retention_months)
+
+        dropped = []
+        archived_rows = 0
+        for month, name in self.list_partitions():
+            if month >= cutoff:
+                continue
+            if archive:
+                archived_rows += self.archive_partition(name)
+            if self.partitioned:
+                self.db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            self.db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+        return dropped, archived_rows
+
+    def archive_partition(self, name: str) -> int:
+        """
+        Write a month table to AUDIT_ARCHIVE_DIR/<name>.jsonl.gz
+        Rows are streamed; the file only replaces an earlier archive once complete.
+
+        Returns:
+            Number of rows written
+        """
+        archive_dir = Path(settings.AUDIT_ARCHIVE_DIR)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        target = archive_dir / f"{name}.jsonl.gz"
+        partial = target.with_suffix(".gz.partial")
+
+        source = audit_table(name)
+        rows = 0
+        result = self.db.execute(
+            select(source).order_by(source.c.created_at).execution_options(yield_per=1000)
+        )
+        with gzip.open(partial, "wt", encoding="utf-8") as archive_file:
+            for row in result.mappings():
+                archive_file.write(json.dumps(dict(row), default=json_default, ensure_ascii=False) + "\n")
+                rows += 1
+        os.replace(partial, target)
+        return rows
+
+    def query(
+        self,
+        start: datetime,
+        end: datetime,
+        customer_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        action: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[int, list]:
+        """
+        Audit logs in [start, end), newest first
+        Only the tables covering the range are read: PostgreSQL prunes
+        partitions on the created_at bounds, otherwise the month tables in
+        range are unioned with audit_logs.
+
+        Returns:
+            (total, rows)
+        """
+        start, end = as_utc(start), as_utc(end)
+        if self.partitioned:
+            sources = [PARENT_TABLE]
+        else:
+            first_month = month_start(start)
+            sources = [
+                name for month, name in self.list_partitions()
+                if first_month <= month < end
+            ] + [PARENT_TABLE]
+
+        selects = []
+        for name in sources:
+            source = audit_table(name)
+            statement = select(source).where(source.c.created_at >= start, source.c.created_at < end)
+            if customer_id:
+                statement = statement.where(source.c.customer_id == str(customer_id))
+            if user_id:
+                statement = statement.where(source.c.user_id == str(user_id))
+            if action:
+                statement = statement.where(source.c.action == action)
+            selects.append(statement)
+
+        combined = (selects[0] if len(selects) == 1 else union_all(*selects)).subquery()
+        total = self.db.scalar(select(func.count()).select_from(combined))
+        rows = self.db.execute(
+            select(combined).order_by(combined.c.created_at.desc(), combined.c.id).offset(offset).limit(limit)
+        ).mappings().all()
+        return total, [dict(row) for row in rows]
+
+    def acquire_maintenance_lock(self, wait: bool = False) -> bool:
+        """
+        Take the transaction-scoped maintenance lock (PostgreSQL only)
+        With wait=True, block until the worker holding it commits.
+        """
+        if self.db.get_bind().dialect.name != "postgresql":
+            return True
+        if wait:
+            self.db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MAINTENANCE_LOCK_ID})
+            return True
+        return bool(self.db.scalar(text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": MAINTENANCE_LOCK_ID}))
+
+
+def ensure_audit_partitions() -> List[str]:
+    """
+    Create the partitions for the current and upcoming months
+    Called during startup before the audit writer runs, whatever the
+    maintenance interval; workers starting together wait for each other.
+
+    Returns:
+        Names of the partitions created
+    """
+    db = SessionLocal()
+    try:
+        manager = AuditPartitionManager(db)
+        if not manager.partitioned:
+            return []
+        manager.acquire_maintenance_lock(wait=True)
+        created = manager.ensure_partitions()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if created:
+        logger.info(f"Created audit partitions: {', '.join(created)}")
+    return created
+
+
+def run_audit_maintenance(
+    retention_months: Optional[int] = None,
+    archive: Optional[bool] = None
+) -> AuditMaintenanceReport:
+    """
+    Create upcoming partitions, rotate completed months and expire old ones
+    """
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        manager = AuditPartitionManager(db)
+        if not manager.acquire_maintenance_lock():
+            logger.info("Audit maintenance already running in another worker")
+            db.rollback()
+            return AuditMaintenanceReport(skipped=True)
+        created = manager.ensure_partitions()
+        rotated = manager.rotate()
+        dropped, archived_rows = manager.expire(retention_months=retention_months, archive=archive)
+        partitions = [name for _, name in manager.list_partitions()]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    report = AuditMaintenanceReport(
+        partitions=partitions,
+        created=created,
+        rotated=rotated,
+        dropped=dropped,
+        archived_rows=archived_rows,
+        duration_seconds=round(time.monotonic() - started, 3)
+    )
+    logger.info(
+        f"Audit maintenance: {len(created)} created, {len(rotated)} rotated, "
+        f"{len(dropped)} dropped ({archived_rows} rows archived)"
+    )
+    return report
+
+
+async def run_periodic_audit_maintenance(interval_hours: float) -> None:
+    """
+    Background task: run audit maintenance now and every interval_hours
+    The current month's partitions are created by ensure_audit_partitions()
+    during startup, so this task may lag behind the audit writer.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(run_audit_maintenance)
+        except Exception as e:
+            logger.error(f"Audit maintenance failed: {e}")
+        await asyncio.sleep(interval_hours * 3600)
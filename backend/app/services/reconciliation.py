@@ -0,0 +1,289 @@
+"""
+Storage Reconciliation Service
+
+Finds and removes files that have no document record (orphans), finishes
+interrupted staged uploads, expires abandoned upload sessions, reports
+document records whose file is missing (dangling), and backfills the MD5
+used as the ETag for files uploaded before it was recorded.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.document import CustomerDocument
+from ..models.upload_session import UploadSession
+from ..schemas.document import ReconciliationReport
+from .storage import storage_service
+
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_IDS = 100
+
+
+def iter_files(root: Path) -> Iterator[Tuple[str, int, float]]:
+    """
+    Walk a directory tree with os.scandir, yielding (relative_path, size, mtime)
+    Streams entries instead of building the full listing in memory.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        relative_path = Path(entry.path).relative_to(root).as_posix()
+                        yield relative_path, stat.st_size, stat.st_mtime
+        except FileNotFoundError:
+            continue
+
+
+def iter_batches(items: Iterator, batch_size: int) -> Iterator[List]:
+    """
+    Group an iterator into lists of at most batch_size items
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class StorageReconciler:
+    """
+    Reconcile UPLOAD_DIR and the staging area with the customer_documents table
+    Runs synchronously; call it from a worker thread inside the event loop.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int = None,
+        grace_seconds: int = None,
+        dry_run: bool = False
+    ):
+        self.db = db
+        self.batch_size = batch_size or settings.STORAGE_RECONCILE_BATCH_SIZE
+        self.grace_seconds = settings.STORAGE_RECONCILE_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        self.dry_run = dry_run
+
+    def run(self) -> ReconciliationReport:
+        """
+        Run a full reconciliation pass
+        """
+        started = time.monotonic()
+        report = ReconciliationReport(dry_run=self.dry_run)
+        cutoff = time.time() - self.grace_seconds
+
+        self._promote_pending_files(report, cutoff)
+        self._expire_upload_sessions(report, cutoff)
+        if storage_service.storage_type == "local":
+            self._remove_orphan_files(report, cutoff)
+            self._find_dangling_documents(report)
+        else:
+            logger.info("Skipping orphan scan: storage type %s is not local", storage_service.storage_type)
+
+        report.duration_seconds = round(time.monotonic() - started, 3)
+        logger.info(
+            "Storage reconciliation finished: %s orphan files (%s bytes), %s promoted, %s dangling documents",
+            report.orphan_files, report.reclaimed_bytes, report.promoted_files, report.dangling_documents
+        )
+        return report
+
+    def _known_file_paths(self, file_paths: List[str]) -> Set[str]:
+        # A precompressed "X.gz" sidecar belongs to the document that owns X
+        candidates = set(file_paths)
+        candidates.update(file_path[:-len(".gz")] for file_path in file_paths if file_path.endswith(".gz"))
+        rows = self.db.query(CustomerDocument.file_path).filter(
+            CustomerDocument.file_path.in_(list(candidates))
+        ).all()
+        known = {row.file_path for row in rows}
+        return {
+            file_path for file_path in file_paths
+            if file_path in known or (file_path.endswith(".gz") and file_path[:-len(".gz")] in known)
+        }
+
+    def _promote_pending_files(self, report: ReconciliationReport, cutoff: float) -> None:
+        """
+        Finish staged uploads whose rows were committed, drop those that never were
+        """
+        pending_root = storage_service.staging_dir / "pending"
+        if not pending_root.exists():
+            return
+
+        for batch in iter_batches(iter_files(pending_root), self.batch_size):
+            known = self._known_file_paths([file_path for file_path, _, _ in batch])
+            for file_path, size, mtime in batch:
+                if file_path in known:
+                    report.promoted_files += 1
+                    if not self.dry_run:
+                        asyncio.run(storage_service.promote_staged_file(file_path))
+                elif mtime < cutoff:
+                    report.orphan_files += 1
+                    report.reclaimed_bytes += size
+                    if not self.dry_run:
+                        storage_service.get_staged_file_path(file_path).unlink(missing_ok=True)
+
+        if not self.dry_run:
+            self._prune_empty_dirs(pending_root, cutoff)
+
+    def _expire_upload_sessions(self, report: ReconciliationReport, cutoff: float) -> None:
+        """
+        Expire abandoned upload sessions and remove their staging files or objects
+        """
+        now = datetime.now(timezone.utc)
+        expired = self.db.query(UploadSession.id, UploadSession.mode, UploadSession.file_path).filter(
+            UploadSession.status == "uploading",
+            UploadSession.expires_at < now
+        ).all()
+        expired_ids = {row.id for row in expired}
+        report.expired_sessions = len(expired_ids)
+
+        # Objects a client may have uploaded directly but never finalized
+        if not self.dry_run:
+            for row in expired:
+                if row.mode == "direct" and row.file_path:
+                    try:
+                        asyncio.run(storage_service.delete_file(row.file_path))
+                    except Exception as e:
+                        logger.warning(f"Failed to delete unfinalized object {row.file_path}: {e}")
+
+        if expired_ids and not self.dry_run:
+            for batch in iter_batches(iter(expired_ids), self.batch_size):
+                self.db.query(UploadSession).filter(
+                    UploadSession.id.in_(batch)
+                ).update({UploadSession.status: "expired"}, synchronize_session=False)
+            self.db.commit()
+
+        staging_root = storage_service.staging_dir
+        if not staging_root.exists():
+            return
+
+        # Staging files of expired, aborted or unknown sessions
+        with os.scandir(staging_root) as entries:
+            parts = [
+                (entry.name[:-len(".part")], entry.stat())
+                for entry in entries
+                if entry.is_file() and entry.name.endswith(".part")
+            ]
+        for batch in iter_batches(iter(parts), self.batch_size):
+            active = {
+                row.id for row in self.db.query(UploadSession.id).filter(
+                    UploadSession.id.in_([upload_id for upload_id, _ in batch]),
+                    UploadSession.status == "uploading"
+                ).all()
+            } - expired_ids
+            for upload_id, stat in batch:
+                if upload_id in active:
+                    continue
+                if upload_id not in expired_ids and stat.st_mtime >= cutoff:
+                    continue
+                report.orphan_files += 1
+                report.reclaimed_bytes += stat.st_size
+                if not self.dry_run:
+                    storage_service.get_staging_path(upload_id).unlink(missing_ok=True)
+
+    def _remove_orphan_files(self, report: ReconciliationReport, cutoff: float) -> None:
+        """
+        Remove files in UPLOAD_DIR that no document record points to
+        """
+        upload_root = storage_service.upload_dir
+        if not upload_root.exists():
+            return
+
+        for batch in iter_batches(iter_files(upload_root), self.batch_size):
+            report.scanned_files += len(batch)
+            known = self._known_file_paths([file_path for file_path, _, _ in batch])
+            for file_path, size, mtime in batch:
+                if file_path in known or mtime >= cutoff:
+                    continue
+                report.orphan_files += 1
+                report.reclaimed_bytes += size
+                if not self.dry_run:
+                    (upload_root / file_path).unlink(missing_ok=True)
+
+    def _find_dangling_documents(self, report: ReconciliationReport) -> None:
+        """
+        Report document records whose file no longer exists, and backfill
+        the MD5 of existing files that were stored without one
+        Walks customer_documents in primary key order, one batch at a time.
+        """
+        last_id = None
+        while True:
+            query = self.db.query(CustomerDocument.id, CustomerDocument.file_path, CustomerDocument.file_md5)
+            if last_id is not None:
+                query = query.filter(CustomerDocument.id > last_id)
+            rows = query.order_by(CustomerDocument.id).limit(self.batch_size).all()
+            if not rows:
+                break
+
+            backfill = []
+            for row in rows:
+                local_path = storage_service.get_local_file_path(row.file_path)
+                if local_path.exists():
+                    if not row.file_md5:
+                        backfill.append({"id": row.id, "file_md5": storage_service.compute_md5(local_path)})
+                    continue
+                if storage_service.get_staged_file_path(row.file_path).exists():
+                    continue
+                report.dangling_documents += 1
+                if len(report.dangling_document_ids) < MAX_REPORTED_IDS:
+                    report.dangling_document_ids.append(row.id)
+
+            report.backfilled_md5 += len(backfill)
+            if backfill and not self.dry_run:
+                self.db.bulk_update_mappings(CustomerDocument, backfill)
+                self.db.commit()
+
+            last_id = rows[-1].id
+
+    @staticmethod
+    def _prune_empty_dirs(root: Path, cutoff: float) -> None:
+        for directory, _, _ in os.walk(root, topdown=False):
+            path = Path(directory)
+            if path == root:
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.rmdir()
+            except OSError:
+                # Not empty, or already gone
+                continue
+
+
+def reconcile_storage(dry_run: bool = False, grace_seconds: int = None) -> ReconciliationReport:
+    """
+    Run a reconciliation pass with its own database session
+    """
+    db = SessionLocal()
+    try:
+        return StorageReconciler(db, grace_seconds=grace_seconds, dry_run=dry_run).run()
+    finally:
+        db.close()
+
+
+async def run_periodic_reconciliation(interval_minutes: int) -> None:
+    """
+    Background task: reconcile storage every interval_minutes
+    """
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            await asyncio.to_thread(reconcile_storage)
+        except Exception as e:
+            logger.error(f"Storage reconciliation failed: {e}")
@@ -1,14 +1,24 @@
 """
 File Storage Service
 """
+import asyncio
+import base64
+import gzip
+import hashlib
+import io
 import os
+import shutil
 import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import BinaryIO, Optional
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 from ..config import settings
 
+# Request body bytes buffered before each threaded write of a chunk
+CHUNK_WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 class StorageService:
     """
@@ -18,9 +28,24 @@ class StorageService:
     def __init__(self):
         self.storage_type = settings.STORAGE_TYPE
         self.upload_dir = Path(settings.UPLOAD_DIR)
+        # Chunked uploads are always staged on local disk, whatever the storage type
+        self.staging_dir = Path(settings.UPLOAD_STAGING_DIR)
+        
+        # Object storage clients are created on first use
+        self._oss_bucket = None
+        self._minio_client = None
+        # upload_id -> [lock, number of holders and waiters]
+        self._chunk_locks: Dict[str, list] = {}
         
         if self.storage_type == "local":
             self.upload_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def supports_direct_upload(self) -> bool:
+        """
+        Whether clients can upload straight to storage with a presigned URL
+        """
+        return self.storage_type in ("oss", "minio")
     
     def generate_file_path(self, original_filename: str, customer_id: str, document_type_code: str = None) -> str:
         """
@@ -66,51 +91,300 @@ class StorageService:
         Save file to local storage
         """
         full_path = self.upload_dir / file_path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # Read content if it's a file-like object
+        if hasattr(file, 'read'):
+            content = file.read()
+            if hasattr(content, '__await__'):
+                content = await content
+        else:
+            content = file
+
+        # Disk writes run in a worker thread so concurrent saves don't block the event loop
+        await asyncio.to_thread(self._write_local, full_path, content)
+
+        return file_path
+
+    @staticmethod
+    def _write_local(full_path: Path, content: bytes) -> None:
+        full_path.parent.mkdir(parents=True, exist_ok=True)
         with open(full_path, "wb") as f:
-            # Read content if it's a file-like object
-            if hasattr(file, 'read'):
-                content = file.read()
-                if hasattr(content, '__await__'):
-                    content = await content
-            else:
-                content = file
             f.write(content)
 
+    # ------------------------------------------------------------------
+    # Staged writes
+    #
+    # Uploads are written to the staging area first, the database rows are
+    # committed, and only then are the staged files promoted to their final
+    # path. A crash at any point leaves either a staged file without a row
+    # (removed by reconciliation) or a committed row whose staged file is
+    # promoted by reconciliation - never a half-visible upload.
+    # ------------------------------------------------------------------
+
+    def get_staged_file_path(self, file_path: str) -> Path:
+        """
+        Get the staging location of a file waiting for its database commit
+        """
+        return self.staging_dir / "pending" / file_path
+
+    async def stage_file(self, content: bytes, file_path: str) -> str:
+        """
+        Write file content to the staging area
+        Returns the file path
+        """
+        await asyncio.to_thread(self._write_local, self.get_staged_file_path(file_path), content)
+        return file_path
+
+    async def stage_files(self, files: List[Tuple[bytes, str]], concurrency: int = 4) -> List[str]:
+        """
+        Stage several (content, file_path) pairs concurrently
+        All or nothing: if any write fails, files already staged are discarded
+        and the error is re-raised.
+        """
+        file_paths = [file_path for _, file_path in files]
+        try:
+            await self._gather_bounded(self.stage_file, files, concurrency)
+        except Exception:
+            await self.discard_staged_files(file_paths)
+            raise
+        return file_paths
+
+    async def promote_staged_file(self, file_path: str) -> str:
+        """
+        Move a staged file to its final storage path
+        Returns the file path
+        """
+        staged_path = self.get_staged_file_path(file_path)
+
+        if self.storage_type == "local":
+            full_path = self.upload_dir / file_path
+            await asyncio.to_thread(self._move_local, staged_path, full_path)
+            if full_path.suffix.lower().lstrip(".") in settings.PRECOMPRESS_EXTENSIONS:
+                await asyncio.to_thread(self._precompress_local, full_path)
+            return file_path
+
+        with open(staged_path, "rb") as f:
+            await self.save_file(f, file_path)
+        staged_path.unlink()
+        return file_path
+
+    async def promote_staged_files(self, file_paths: List[str], concurrency: int = 4) -> List[str]:
+        """
+        Promote several staged files concurrently
+        """
+        await self._gather_bounded(
+            self.promote_staged_file,
+            [(file_path,) for file_path in file_paths],
+            concurrency
+        )
+        return file_paths
+
+    async def discard_staged_files(self, file_paths: List[str]) -> None:
+        """
+        Remove staged files that will never be committed
+        """
+        for file_path in file_paths:
+            staged_path = self.get_staged_file_path(file_path)
+            if staged_path.exists():
+                staged_path.unlink()
+
+    @staticmethod
+    def _move_local(source: Path, target: Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # os.replace is atomic on the same filesystem; shutil.move also
+        # covers a staging dir mounted on a different volume
+        shutil.move(str(source), str(target))
+
+    @staticmethod
+    def _precompress_local(full_path: Path) -> None:
+        """
+        Write a gzip variant next to a compressible file, served to clients
+        that accept gzip; skipped if it doesn't save at least 10%
+        """
+        with open(full_path, "rb") as f:
+            content = f.read()
+        compressed = gzip.compress(content, compresslevel=6, mtime=0)
+        if len(compressed) < len(content) * 0.9:
+            with open(f"{full_path}.gz", "wb") as f:
+                f.write(compressed)
+
+    @staticmethod
+    async def _gather_bounded(func, args_list, concurrency: int) -> None:
+        """
+        Await func(*args) for every args tuple with at most `concurrency` in flight
+        Waits for all calls to settle, then re-raises the first error.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _run(args):
+            async with semaphore:
+                return await func(*args)
+
+        results = await asyncio.gather(*(_run(args) for args in args_list), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def get_staging_path(self, upload_id: str) -> Path:
+        """
+        Get the staging file path of a chunked upload session
+        """
+        return self.staging_dir / f"{upload_id}.part"
+
+    def get_staged_size(self, upload_id: str) -> int:
+        """
+        Get the number of bytes currently present in a staging file
+        """
+        staging_path = self.get_staging_path(upload_id)
+        return staging_path.stat().st_size if staging_path.exists() else 0
+
+    @asynccontextmanager
+    async def _chunk_lock(self, upload_id: str):
+        """
+        Serialize writes to the staging file of one upload session
+        """
+        entry = self._chunk_locks.get(upload_id)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self._chunk_locks[upload_id] = entry
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._chunk_locks[upload_id]
+
+    @staticmethod
+    def _open_chunk_file(staging_path: Path, offset: int) -> BinaryIO:
+        staging_path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(staging_path, "r+b" if staging_path.exists() else "wb")
+        f.seek(offset)
+        return f
+
+    async def write_chunk(
+        self,
+        upload_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        max_bytes: int
+    ) -> int:
+        """
+        Write a chunk into the staging file of an upload session at the given offset
+        Returns the number of bytes written
+
+        Bytes left behind by an interrupted chunk are truncated, so a client can
+        always resume from the last acknowledged offset. Requests for the same
+        session write one at a time; file I/O runs in worker threads.
+        """
+        staging_path = self.get_staging_path(upload_id)
+
+        written = 0
+        async with self._chunk_lock(upload_id):
+            f = await asyncio.to_thread(self._open_chunk_file, staging_path, offset)
+            try:
+                buffer = bytearray()
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    written += len(chunk)
+                    if written > max_bytes:
+                        await asyncio.to_thread(f.truncate, offset)
+                        raise ValueError(f"Chunk exceeds maximum size of {max_bytes} bytes")
+                    buffer += chunk
+                    if len(buffer) >= CHUNK_WRITE_BUFFER_SIZE:
+                        await asyncio.to_thread(f.write, buffer)
+                        buffer.clear()
+                if buffer:
+                    await asyncio.to_thread(f.write, buffer)
+                await asyncio.to_thread(f.truncate, offset + written)
+            finally:
+                await asyncio.to_thread(f.close)
+
+        return written
+
+    async def stage_chunked_upload(self, upload_id: str, file_path: str) -> str:
+        """
+        Move a fully received chunked upload into the staging area under its
+        final file path, ready for promote_staged_file() after the DB commit
+        """
+        await asyncio.to_thread(
+            self._move_local,
+            self.get_staging_path(upload_id),
+            self.get_staged_file_path(file_path)
+        )
         return file_path
 
+    async def unstage_chunked_upload(self, upload_id: str, file_path: str) -> None:
+        """
+        Undo stage_chunked_upload() when the DB commit fails, so the client can retry
+        """
+        staged_path = self.get_staged_file_path(file_path)
+        if staged_path.exists():
+            await asyncio.to_thread(self._move_local, staged_path, self.get_staging_path(upload_id))
+
+    async def discard_staged_upload(self, upload_id: str) -> bool:
+        """
+        Remove the staging file of an upload session
+        """
+        staging_path = self.get_staging_path(upload_id)
+        if staging_path.exists():
+            staging_path.unlink()
+            return True
+        return False
+
     def get_local_file_path(self, file_path: str) -> Path:
         """
         Get the full local file path
         """
         return self.upload_dir / file_path
     
+    def _get_oss_bucket(self):
+        if self._oss_bucket is None:
+            import oss2
+            auth = oss2.Auth(settings.OSS_ACCESS_KEY_ID, settings.OSS_ACCESS_KEY_SECRET)
+            self._oss_bucket = oss2.Bucket(auth, settings.OSS_ENDPOINT, settings.OSS_BUCKET_NAME)
+        return self._oss_bucket
+
+    def _get_minio_client(self):
+        if self._minio_client is None:
+            from minio import Minio
+            self._minio_client = Minio(
+                settings.MINIO_ENDPOINT,
+                access_key=settings.MINIO_ACCESS_KEY,
+                secret_key=settings.MINIO_SECRET_KEY,
+                secure=settings.MINIO_SECURE
+            )
+        return self._minio_client
+
+    @staticmethod
+    def _read_content(file) -> bytes:
+        if hasattr(file, 'read'):
+            return file.read()
+        return file
+
     async def _save_oss(self, file: BinaryIO, file_path: str) -> str:
         """
         Save file to Aliyun OSS
         """
-        # TODO: Implement OSS upload
-        # import oss2
-        # auth = oss2.Auth(settings.OSS_ACCESS_KEY_ID, settings.OSS_ACCESS_KEY_SECRET)
-        # bucket = oss2.Bucket(auth, settings.OSS_ENDPOINT, settings.OSS_BUCKET_NAME)
-        # bucket.put_object(file_path, file)
-        raise NotImplementedError("OSS storage not implemented yet")
+        content = self._read_content(file)
+        await asyncio.to_thread(self._get_oss_bucket().put_object, file_path, content)
+        return file_path
     
     async def _save_minio(self, file: BinaryIO, file_path: str) -> str:
         """
         Save file to MinIO
         """
-        # TODO: Implement MinIO upload
-        # from minio import Minio
-        # client = Minio(
-        #     settings.MINIO_ENDPOINT,
-        #     access_key=settings.MINIO_ACCESS_KEY,
-        #     secret_key=settings.MINIO_SECRET_KEY,
-        #     secure=settings.MINIO_SECURE
-        # )
-        # client.put_object(settings.MINIO_BUCKET_NAME, file_path, file, -1)
-        raise NotImplementedError("MinIO storage not implemented yet")
+        content = self._read_content(file)
+        await asyncio.to_thread(
+            self._get_minio_client().put_object,
+            settings.MINIO_BUCKET_NAME,
+            file_path,
+            io.BytesIO(content),
+            len(content)
+        )
+        return file_path
     
     async def delete_file(self, file_path: str) -> bool:
         """
@@ -130,6 +404,7 @@ class StorageService:
         Delete file from local storage
         """
         full_path = self.upload_dir / file_path
+        Path(f"{full_path}.gz").unlink(missing_ok=True)
         if full_path.exists():
             full_path.unlink()
             return True
@@ -139,15 +414,19 @@ class StorageService:
         """
         Delete file from OSS
         """
-        # TODO: Implement OSS delete
-        raise NotImplementedError("OSS storage not implemented yet")
+        await asyncio.to_thread(self._get_oss_bucket().delete_object, file_path)
+        return True
     
     async def _delete_minio(self, file_path: str) -> bool:
         """
         Delete file from MinIO
         """
-        # TODO: Implement MinIO delete
-        raise NotImplementedError("MinIO storage not implemented yet")
+        await asyncio.to_thread(
+            self._get_minio_client().remove_object,
+            settings.MINIO_BUCKET_NAME,
+            file_path
+        )
+        return True
     
     def get_file_url(self, file_path: str, expires_in: int = 3600) -> str:
         """
@@ -169,27 +448,96 @@ class StorageService:
         """
         Get signed URL from OSS
         """
-        # TODO: Implement OSS signed URL
-        # import oss2
-        # auth = oss2.Auth(settings.OSS_ACCESS_KEY_ID, settings.OSS_ACCESS_KEY_SECRET)
-        # bucket = oss2.Bucket(auth, settings.OSS_ENDPOINT, settings.OSS_BUCKET_NAME)
-        # return bucket.sign_url('GET', file_path, expires_in)
-        raise NotImplementedError("OSS storage not implemented yet")
+        return self._get_oss_bucket().sign_url('GET', file_path, expires_in)
     
     def _get_minio_url(self, file_path: str, expires_in: int) -> str:
         """
         Get signed URL from MinIO
         """
-        # TODO: Implement MinIO signed URL
-        # from minio import Minio
-        # from datetime import timedelta
-        # client = Minio(...)
-        # return client.presigned_get_object(
-        #     settings.MINIO_BUCKET_NAME,
-        #     file_path,
-        #     expires=timedelta(seconds=expires_in)
-        # )
-        raise NotImplementedError("MinIO storage not implemented yet")
+        return self._get_minio_client().presigned_get_object(
+            settings.MINIO_BUCKET_NAME,
+            file_path,
+            expires=timedelta(seconds=expires_in)
+        )
+
+    def presign_upload(
+        self,
+        file_path: str,
+        content_type: str,
+        content_md5: str,
+        expires_in: int
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Get a presigned PUT URL for uploading straight to object storage
+        Returns the URL and the headers the client must send with the PUT.
+        content_md5 is the hex MD5 of the file; OSS signs it so a corrupted
+        body is rejected by storage itself, MinIO is checked on completion.
+        """
+        if self.storage_type == "oss":
+            headers = {
+                "Content-Type": content_type,
+                "Content-MD5": base64.b64encode(bytes.fromhex(content_md5)).decode(),
+            }
+            url = self._get_oss_bucket().sign_url('PUT', file_path, expires_in, headers=headers)
+            return url, headers
+        elif self.storage_type == "minio":
+            url = self._get_minio_client().presigned_put_object(
+                settings.MINIO_BUCKET_NAME,
+                file_path,
+                expires=timedelta(seconds=expires_in)
+            )
+            return url, {"Content-Type": content_type}
+        else:
+            raise ValueError(f"Direct upload not supported for storage type: {self.storage_type}")
+
+    async def stat_object(self, file_path: str) -> Optional[Dict[str, object]]:
+        """
+        Get size, content type and MD5 of a stored object
+        Returns None if the object does not exist
+        """
+        if self.storage_type == "oss":
+            import oss2
+            try:
+                meta = await asyncio.to_thread(self._get_oss_bucket().head_object, file_path)
+            except oss2.exceptions.NotFound:
+                return None
+            size, content_type, etag = meta.content_length, meta.content_type, meta.etag
+        elif self.storage_type == "minio":
+            from minio.error import S3Error
+            try:
+                stat = await asyncio.to_thread(
+                    self._get_minio_client().stat_object,
+                    settings.MINIO_BUCKET_NAME,
+                    file_path
+                )
+            except S3Error as e:
+                if e.code in ("NoSuchKey", "NoSuchObject"):
+                    return None
+                raise
+            size, content_type, etag = stat.size, stat.content_type, stat.etag
+        else:
+            full_path = self.get_local_file_path(file_path)
+            if not full_path.exists():
+                return None
+            return {
+                "size": full_path.stat().st_size,
+                "content_type": None,
+                "md5": await asyncio.to_thread(self.compute_md5, full_path),
+            }
+
+        # The ETag of a single-part upload is the MD5 of the content
+        return {"size": size, "content_type": content_type, "md5": (etag or "").strip('"').lower()}
+
+    @staticmethod
+    def compute_md5(path: Path) -> str:
+        """
+        Compute the hex MD5 of a file, reading it in blocks
+        """
+        digest = hashlib.md5()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
 
 
 # Singleton instance
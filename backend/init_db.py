@@ -10,7 +10,8 @@ from pathlib import Path
 # 添加项目根目录到Python路径
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.database import Base, engine, SessionLocal
+from app.database import engine, SessionLocal
+from app.core.schema import create_schema
 from app.models.user import User
 from app.models.customer import Customer
 from app.models.loan_product import LoanProduct
@@ -29,7 +30,7 @@ def init_database():
     try:
         # 创建所有表
         print("📝 创建数据库表...")
-        Base.metadata.create_all(bind=engine)
+        create_schema(engine)  # 空库建表后标记为最新迁移版本
         print("✅ 数据库表创建成功")
         
         # 创建初始数据
@@ -5,7 +5,8 @@
 import sys
 sys.path.insert(0, '.')
 
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, engine
+from app.core.schema import create_schema
 from app.models.user import User
 from app.core.security import get_password_hash
 from datetime import datetime
@@ -15,7 +16,7 @@ def init_users():
     
     # 创建所有表
     print("📝 创建数据库表...")
-    Base.metadata.create_all(bind=engine)
+    create_schema(engine)  # 空库建表后标记为最新迁移版本
     print("✅ 数据库表创建完成")
     
     db = SessionLocal()
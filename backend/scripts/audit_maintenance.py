@@ -0,0 +1,43 @@
+"""
+审计日志分区维护工具
+预建 PostgreSQL 月分区、SQLite 按月轮换表，并将超过保留期的月份归档为 gzip 文件后删除
+
+用法:
+    python scripts/audit_maintenance.py                      # 按配置的保留期维护
+    python scripts/audit_maintenance.py --retention-months 6
+    python scripts/audit_maintenance.py --no-archive         # 超期月份直接删除，不归档
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.audit_partitions import run_audit_maintenance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain monthly audit log partitions")
+    parser.add_argument("--retention-months", type=int, default=None, help="months kept online")
+    parser.add_argument("--no-archive", action="store_true", help="drop expired months without archiving")
+    args = parser.parse_args()
+
+    report = run_audit_maintenance(
+        retention_months=args.retention_months,
+        archive=False if args.no_archive else None
+    )
+
+    if report.skipped:
+        print("Skipped: maintenance is running in another process")
+        return
+    print(f"Partitions:    {len(report.partitions)}")
+    print(f"Created:       {', '.join(report.created) or '-'}")
+    print(f"Rotated:       {', '.join(report.rotated) or '-'}")
+    print(f"Dropped:       {', '.join(report.dropped) or '-'}")
+    print(f"Archived rows: {report.archived_rows}")
+    print(f"Duration:      {report.duration_seconds}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+密码哈希基准
+测量各算法单核验证耗时，以及通过哈希线程池并发验证时的登录吞吐
+
+用法:
+    python scripts/benchmark_password_hash.py
+    python scripts/benchmark_password_hash.py --logins 200 --workers 8
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.core.security import (
+    pwd_context,
+    get_password_hash_simple,
+    verify_password,
+    verify_and_update_password_async,
+)
+
+PASSWORD = "correct horse battery staple"
+
+
+def time_verify(hashed: str, rounds: int) -> float:
+    """单线程连续验证，返回每次验证的平均秒数"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        verify_password(PASSWORD, hashed)
+    return (time.perf_counter() - started) / rounds
+
+
+async def concurrent_logins(hashed: str, logins: int) -> float:
+    """模拟登录高峰：同时提交 logins 次验证，返回总耗时"""
+    started = time.perf_counter()
+    await asyncio.gather(*(verify_and_update_password_async(PASSWORD, hashed) for _ in range(logins)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark password hashing and login throughput")
+    parser.add_argument("--rounds", type=int, default=20, help="sequential verifications per scheme")
+    parser.add_argument("--logins", type=int, default=100, help="concurrent logins for the pool benchmark")
+    args = parser.parse_args()
+
+    hashes = {
+        "sha256 (legacy)": get_password_hash_simple(PASSWORD),
+        "argon2": pwd_context.hash(PASSWORD, scheme="argon2"),
+        "bcrypt": pwd_context.hash(PASSWORD, scheme="bcrypt"),
+    }
+
+    print(f"CPU cores:          {os.cpu_count()}")
+    print(f"Hash pool workers:  {settings.PASSWORD_HASH_WORKERS}")
+    print(f"Argon2 parameters:  t={settings.ARGON2_TIME_COST}, m={settings.ARGON2_MEMORY_COST} KiB, p={settings.ARGON2_PARALLELISM}")
+    print(f"Bcrypt rounds:      {settings.BCRYPT_ROUNDS}")
+    print()
+    print(f"{'scheme':<18}{'ms/verify':>12}{'logins/s/core':>16}")
+    for name, hashed in hashes.items():
+        seconds = time_verify(hashed, args.rounds)
+        print(f"{name:<18}{seconds * 1000:>12.2f}{1 / seconds:>16.0f}")
+
+    print()
+    print(f"Concurrent logins through the pool ({args.logins} at once, default scheme):")
+    hashed = pwd_context.hash(PASSWORD)
+    elapsed = asyncio.run(concurrent_logins(hashed, args.logins))
+    print(f"  total {elapsed:.2f}s, {args.logins / elapsed:.0f} logins/s, "
+          f"{args.logins / elapsed / settings.PASSWORD_HASH_WORKERS:.0f} logins/s per worker")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+数据库迁移工具（容器与部署脚本在启动应用前调用）
+- 空库：按模型建表并标记为最新迁移版本（alembic 迁移链从索引迁移开始，不能从空库建表）
+- 已有 alembic_version：执行 alembic upgrade head
+- 有表但没有 alembic_version（旧版本启动时 create_all 建的库）：拒绝执行，需先一次性
+  执行 alembic stamp <与当前表结构一致的版本>，或使用 --stamp 参数
+
+用法:
+    python scripts/migrate_database.py               # 建表或升级到最新版本
+    python scripts/migrate_database.py --stamp 011   # 旧库先标记版本再升级
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from alembic import command
+from alembic.config import Config
+
+from app.database import engine
+from app.core.schema import create_schema, current_revision, head_revision
+
+
+def alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema")
+    parser.add_argument("--stamp", help="mark a database without alembic_version as this revision before upgrading")
+    args = parser.parse_args()
+
+    config = alembic_config()
+    if current_revision(engine) is None:
+        with engine.connect() as connection:
+            empty = not engine.dialect.get_table_names(connection)
+        if empty:
+            create_schema(engine)
+            print(f"Created schema at revision {head_revision()}")
+            return
+        if not args.stamp:
+            print(
+                "ERROR: database has tables but no alembic_version.\n"
+                "Run once: alembic stamp <revision matching the current schema>, "
+                "or pass --stamp <revision>; then run this script again."
+            )
+            sys.exit(1)
+        command.stamp(config, args.stamp)
+        print(f"Stamped revision {args.stamp}")
+
+    command.upgrade(config, "head")
+    print(f"Database at revision {current_revision(engine)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+导入耗时分析工具
+在子进程中以 python -X importtime 导入应用模块，汇总各模块与顶层包的累计导入耗时，
+用于定位拖慢 worker 冷启动的重量级依赖。多次运行取每个模块的最小值，减少磁盘缓存的干扰。
+
+用法:
+    python scripts/profile_imports.py                        # 分析 app.main
+    python scripts/profile_imports.py --module app.api.documents --top 30
+    python scripts/profile_imports.py --runs 5 --output import_profile.md
+    python scripts/profile_imports.py --check pandas,openpyxl # 这些包被导入时返回非零退出码
+"""
+import sys
+import os
+import re
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# import time: self [us] | cumulative | imported package
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime(module: str) -> List[Tuple[str, int, int, int]]:
+    """
+    导入一次模块，返回 [(模块, 自身耗时us, 累计耗时us, 嵌套深度)]
+    """
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./profile_imports.db")
+    env.setdefault("PUBSUB_BACKEND", "memory")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def profile(module: str, runs: int) -> Dict[str, Tuple[int, int, int]]:
+    """
+    多次导入，返回 {模块: (最小自身耗时, 最小累计耗时, 嵌套深度)}
+    """
+    best: Dict[str, Tuple[int, int, int]] = {}
+    for _ in range(runs):
+        for name, self_us, cumulative_us, depth in run_importtime(module):
+            if name in best:
+                previous = best[name]
+                best[name] = (min(previous[0], self_us), min(previous[1], cumulative_us), previous[2])
+            else:
+                best[name] = (self_us, cumulative_us, depth)
+    return best
+
+
+def package_totals(entries: Dict[str, Tuple[int, int, int]]) -> List[Tuple[str, int]]:
+    """
+    按顶层包汇总自身耗时（各模块自身耗时之和不重复计算）
+    """
+    totals: Dict[str, int] = {}
+    for name, (self_us, _, _) in entries.items():
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def render_report(module: str, runs: int, entries: Dict[str, Tuple[int, int, int]], top: int) -> str:
+    total_us = entries.get(module, (0, 0, 0))[1]
+    lines = [
+        f"# Import profile: {module}",
+        "",
+        f"Python {sys.version.split()[0]}, best of {runs} run(s), "
+        f"{len(entries)} modules, total {total_us / 1000:.1f} ms",
+        "",
+        "## Top-level packages (self time)",
+        "",
+        "| Package | ms | % |",
+        "|---|---:|---:|",
+    ]
+    for package, self_us in package_totals(entries)[:top]:
+        share = self_us / total_us * 100 if total_us else 0
+        lines.append(f"| {package} | {self_us / 1000:.1f} | {share:.1f} |")
+
+    lines += [
+        "",
+        "## Modules (cumulative time)",
+        "",
+        "| Module | cumulative ms | self ms |",
+        "|---|---:|---:|",
+    ]
+    ranked = sorted(entries.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us, _) in ranked[:top]:
+        lines.append(f"| {name} | {cumulative_us / 1000:.1f} | {self_us / 1000:.1f} |")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile module import time with python -X importtime")
+    parser.add_argument("--module", default="app.main", help="module to import (default: app.main)")
+    parser.add_argument("--runs", type=int, default=3, help="import this many times and keep the best timings")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    parser.add_argument("--output", help="write the markdown report to this file")
+    parser.add_argument("--check", help="comma-separated packages that must not be imported")
+    args = parser.parse_args()
+
+    entries = profile(args.module, max(args.runs, 1))
+    report = render_report(args.module, max(args.runs, 1), entries, args.top)
+    if args.output:
+        Path(args.output).write_text(report, encoding="utf-8")
+        print(f"Report written to {args.output}")
+    else:
+        print(report)
+
+    if args.check:
+        loaded = {name.split(".")[0] for name in entries}
+        unexpected = [package for package in args.check.split(",") if package.strip() in loaded]
+        if unexpected:
+            print(f"Eagerly imported: {', '.join(unexpected)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+存储对账工具
+扫描上传目录与 customer_documents 表，清理孤儿文件并报告回收的空间
+
+用法:
+    python scripts/reconcile_storage.py            # 仅报告（dry run）
+    python scripts/reconcile_storage.py --apply    # 实际删除孤儿文件
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.reconciliation import reconcile_storage
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile uploaded files with document records")
+    parser.add_argument("--apply", action="store_true", help="remove orphan files (default: dry run)")
+    parser.add_argument("--grace-seconds", type=int, default=None, help="ignore files newer than this")
+    args = parser.parse_args()
+
+    report = reconcile_storage(dry_run=not args.apply, grace_seconds=args.grace_seconds)
+
+    print("Dry run" if report.dry_run else "Applied")
+    print(f"Scanned files:      {report.scanned_files}")
+    print(f"Orphan files:       {report.orphan_files}")
+    print(f"Reclaimed bytes:    {report.reclaimed_bytes} ({report.reclaimed_bytes / 1024 / 1024:.2f} MB)")
+    print(f"Promoted files:     {report.promoted_files}")
+    print(f"Expired sessions:   {report.expired_sessions}")
+    print(f"Dangling documents: {report.dangling_documents}")
+    for document_id in report.dangling_document_ids:
+        print(f"  - {document_id}")
+    print(f"Duration:           {report.duration_seconds}s")
+
+
+if __name__ == "__main__":
+    main()
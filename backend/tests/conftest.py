@@ -0,0 +1,102 @@
+"""
+测试公共配置
+在导入应用之前指定临时 SQLite 数据库与上传目录；后台中继与分发器不在测试进程中运行，
+由各测试显式调用，结果可预期。
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+TEST_DIR = Path(tempfile.mkdtemp(prefix="ccd-tests-"))
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{TEST_DIR / 'test.db'}",
+    "DEBUG": "False",
+    "DB_SCHEMA_MODE": "check",
+    "SECRET_KEY": "test-secret-key",
+    "PUBSUB_BACKEND": "memory",
+    "UPLOAD_DIR": str(TEST_DIR / "uploads"),
+    "UPLOAD_STAGING_DIR": str(TEST_DIR / "staging"),
+    "AUDIT_ARCHIVE_DIR": str(TEST_DIR / "audit_archive"),
+    "AUDIT_MAINTENANCE_INTERVAL_HOURS": "0",
+    "OUTBOX_RELAY_ENABLED": "False",
+    "WEBHOOK_DISPATCHER_ENABLED": "False",
+})
+
+# 路由直接以 UUID 与字符串主键比较：SQLite 上按原生 UUID 绑定，由 sqlite3 适配器转为带连字符的字符串
+sqlite3.register_adapter(uuid.UUID, str)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.schema import create_schema  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.customer import Customer, CustomerAssignment  # noqa: E402
+from app.models.document import DocumentType  # noqa: E402
+from app.models.loan_product import LoanProduct  # noqa: E402
+from tests.helpers import create_user  # noqa: E402
+
+engine.dialect.supports_native_uuid = True
+create_schema(engine)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def admin(db):
+    return create_user(db, "admin")
+
+
+@pytest.fixture
+def service_user(db):
+    return create_user(db, "customer_service")
+
+
+@pytest.fixture
+def document_type(db):
+    doc_type = DocumentType(
+        code=f"id-{uuid.uuid4().hex[:8]}",
+        name="身份证",
+        allowed_file_types="png,pdf",
+        max_files=5,
+        min_files=1
+    )
+    db.add(doc_type)
+    db.commit()
+    return doc_type
+
+
+@pytest.fixture
+def customer(db, service_user):
+    product = LoanProduct(code=f"p-{uuid.uuid4().hex[:8]}", name="测试产品")
+    db.add(product)
+    db.flush()
+    record = Customer(customer_no=f"C{uuid.uuid4().hex[:10]}", name="测试客户", product_id=product.id)
+    db.add(record)
+    db.flush()
+    db.add(CustomerAssignment(customer_id=record.id, user_id=service_user.id))
+    db.commit()
+    return record
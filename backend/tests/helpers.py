@@ -0,0 +1,36 @@
+"""
+测试辅助函数
+"""
+import uuid
+
+from app.core.security import get_password_hash
+from app.models.user import User
+
+PASSWORDS = {"admin": "admin123", "reviewer": "review123", "customer_service": "service123"}
+
+
+def create_user(db, role: str = "customer_service", is_active: bool = True) -> User:
+    user = User(
+        username=f"{role}-{uuid.uuid4().hex[:8]}",
+        password_hash=get_password_hash(PASSWORDS[role]),
+        role=role,
+        is_active=is_active
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def login(client, user: User) -> dict:
+    """登录并返回令牌对"""
+    response = client.post("/api/auth/login", json={"username": user.username, "password": PASSWORDS[user.role]})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def bearer(access_token: str) -> dict:
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def auth_headers(client, user: User) -> dict:
+    return bearer(login(client, user)["access_token"])
@@ -0,0 +1,62 @@
+"""
+审计日志查询
+"""
+from datetime import datetime, timedelta, timezone
+
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.core.audit import AuditLogWriter
+from app.models.audit_log import AuditLog
+from tests.helpers import auth_headers
+
+
+@pytest.mark.parametrize("start, end", [
+    ("2026-01-01T00:00:00", "2026-01-02T00:00:00Z"),
+    ("2026-01-01T00:00:00Z", "2026-01-02T00:00:00"),
+    ("2026-01-01T08:00:00+08:00", "2026-01-02T00:00:00"),
+])
+def test_mixed_naive_and_aware_bounds_are_compared_in_utc(client, admin, start, end):
+    response = client.get(
+        "/api/audit-logs/",
+        headers=auth_headers(client, admin),
+        params={"start": start, "end": end}
+    )
+    assert response.status_code == 200, response.text
+
+
+def test_naive_start_defaults_end_to_utc_now(client, admin):
+    start = (datetime.now(timezone.utc) - timedelta(hours=1)).replace(tzinfo=None)
+    response = client.get(
+        "/api/audit-logs/",
+        headers=auth_headers(client, admin),
+        params={"start": start.isoformat()}
+    )
+    assert response.status_code == 200, response.text
+
+
+@pytest.fixture
+def full_writer(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_QUEUE_SIZE", 1)
+    monkeypatch.setattr(settings, "AUDIT_ENQUEUE_TIMEOUT_SECONDS", 0.01)
+    # 未启动写入任务：第一条占满队列
+    return AuditLogWriter()
+
+
+async def test_full_queue_writes_records_directly(db, full_writer):
+    action = f"test.{uuid.uuid4().hex[:8]}"
+    assert await full_writer.record(action)
+    assert await full_writer.record(action, details={"n": 2})
+
+    assert full_writer.stats()["written_inline"] == 1
+    assert full_writer.stats()["dropped"] == 0
+    assert db.query(AuditLog).filter(AuditLog.action == action).count() == 1
+
+
+async def test_full_queue_drops_only_when_enabled(full_writer, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_DROP_WHEN_FULL", True)
+    assert await full_writer.record("test.kept")
+    assert not await full_writer.record("test.dropped")
+    assert full_writer.stats()["dropped"] == 1
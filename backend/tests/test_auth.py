@@ -0,0 +1,78 @@
+"""
+刷新令牌轮换、重放检测与令牌吊销
+"""
+import time
+
+from app.core.security import decode_access_token
+from tests.helpers import auth_headers, bearer, login
+
+
+def refresh(client, refresh_token: str):
+    return client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def test_refresh_rotates_tokens_within_the_session(client, service_user):
+    tokens = login(client, service_user)
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert decode_access_token(rotated["access_token"])["sid"] == decode_access_token(tokens["access_token"])["sid"]
+
+    assert client.get("/api/auth/me", headers=bearer(rotated["access_token"])).status_code == 200
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_reusing_a_rotated_refresh_token_revokes_the_session(client, service_user):
+    tokens = login(client, service_user)
+    rotated = refresh(client, tokens["refresh_token"]).json()
+
+    # 已轮换的令牌再次出现，视为泄露：整个登录会话失效
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+    assert client.get("/api/customers/", headers=bearer(rotated["access_token"])).status_code == 401
+
+    # 同一用户的其他会话不受影响
+    assert client.get("/api/customers/", headers=auth_headers(client, service_user)).status_code == 200
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, service_user):
+    tokens = login(client, service_user)
+    headers = bearer(tokens["access_token"])
+
+    assert client.post("/api/auth/logout", headers=headers).status_code == 204
+    assert client.get("/api/customers/", headers=headers).status_code == 401
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_role_change_cuts_off_earlier_access_tokens(client, admin, service_user):
+    tokens = login(client, service_user)
+    # iat 精确到秒，截止时间需晚于令牌签发所在的秒
+    time.sleep(1.1)
+
+    response = client.patch(
+        f"/api/auth/users/{service_user.id}",
+        headers=auth_headers(client, admin),
+        json={"role": "reviewer"}
+    )
+    assert response.status_code == 200
+    assert client.get("/api/customers/", headers=bearer(tokens["access_token"])).status_code == 401
+
+    time.sleep(1.1)
+    rotated = refresh(client, tokens["refresh_token"]).json()
+    assert decode_access_token(rotated["access_token"])["role"] == "reviewer"
+    assert client.get("/api/customers/", headers=bearer(rotated["access_token"])).status_code == 200
+
+
+def test_deactivated_user_cannot_refresh(client, admin, service_user):
+    tokens = login(client, service_user)
+
+    response = client.patch(
+        f"/api/auth/users/{service_user.id}",
+        headers=auth_headers(client, admin),
+        json={"is_active": False}
+    )
+    assert response.status_code == 200
+    assert client.get("/api/customers/", headers=bearer(tokens["access_token"])).status_code == 401
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
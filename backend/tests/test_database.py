@@ -0,0 +1,42 @@
+"""
+请求会话与连接池统计
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import get_db, pool_status
+from tests.helpers import auth_headers
+
+
+def test_get_db_yields_a_plain_session_that_connects_on_first_query():
+    dependency = get_db()
+    db = next(dependency)
+    assert isinstance(db, Session)
+    before = pool_status()
+
+    db.execute(text("SELECT 1"))
+    dependency.close()
+
+    after = pool_status()
+    assert after["checkouts"] == before["checkouts"] + 1
+    assert after["sessions_requested"] == before["sessions_requested"] + 1
+    assert after["sessions_opened"] == before["sessions_opened"] + 1
+    assert after["checked_out"] == before["checked_out"]
+
+
+def test_unused_session_does_not_check_out_a_connection():
+    dependency = get_db()
+    next(dependency)
+    before = pool_status()
+    dependency.close()
+
+    after = pool_status()
+    assert after["checkouts"] == before["checkouts"]
+    assert after["sessions_opened"] == before["sessions_opened"]
+
+
+def test_pool_status_endpoint(client, admin):
+    response = client.get("/api/health/db", headers=auth_headers(client, admin))
+    assert response.status_code == 200
+    assert response.json()["pool"] == "QueuePool"
+    assert response.json()["checkouts"] > 0
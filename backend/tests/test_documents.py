@@ -0,0 +1,81 @@
+"""
+批量审核
+"""
+import uuid
+
+import pytest
+
+from app.models.document import CustomerDocument
+from app.models.outbox import OutboxEvent
+from tests.helpers import auth_headers
+
+
+@pytest.fixture
+def documents(db, customer, document_type, service_user):
+    records = [
+        CustomerDocument(
+            customer_id=customer.id,
+            document_type_id=document_type.id,
+            file_name=f"scan-{index}.pdf",
+            file_path=f"{customer.id}/{document_type.code}/{uuid.uuid4()}.pdf",
+            file_size=100,
+            file_type="application/pdf",
+            uploaded_by=service_user.id,
+            status="pending"
+        )
+        for index in range(3)
+    ]
+    db.add_all(records)
+    db.commit()
+    return records
+
+
+def test_bulk_review_updates_documents_and_emits_one_event_per_customer(client, db, admin, customer, documents):
+    missing = str(uuid.uuid4())
+    reviewed = [documents[0].id, documents[1].id]
+
+    response = client.post("/api/documents/review/bulk", headers=auth_headers(client, admin), json={
+        "document_ids": reviewed + [reviewed[0], missing],
+        "status": "approved",
+        "review_note": "ok",
+    })
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["updated"] == 2
+    assert result["not_found"] == [missing]
+    assert [item["customer_id"] for item in result["completeness"]] == [customer.id]
+
+    db.expire_all()
+    statuses = {
+        row.id: (row.status, row.reviewed_by, row.review_note)
+        for row in db.query(CustomerDocument).filter(CustomerDocument.customer_id == customer.id)
+    }
+    assert statuses[reviewed[0]] == ("approved", admin.id, "ok")
+    assert statuses[reviewed[1]] == ("approved", admin.id, "ok")
+    assert statuses[documents[2].id][0] == "pending"
+
+    events = db.query(OutboxEvent).filter(
+        OutboxEvent.event == "documents.reviewed",
+        OutboxEvent.customer_id == customer.id
+    ).all()
+    assert len(events) == 1
+    assert sorted(document["id"] for document in events[0].payload["documents"]) == sorted(reviewed)
+    assert events[0].payload["status"] == "approved"
+
+
+def test_bulk_review_requires_review_permission(client, service_user, documents):
+    response = client.post("/api/documents/review/bulk", headers=auth_headers(client, service_user), json={
+        "document_ids": [documents[0].id],
+        "status": "rejected",
+    })
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("body", [
+    {"document_ids": [], "status": "approved"},
+    {"document_ids": [str(uuid.uuid4())], "status": "pending"},
+])
+def test_bulk_review_validates_request(client, admin, body):
+    response = client.post("/api/documents/review/bulk", headers=auth_headers(client, admin), json=body)
+    assert response.status_code == 422
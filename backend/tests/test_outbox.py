@@ -0,0 +1,131 @@
+"""
+发件箱中继
+"""
+import json
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import func
+
+from app.config import settings
+from app.core.outbox import OutboxRelay, add_outbox_event
+from app.core.webhooks import WebhookEvent, WebhookSubscription, webhook_manager
+from app.models.outbox import OutboxEvent
+from app.models.webhook import WebhookDelivery
+
+
+@pytest.fixture
+def subscription_url():
+    url = f"https://hooks.example.com/{uuid.uuid4().hex}"
+    webhook_manager.subscribe(WebhookSubscription(url, [WebhookEvent.CUSTOMER_CREATED]))
+    yield url
+    webhook_manager.unsubscribe(url)
+
+
+def add_events(db, count: int):
+    events = [
+        add_outbox_event(db, WebhookEvent.CUSTOMER_CREATED, {"index": index, "id": uuid.uuid4()})
+        for index in range(count)
+    ]
+    db.commit()
+    return [event.id for event in events]
+
+
+async def test_relay_creates_deliveries_marks_events_and_runs_handlers(db, subscription_url):
+    event_ids = add_events(db, 3)
+    handled = []
+
+    async def failing_handler(event, customer_id, payload):
+        raise RuntimeError("handler failure")
+
+    async def recording_handler(event, customer_id, payload):
+        handled.append(payload["index"])
+
+    relay = OutboxRelay()
+    relay.subscribe([WebhookEvent.CUSTOMER_CREATED], failing_handler)
+    relay.subscribe([WebhookEvent.CUSTOMER_CREATED], recording_handler)
+
+    assert await relay.relay_once(limit=1000) >= 3
+    # 一个处理器失败不影响后续处理器
+    assert handled[-3:] == [0, 1, 2]
+
+    deliveries = db.query(WebhookDelivery).filter(WebhookDelivery.url == subscription_url).all()
+    assert sorted(json.loads(d.payload)["metadata"]["event_id"] for d in deliveries) == sorted(event_ids)
+    assert all(d.status == "pending" and d.event == "customer.created" for d in deliveries)
+    assert db.query(OutboxEvent).filter(
+        OutboxEvent.id.in_(event_ids), OutboxEvent.processed_at.is_(None)
+    ).count() == 0
+
+    assert await relay.relay_once() == 0
+
+
+def test_concurrent_relays_forward_each_event_once(db, subscription_url):
+    event_ids = add_events(db, 300)
+    forwarded, errors = [], []
+
+    def relay_until_empty():
+        relay = OutboxRelay()
+        while True:
+            try:
+                events = relay._process_batch(25)
+            except Exception as e:
+                errors.append(e)
+                continue
+            if events:
+                forwarded.extend(event[0] for event in events)
+            elif not pending():
+                return
+
+    def pending() -> int:
+        from app.database import SessionLocal
+
+        session = SessionLocal()
+        try:
+            return session.query(OutboxEvent).filter(OutboxEvent.processed_at.is_(None)).count()
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=relay_until_empty) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    ours = [event_id for event_id in forwarded if event_id in set(event_ids)]
+    assert sorted(ours) == sorted(event_ids)
+    assert db.query(WebhookDelivery).filter(WebhookDelivery.url == subscription_url).count() == len(event_ids)
+    assert errors == []
+
+
+async def test_relay_waits_for_uncommitted_ids_before_forwarding_later_events(db, subscription_url, monkeypatch):
+    relay = OutboxRelay()
+    handled = []
+
+    async def recording_handler(event, customer_id, payload):
+        handled.append(payload["index"])
+
+    relay.subscribe([WebhookEvent.CUSTOMER_CREATED], recording_handler)
+    add_events(db, 1)
+    while await relay.relay_once(limit=1000):
+        pass
+    handled.clear()
+
+    def insert(event_id: int, index: int):
+        db.add(OutboxEvent(id=event_id, event="customer.created", payload={"index": index}))
+        db.commit()
+
+    # 先写入、后提交的事务：base + 1 提交前，base + 2 不能先转发
+    base = db.query(func.max(OutboxEvent.id)).scalar()
+    insert(base + 2, 2)
+    assert await relay.relay_once() == 0
+    insert(base + 1, 1)
+    assert await relay.relay_once() == 2
+    assert handled == [1, 2]
+
+    # 空洞超时后视为事务已回滚
+    insert(base + 4, 4)
+    assert await relay.relay_once() == 0
+    monkeypatch.setattr(settings, "OUTBOX_GAP_TIMEOUT_SECONDS", 0)
+    assert await relay.relay_once() == 1
+    assert handled == [1, 2, 4]
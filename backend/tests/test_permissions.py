@@ -0,0 +1,107 @@
+"""
+权限通配与数据库覆盖配置
+"""
+import uuid
+
+import pytest
+
+from app.core.permissions import (
+    check_permission,
+    compile_role,
+    load_role_permissions,
+    permission_registry,
+    permission_version,
+)
+from app.models.role_permission import RolePermission
+from tests.helpers import auth_headers, bearer, login
+
+
+@pytest.mark.parametrize("permission, allowed", [
+    ("document.view", True),
+    ("document.review", True),
+    ("document.review.batch", True),
+    ("documents.view", False),
+    ("document", False),
+    ("customer.view", True),
+    ("customer.view_all", False),
+    ("customer.delete", False),
+])
+def test_module_wildcard(permission, allowed):
+    role = compile_role("tester", ["document.*", "customer.view"])
+    assert role.allows(permission) is allowed
+
+
+def test_global_wildcard_and_unknown_role():
+    assert compile_role("root", ["*"]).allows("anything.at.all")
+    assert check_permission("admin", "permission.manage")
+    assert not check_permission("no-such-role", "customer.view")
+
+
+def test_version_changes_with_permissions():
+    assert compile_role("r", ["a.b", "c.*"]).version == compile_role("r", ["c.*", "a.b"]).version
+    assert compile_role("r", ["a.b"]).version != compile_role("r", ["a.b", "c.d"]).version
+
+
+@pytest.fixture
+def restore_role_permissions(db):
+    yield
+    db.query(RolePermission).delete(synchronize_session=False)
+    db.commit()
+    load_role_permissions()
+
+
+def test_database_overrides_replace_defaults_on_reload(db, restore_role_permissions):
+    default_version = permission_version("customer_service")
+    assert not check_permission("customer_service", "document.review")
+
+    db.add_all([
+        RolePermission(role="customer_service", permission="document.*"),
+        RolePermission(role="auditor", permission="audit.view"),
+    ])
+    db.commit()
+    assert load_role_permissions() == 2
+
+    assert check_permission("customer_service", "document.review")
+    assert not check_permission("customer_service", "customer.view")
+    assert check_permission("auditor", "audit.view")
+    assert permission_version("customer_service") != default_version
+
+    db.query(RolePermission).delete(synchronize_session=False)
+    db.commit()
+    load_role_permissions()
+    assert permission_version("customer_service") == default_version
+    assert permission_registry.get("auditor") is None
+
+
+def test_permission_update_applies_to_existing_tokens(client, admin, service_user, restore_role_permissions):
+    tokens = login(client, service_user)
+    body = {"document_ids": [str(uuid.uuid4())], "status": "approved"}
+    assert client.post("/api/documents/review/bulk", headers=bearer(tokens["access_token"]), json=body).status_code == 403
+
+    response = client.put(
+        "/api/permissions/roles/customer_service",
+        headers=auth_headers(client, admin),
+        json={"permissions": ["customer.view", "document.*"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["source"] == "database"
+
+    # 令牌中的权限版本已过期，按数据库中的角色重新鉴权
+    assert client.post("/api/documents/review/bulk", headers=bearer(tokens["access_token"]), json=body).status_code == 200
+
+    response = client.put(
+        "/api/permissions/roles/customer_service",
+        headers=auth_headers(client, admin),
+        json={"permissions": []}
+    )
+    assert response.json()["source"] == "default"
+    assert client.post("/api/documents/review/bulk", headers=bearer(tokens["access_token"]), json=body).status_code == 403
+
+
+def test_permission_api_rejects_malformed_permissions(client, admin):
+    response = client.put(
+        "/api/permissions/roles/customer_service",
+        headers=auth_headers(client, admin),
+        json={"permissions": ["Document.Review"]}
+    )
+    assert response.status_code == 422
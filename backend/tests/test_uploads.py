@@ -0,0 +1,113 @@
+"""
+断点续传上传协议：偏移校验、中断后恢复与完成上传
+"""
+import asyncio
+
+from app.config import settings
+from app.services.storage import storage_service
+from tests.helpers import auth_headers
+
+DATA = b"A" * 7000 + b"B" * 3000
+
+
+def start_session(client, headers, customer, document_type, data=DATA):
+    response = client.post("/api/documents/uploads", headers=headers, json={
+        "customer_id": customer.id,
+        "document_type_id": document_type.id,
+        "file_name": "scan.pdf",
+        "file_size": len(data),
+        "file_type": "application/pdf",
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["upload_id"]
+
+
+def put_chunk(client, headers, upload_id, offset, content):
+    return client.put(f"/api/documents/uploads/{upload_id}?offset={offset}", headers=headers, content=content)
+
+
+def test_chunks_resume_from_acknowledged_offset_and_finalize(client, service_user, customer, document_type):
+    headers = auth_headers(client, service_user)
+    upload_id = start_session(client, headers, customer, document_type)
+
+    response = put_chunk(client, headers, upload_id, 0, DATA[:4000])
+    assert response.status_code == 200
+    assert response.json()["received_size"] == 4000
+
+    # 重发已确认的分片：返回当前偏移，客户端据此续传
+    response = put_chunk(client, headers, upload_id, 0, DATA[:4000])
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == "4000"
+
+    response = client.post("/api/documents/uploads/finalize", headers=headers, json={"upload_ids": [upload_id]})
+    assert response.status_code == 409
+
+    # 中断的分片在暂存文件中留下未确认的字节，续传时被覆盖并截断
+    with open(storage_service.get_staging_path(upload_id), "ab") as f:
+        f.write(b"garbage")
+    assert client.get(f"/api/documents/uploads/{upload_id}", headers=headers).json()["received_size"] == 4000
+
+    response = put_chunk(client, headers, upload_id, 4000, DATA[4000:])
+    assert response.status_code == 200
+    assert response.json()["received_size"] == len(DATA)
+
+    response = client.post("/api/documents/uploads/finalize", headers=headers, json={"upload_ids": [upload_id]})
+    assert response.status_code == 201, response.text
+    document = response.json()[0]
+    assert document["file_size"] == len(DATA)
+    assert client.get(document["file_url"]).content == DATA
+
+    response = client.get(f"/api/documents/uploads/{upload_id}", headers=headers)
+    assert response.status_code == 409
+
+
+def test_received_size_follows_a_shorter_staging_file(client, service_user, customer, document_type):
+    headers = auth_headers(client, service_user)
+    upload_id = start_session(client, headers, customer, document_type)
+    assert put_chunk(client, headers, upload_id, 0, DATA[:4000]).status_code == 200
+
+    # 进程在写入途中崩溃：以暂存文件的实际长度为准
+    with open(storage_service.get_staging_path(upload_id), "r+b") as f:
+        f.truncate(2500)
+
+    response = client.get(f"/api/documents/uploads/{upload_id}", headers=headers)
+    assert response.json()["received_size"] == 2500
+    assert put_chunk(client, headers, upload_id, 4000, DATA[4000:]).status_code == 409
+    assert put_chunk(client, headers, upload_id, 2500, DATA[2500:]).status_code == 200
+
+
+def test_chunk_larger_than_remaining_bytes_is_rejected(client, service_user, customer, document_type):
+    headers = auth_headers(client, service_user)
+    upload_id = start_session(client, headers, customer, document_type)
+    assert put_chunk(client, headers, upload_id, 0, DATA[:4000]).status_code == 200
+
+    response = put_chunk(client, headers, upload_id, 4000, DATA[4000:] + b"extra")
+    assert response.status_code == 413
+    assert client.get(f"/api/documents/uploads/{upload_id}", headers=headers).json()["received_size"] == 4000
+    assert storage_service.get_staged_size(upload_id) == 4000
+
+
+def test_other_users_cannot_write_to_a_session(client, db, service_user, customer, document_type):
+    from tests.helpers import create_user
+
+    upload_id = start_session(client, auth_headers(client, service_user), customer, document_type)
+    other = auth_headers(client, create_user(db, "customer_service"))
+    assert put_chunk(client, other, upload_id, 0, DATA[:10]).status_code == 404
+
+
+async def test_concurrent_writes_to_one_upload_are_serialized():
+    async def body(data: bytes):
+        for i in range(0, len(data), 65536):
+            await asyncio.sleep(0)
+            yield data[i:i + 65536]
+
+    first, second = b"a" * 3_000_000, b"b" * 2_000_000
+    written = await asyncio.gather(
+        storage_service.write_chunk("concurrent", 0, body(first), settings.UPLOAD_MAX_CHUNK_SIZE * 10),
+        storage_service.write_chunk("concurrent", 0, body(second), settings.UPLOAD_MAX_CHUNK_SIZE * 10),
+    )
+
+    assert written == [len(first), len(second)]
+    # 后完成的写入完整覆盖先完成的写入，两者不会交错
+    assert storage_service.get_staging_path("concurrent").read_bytes() == second
+    assert storage_service._chunk_locks == {}
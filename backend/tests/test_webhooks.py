@@ -0,0 +1,228 @@
+"""
+Webhook 投递的领取、租约与结果写回
+"""
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import settings
+from app.core.webhooks import WebhookDispatcher, WebhookEvent, WebhookSubscription, webhook_manager
+from app.models.webhook import WebhookDelivery, WebhookSubscriptionRecord
+
+
+@pytest.fixture
+def subscription_url():
+    url = f"https://hooks.example.com/{uuid.uuid4().hex}"
+    webhook_manager.subscribe(WebhookSubscription(url, [WebhookEvent.CUSTOMER_CREATED]))
+    yield url
+    webhook_manager.unsubscribe(url)
+
+
+@pytest.fixture
+def deliveries(db, subscription_url):
+    # 分发器领取整张表中到期的记录，每个测试从空队列开始
+    db.query(WebhookDelivery).delete(synchronize_session=False)
+    records = [
+        WebhookDelivery(
+            url=subscription_url,
+            event="customer.created",
+            payload='{"event": "customer.created"}',
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+        )
+        for _ in range(3)
+    ]
+    db.add_all(records)
+    db.commit()
+    return [record.id for record in records]
+
+
+def rows(db):
+    db.expire_all()
+    return {row.id: row for row in db.query(WebhookDelivery)}
+
+
+def test_claimed_deliveries_are_leased_to_one_worker(db, deliveries):
+    first, second = WebhookDispatcher(webhook_manager), WebhookDispatcher(webhook_manager)
+
+    claimed = first._claim_due(100)
+    assert sorted(d.id for d in claimed) == sorted(deliveries)
+    assert second._claim_due(100) == []
+
+    leased = rows(db)
+    assert {row.status for row in leased.values()} == {"delivering"}
+    assert {row.claimed_by for row in leased.values()} == {first.worker_id}
+
+
+def test_expired_lease_is_reclaimed_and_stale_results_are_discarded(db, deliveries):
+    first, second = WebhookDispatcher(webhook_manager), WebhookDispatcher(webhook_manager)
+    claimed = first._claim_due(100)
+
+    # 第一个 worker 的租约到期，第二个 worker 重新领取其中一条
+    db.query(WebhookDelivery).filter(WebhookDelivery.id == deliveries[0]).update(
+        {WebhookDelivery.next_attempt_at: datetime.now(timezone.utc) - timedelta(seconds=1)},
+        synchronize_session=False
+    )
+    db.commit()
+    assert [d.id for d in second._claim_due(100)] == [deliveries[0]]
+
+    assert first._renew_lease(deliveries) == 2
+    first._record_results([(delivery, 200, None, False) for delivery in claimed])
+
+    result = rows(db)
+    assert (result[deliveries[0]].status, result[deliveries[0]].claimed_by) == ("delivering", second.worker_id)
+    assert {result[i].status for i in deliveries[1:]} == {"delivered"}
+    assert {result[i].claimed_by for i in deliveries[1:]} == {None}
+
+
+def test_failed_results_are_retried_then_dead_lettered(db, deliveries, monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_MAX_ATTEMPTS", 2)
+    dispatcher = WebhookDispatcher(webhook_manager)
+
+    dispatcher._record_results([(d, 500, "HTTP 500", False) for d in dispatcher._claim_due(100)])
+    retried = rows(db)
+    assert {row.status for row in retried.values()} == {"pending"}
+    assert all(row.attempts == 1 for row in retried.values())
+
+    db.query(WebhookDelivery).update(
+        {WebhookDelivery.next_attempt_at: datetime.now(timezone.utc) - timedelta(seconds=1)},
+        synchronize_session=False
+    )
+    db.commit()
+    dispatcher._record_results([(d, 500, "HTTP 500", False) for d in dispatcher._claim_due(100)])
+    assert {row.status for row in rows(db).values()} == {"dead"}
+
+
+async def test_lease_is_renewed_while_a_batch_is_sending(db, deliveries, monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_CLAIM_LEASE_SECONDS", 2)
+    dispatcher, other = WebhookDispatcher(webhook_manager), WebhookDispatcher(webhook_manager)
+    stolen = []
+
+    async def slow_send(subscription, body, event, delivery_ids):
+        await asyncio.sleep(3)
+        return 200, None
+
+    async def probe():
+        # 未续约时租约在第 2 秒到期，其他 worker 可在此时领取
+        await asyncio.sleep(2.5)
+        stolen.extend(await asyncio.to_thread(other._claim_due, 100))
+
+    monkeypatch.setattr(webhook_manager, "_send_webhook", slow_send)
+    processed, _ = await asyncio.gather(dispatcher.dispatch_once(), probe())
+
+    assert processed == len(deliveries)
+    assert stolen == []
+    assert {row.status for row in rows(db).values()} == {"delivered"}
+
+
+async def test_disabled_subscription_is_not_delivered(db, deliveries, subscription_url, monkeypatch):
+    sent = []
+
+    async def send(subscription, body, event, delivery_ids):
+        sent.append(delivery_ids)
+        return 200, None
+
+    monkeypatch.setattr(webhook_manager, "_send_webhook", send)
+    webhook_manager.subscribe(WebhookSubscription(subscription_url, [WebhookEvent.CUSTOMER_CREATED], enabled=False))
+    assert webhook_manager.get_subscription(subscription_url) is None
+
+    await WebhookDispatcher(webhook_manager).dispatch_once()
+    assert sent == []
+    assert {row.status for row in rows(db).values()} == {"dead"}
+
+
+@pytest.mark.parametrize("batch", [True, False])
+async def test_body_shape_depends_on_subscription_not_batch_size(db, deliveries, subscription_url, batch, monkeypatch):
+    bodies = []
+
+    async def send(subscription, body, event, delivery_ids):
+        bodies.append((json.loads(body), event))
+        return 200, None
+
+    monkeypatch.setattr(webhook_manager, "_send_webhook", send)
+    webhook_manager.subscribe(WebhookSubscription(subscription_url, [WebhookEvent.CUSTOMER_CREATED], batch=batch))
+    # 只留一条到期记录：批量订阅仍收到 {"events": [...]}
+    db.query(WebhookDelivery).filter(WebhookDelivery.id.in_(deliveries[1:])).delete(synchronize_session=False)
+    db.commit()
+
+    await WebhookDispatcher(webhook_manager).dispatch_once()
+    if batch:
+        assert bodies == [({"events": [{"event": "customer.created"}]}, "batch")]
+    else:
+        assert bodies == [({"event": "customer.created"}, "customer.created")]
+
+
+async def test_subscription_missing_from_index_is_read_from_database(db, monkeypatch):
+    url = f"https://hooks.example.com/{uuid.uuid4().hex}"
+    sent = []
+
+    async def send(subscription, body, event, delivery_ids):
+        sent.append(subscription.url)
+        return 200, None
+
+    monkeypatch.setattr(webhook_manager, "_send_webhook", send)
+    # 其他 worker 新建的订阅：已写入数据库，本进程尚未收到变更通知
+    db.query(WebhookDelivery).delete(synchronize_session=False)
+    record = WebhookSubscriptionRecord(url=url, events=["customer.created"])
+    db.add_all([record, WebhookDelivery(
+        url=url,
+        event="customer.created",
+        payload='{"event": "customer.created"}',
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+    )])
+    db.commit()
+    assert webhook_manager.get_subscription(url) is None
+
+    try:
+        await WebhookDispatcher(webhook_manager).dispatch_once()
+        assert sent == [url]
+        assert {row.status for row in rows(db).values()} == {"delivered"}
+        assert webhook_manager.get_subscription(url) is not None
+    finally:
+        db.delete(record)
+        db.commit()
+        webhook_manager.refresh_subscriptions([url])
+
+
+def test_deliveries_with_the_same_ordering_key_are_claimed_in_sequence(db, subscription_url):
+    db.query(WebhookDelivery).delete(synchronize_session=False)
+    due = datetime.now(timezone.utc) - timedelta(seconds=1)
+    records = {
+        (key, sequence): WebhookDelivery(
+            url=subscription_url,
+            event="customer.updated",
+            payload="{}",
+            status="pending",
+            attempts=0,
+            next_attempt_at=due,
+            ordering_key=key,
+            sequence=sequence
+        )
+        for key, sequence in [("customer:a", 1), ("customer:a", 2), ("customer:b", 3), ("customer:a", 4)]
+    }
+    db.add_all(records.values())
+    db.commit()
+    ids = {name: record.id for name, record in records.items()}
+    dispatcher = WebhookDispatcher(webhook_manager)
+
+    claimed = dispatcher._claim_due(100)
+    assert sorted(d.id for d in claimed) == sorted([ids["customer:a", 1], ids["customer:b", 3]])
+
+    # 第一条失败等待重试，同键的后续记录不会越过它
+    dispatcher._record_results([(d, 500, "HTTP 500", False) for d in claimed if d.id == ids["customer:a", 1]])
+    assert dispatcher._claim_due(100) == []
+
+    db.query(WebhookDelivery).filter(WebhookDelivery.id == ids["customer:a", 1]).update(
+        {WebhookDelivery.next_attempt_at: due}, synchronize_session=False
+    )
+    db.commit()
+    retried = dispatcher._claim_due(100)
+    assert [d.id for d in retried] == [ids["customer:a", 1]]
+    dispatcher._record_results([(d, 200, None, False) for d in retried])
+    assert [d.id for d in dispatcher._claim_due(100)] == [ids["customer:a", 2]]
@@ -33,6 +33,10 @@ mkdir -p /app/logs
 chmod 777 /app/uploads
 chmod 777 /app/logs
 
+# 数据库迁移：空库建表，已有库升级到最新版本（应用启动时只校验版本，不执行 DDL）
+echo "Migrating database..."
+(cd /app/backend && python scripts/migrate_database.py)
+
 echo ""
 echo "Starting services with Supervisor..."
 echo "========================================="
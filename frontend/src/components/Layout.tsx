@@ -8,6 +8,7 @@ import {
 } from '@ant-design/icons'
 import { useNavigate, useLocation, Outlet } from 'react-router-dom'
 import { useAuthStore } from '../store/authStore'
+import { api } from '../services/api'
 import { menuConfig, filterMenuByRole, convertToAntdMenuItems } from '../config/menuConfig.tsx'
 
 const { Header, Sider, Content } = AntLayout
@@ -25,6 +26,8 @@ const Layout: React.FC = () => {
   const isMobile = !screens.md
 
   const handleLogout = () => {
+    // 吊销服务端会话，失败不影响本地退出
+    api.post('/api/auth/logout').catch(() => {})
     clearAuth()
     navigate('/login')
   }
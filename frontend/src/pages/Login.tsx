@@ -16,7 +16,7 @@ const Login: React.FC = () => {
     setLoading(true)
     try {
       const response = await api.post('/api/auth/login', values)
-      const { access_token } = response.data
+      const { access_token, refresh_token } = response.data
 
       // Get user info
       const userResponse = await api.get('/api/auth/me', {
@@ -24,6 +24,7 @@ const Login: React.FC = () => {
       })
 
       setAuth(userResponse.data, access_token)
+      localStorage.setItem('refresh_token', refresh_token)
       message.success('登录成功')
       navigate('/customers')
     } catch (error: any) {
@@ -33,18 +33,59 @@ api.interceptors.request.use(
   }
 )
 
+// 访问令牌过期时用刷新令牌换取新令牌；并发请求共用同一次刷新
+let refreshing: Promise<string> | null = null
+
+const refreshAccessToken = (): Promise<string> => {
+  const refreshToken = localStorage.getItem('refresh_token')
+  if (!refreshToken) {
+    return Promise.reject(new Error('no refresh token'))
+  }
+  if (!refreshing) {
+    refreshing = axios
+      .post(`${baseURL}/api/auth/refresh`, { refresh_token: refreshToken })
+      .then((response) => {
+        const { access_token, refresh_token } = response.data
+        localStorage.setItem('access_token', access_token)
+        localStorage.setItem('refresh_token', refresh_token)
+        return access_token as string
+      })
+      .finally(() => {
+        refreshing = null
+      })
+  }
+  return refreshing
+}
+
 // 响应拦截器
 api.interceptors.response.use(
   (response: AxiosResponse) => {
     return response
   },
-  (error) => {
+  async (error) => {
+    const original = error.config
+    if (
+      error.response?.status === 401 &&
+      original &&
+      !original._retried &&
+      !original.url?.startsWith('/api/auth/')
+    ) {
+      original._retried = true
+      try {
+        const token = await refreshAccessToken()
+        original.headers.Authorization = `Bearer ${token}`
+        return api(original)
+      } catch {
+        // 刷新失败，按未授权处理
+      }
+    }
     if (error.response) {
       // 处理HTTP错误
       switch (error.response.status) {
         case 401:
           // 未授权，清除token并跳转到登录页
           localStorage.removeItem('access_token')
+          localStorage.removeItem('refresh_token')
           window.location.href = '/login'
           break
         case 403:
@@ -49,7 +49,13 @@ class WebSocketService {
         try {
           const message: WebSocketMessage = JSON.parse(event.data)
           console.log('WebSocket message received:', message)
-          
+
+          // 服务端心跳：回复 pong 保持连接，超过空闲时间未回复的连接会被服务端断开
+          if (message.type === 'ping') {
+            this.send('pong')
+            return
+          }
+
           // 触发对应类型的事件监听器
           if (message.type) {
             this.emit(message.type, message)
@@ -22,6 +22,7 @@ export const useAuthStore = create<AuthState>()(
       clearAuth: () => {
         set({ user: null, token: null })
         localStorage.removeItem('access_token')
+        localStorage.removeItem('refresh_token')
       },
       isAuthenticated: () => {
         return !!get().token